@@ -30,6 +30,7 @@ from open_webui.env import (
     WEBUI_AUTH,
     WEBUI_FAVICON_URL,
     WEBUI_NAME,
+    WEBSOCKET_MANAGER,
     log,
 )
 from open_webui.internal.db import Base, get_db
@@ -247,6 +248,8 @@ class AppConfig:
             )
 
         super().__setattr__("_state", {})
+        # Bumped on every update made in this process
+        super().__setattr__("version", 0)
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
@@ -254,6 +257,7 @@ class AppConfig:
         else:
             self._state[key].value = value
             self._state[key].save()
+            super().__setattr__("version", self.version + 1)
 
             if self._redis:
                 redis_key = f"{self._redis_key_prefix}:config:{key}"
@@ -2150,6 +2154,33 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Persistent BM25 index for hybrid search, kept in sync with vector DB writes.
+# It's a SQLite file shared by the workers of a node, which doesn't see writes
+# made on other nodes, so unless set it's only enabled for single node setups
+# (no Redis websocket manager to coordinate several).
+ENABLE_RAG_BM25_INDEX = os.environ.get("ENABLE_RAG_BM25_INDEX", "")
+
+if ENABLE_RAG_BM25_INDEX == "":
+    ENABLE_RAG_BM25_INDEX = WEBSOCKET_MANAGER != "redis"
+else:
+    ENABLE_RAG_BM25_INDEX = ENABLE_RAG_BM25_INDEX.lower() == "true"
+RAG_BM25_INDEX_PATH = os.environ.get(
+    "RAG_BM25_INDEX_PATH", f"{CACHE_DIR}/rag/bm25_index.db"
+)
+
+# In-memory LRU of full collection contents, invalidated by vector DB writes
+try:
+    RAG_COLLECTION_CACHE_MAX_SIZE = int(
+        os.environ.get("RAG_COLLECTION_CACHE_MAX_SIZE", str(256 * 1024 * 1024))
+    )
+except ValueError:
+    RAG_COLLECTION_CACHE_MAX_SIZE = 256 * 1024 * 1024
+
+try:
+    RAG_COLLECTION_CACHE_TTL = int(os.environ.get("RAG_COLLECTION_CACHE_TTL", "600"))
+except ValueError:
+    RAG_COLLECTION_CACHE_TTL = 600
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -2755,6 +2786,42 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Cache of query embeddings, in memory and optionally in Redis (REDIS_URL)
+try:
+    RAG_EMBEDDING_CACHE_MAX_SIZE = int(
+        os.environ.get("RAG_EMBEDDING_CACHE_MAX_SIZE", "10000")
+    )
+except ValueError:
+    RAG_EMBEDDING_CACHE_MAX_SIZE = 10000
+
+ENABLE_RAG_EMBEDDING_CACHE_REDIS = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE_REDIS", "False").lower() == "true"
+)
+
+try:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = int(
+        os.environ.get("RAG_EMBEDDING_CACHE_REDIS_TTL", str(7 * 24 * 60 * 60))
+    )
+except ValueError:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = 7 * 24 * 60 * 60
+
+# Persistent store of document chunk embeddings reused across ingestions. Off
+# unless set, as each node's store takes about 5 KB of disk per 768-dimension
+# chunk, up to RAG_EMBEDDING_STORE_MAX_SIZE chunks
+ENABLE_RAG_EMBEDDING_STORE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_STORE", "False").lower() == "true"
+)
+RAG_EMBEDDING_STORE_PATH = os.environ.get(
+    "RAG_EMBEDDING_STORE_PATH", f"{CACHE_DIR}/rag/embedding_store.db"
+)
+
+try:
+    RAG_EMBEDDING_STORE_MAX_SIZE = int(
+        os.environ.get("RAG_EMBEDDING_STORE_MAX_SIZE", "100000")
+    )
+except ValueError:
+    RAG_EMBEDDING_STORE_MAX_SIZE = 100000
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
@@ -2779,6 +2846,12 @@ RAG_RERANKING_MODEL_TRUST_REMOTE_CODE = (
     os.environ.get("RAG_RERANKING_MODEL_TRUST_REMOTE_CODE", "True").lower() == "true"
 )
 
+# Number of (query, document) pairs per forward pass of the local reranking model
+try:
+    RAG_RERANKING_BATCH_SIZE = int(os.environ.get("RAG_RERANKING_BATCH_SIZE", "32"))
+except ValueError:
+    RAG_RERANKING_BATCH_SIZE = 32
+
 RAG_EXTERNAL_RERANKER_URL = PersistentConfig(
     "RAG_EXTERNAL_RERANKER_URL",
     "rag.external_reranker_url",
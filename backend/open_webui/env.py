@@ -364,6 +364,40 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Authenticated users are cached for this many seconds (0 disables the cache)
+USER_CACHE_TTL = os.environ.get("USER_CACHE_TTL", "10")
+
+if USER_CACHE_TTL == "":
+    USER_CACHE_TTL = 10.0
+else:
+    try:
+        USER_CACHE_TTL = float(USER_CACHE_TTL)
+    except Exception:
+        USER_CACHE_TTL = 10.0
+
+# Group memberships and resolved permissions are cached for this many seconds
+GROUP_CACHE_TTL = os.environ.get("GROUP_CACHE_TTL", "60")
+
+if GROUP_CACHE_TTL == "":
+    GROUP_CACHE_TTL = 60.0
+else:
+    try:
+        GROUP_CACHE_TTL = float(GROUP_CACHE_TTL)
+    except Exception:
+        GROUP_CACHE_TTL = 60.0
+
+# The assembled model list is rebuilt at least this often (seconds), to pick
+# up models added to connections and changes made by other instances
+MODELS_CATALOG_TTL = os.environ.get("MODELS_CATALOG_TTL", "10")
+
+if MODELS_CATALOG_TTL == "":
+    MODELS_CATALOG_TTL = 10.0
+else:
+    try:
+        MODELS_CATALOG_TTL = float(MODELS_CATALOG_TTL)
+    except Exception:
+        MODELS_CATALOG_TTL = 10.0
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -555,6 +589,19 @@ else:
     except Exception:
         MODELS_CACHE_TTL = 1
 
+# Seconds between background refreshes of each connection's model list. The
+# last good list is served meanwhile, so a slow or failing connection doesn't
+# hold up model listing. 0 to fetch model lists on every request.
+MODELS_REFRESH_INTERVAL = os.environ.get("MODELS_REFRESH_INTERVAL", "30")
+
+if MODELS_REFRESH_INTERVAL == "":
+    MODELS_REFRESH_INTERVAL = 30.0
+else:
+    try:
+        MODELS_REFRESH_INTERVAL = float(MODELS_REFRESH_INTERVAL)
+    except Exception:
+        MODELS_REFRESH_INTERVAL = 30.0
+
 
 ####################################
 # CHAT
@@ -608,6 +655,45 @@ else:
         CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE = None
 
 
+# Coalesce streaming message saves and write them at most once per interval (seconds)
+CHAT_SAVE_BUFFER_INTERVAL = os.environ.get("CHAT_SAVE_BUFFER_INTERVAL", "1")
+
+if CHAT_SAVE_BUFFER_INTERVAL == "":
+    CHAT_SAVE_BUFFER_INTERVAL = 1.0
+else:
+    try:
+        CHAT_SAVE_BUFFER_INTERVAL = float(CHAT_SAVE_BUFFER_INTERVAL)
+    except Exception:
+        CHAT_SAVE_BUFFER_INTERVAL = 1.0
+
+
+CHAT_SAVE_BUFFER_MAX_UPDATES = os.environ.get("CHAT_SAVE_BUFFER_MAX_UPDATES", "100")
+
+if CHAT_SAVE_BUFFER_MAX_UPDATES == "":
+    CHAT_SAVE_BUFFER_MAX_UPDATES = 100
+else:
+    try:
+        CHAT_SAVE_BUFFER_MAX_UPDATES = int(CHAT_SAVE_BUFFER_MAX_UPDATES)
+    except Exception:
+        CHAT_SAVE_BUFFER_MAX_UPDATES = 100
+
+
+# Send the full content instead of a delta every N chat:completion events
+CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = os.environ.get(
+    "CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL", "50"
+)
+
+if CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL == "":
+    CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = 50
+else:
+    try:
+        CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = int(
+            CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL
+        )
+    except Exception:
+        CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = 50
+
+
 ####################################
 # WEBSOCKET SUPPORT
 ####################################
@@ -642,6 +728,11 @@ try:
 except ValueError:
     WEBSOCKET_REDIS_LOCK_TIMEOUT = 60
 
+# Keep local copies of the models and sessions shared through Redis
+ENABLE_WEBSOCKET_REDIS_LOCAL_CACHE = (
+    os.environ.get("ENABLE_WEBSOCKET_REDIS_LOCAL_CACHE", "True").lower() == "true"
+)
+
 WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 WEBSOCKET_SERVER_LOGGING = (
@@ -711,6 +802,158 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL", "True").lower() == "true"
 )
 
+# Connections kept open to each upstream (LLM connections, embedding engines
+# and tool servers), 0 for no limit
+AIOHTTP_CLIENT_POOL_LIMIT = os.environ.get("AIOHTTP_CLIENT_POOL_LIMIT", "0")
+
+if AIOHTTP_CLIENT_POOL_LIMIT == "":
+    AIOHTTP_CLIENT_POOL_LIMIT = 0
+else:
+    try:
+        AIOHTTP_CLIENT_POOL_LIMIT = int(AIOHTTP_CLIENT_POOL_LIMIT)
+    except Exception:
+        AIOHTTP_CLIENT_POOL_LIMIT = 0
+
+# Seconds an idle connection is kept for reuse, 0 to close connections after
+# every request
+AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT", "30"
+)
+
+if AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT == "":
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = 30.0
+else:
+    try:
+        AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = float(
+            AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT
+        )
+    except Exception:
+        AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = 30.0
+
+# Seconds resolved upstream addresses are cached, 0 to resolve every connection
+AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL", "300"
+)
+
+if AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL == "":
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = 300
+else:
+    try:
+        AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL)
+    except Exception:
+        AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = 300
+
+
+####################################
+# LOAD BALANCER
+####################################
+
+# How requests for a model served by several connections are spread:
+# "least_outstanding" (fewest requests in flight), "ewma" (in flight requests
+# weighted by response latency) or "random"
+LOAD_BALANCER_STRATEGY = os.environ.get(
+    "LOAD_BALANCER_STRATEGY", "least_outstanding"
+).lower()
+
+if LOAD_BALANCER_STRATEGY not in ("least_outstanding", "ewma", "random"):
+    LOAD_BALANCER_STRATEGY = "least_outstanding"
+
+# Cost of sending a request to a node that doesn't have the model loaded, as a
+# factor of the load of nodes that do, 1 to ignore where models are loaded
+LOAD_BALANCER_AFFINITY_FACTOR = os.environ.get("LOAD_BALANCER_AFFINITY_FACTOR", "4")
+
+if LOAD_BALANCER_AFFINITY_FACTOR == "":
+    LOAD_BALANCER_AFFINITY_FACTOR = 4.0
+else:
+    try:
+        LOAD_BALANCER_AFFINITY_FACTOR = max(float(LOAD_BALANCER_AFFINITY_FACTOR), 1.0)
+    except Exception:
+        LOAD_BALANCER_AFFINITY_FACTOR = 4.0
+
+# Consecutive failures after which a node gets no requests for
+# LOAD_BALANCER_EJECTION_TIME seconds, 0 to never eject nodes
+LOAD_BALANCER_MAX_FAILURES = os.environ.get("LOAD_BALANCER_MAX_FAILURES", "3")
+
+if LOAD_BALANCER_MAX_FAILURES == "":
+    LOAD_BALANCER_MAX_FAILURES = 3
+else:
+    try:
+        LOAD_BALANCER_MAX_FAILURES = int(LOAD_BALANCER_MAX_FAILURES)
+    except Exception:
+        LOAD_BALANCER_MAX_FAILURES = 3
+
+LOAD_BALANCER_EJECTION_TIME = os.environ.get("LOAD_BALANCER_EJECTION_TIME", "30")
+
+if LOAD_BALANCER_EJECTION_TIME == "":
+    LOAD_BALANCER_EJECTION_TIME = 30.0
+else:
+    try:
+        LOAD_BALANCER_EJECTION_TIME = float(LOAD_BALANCER_EJECTION_TIME)
+    except Exception:
+        LOAD_BALANCER_EJECTION_TIME = 30.0
+
+
+####################################
+# INGESTION
+####################################
+
+# Files processed at the same time by each instance, with as many processes
+# for text extraction. 0 to process uploads in the request's background tasks
+# instead of the ingestion queue
+INGESTION_WORKER_CONCURRENCY = os.environ.get("INGESTION_WORKER_CONCURRENCY", "4")
+
+if INGESTION_WORKER_CONCURRENCY == "":
+    INGESTION_WORKER_CONCURRENCY = 4
+else:
+    try:
+        INGESTION_WORKER_CONCURRENCY = max(int(INGESTION_WORKER_CONCURRENCY), 0)
+    except Exception:
+        INGESTION_WORKER_CONCURRENCY = 4
+
+# Pending jobs beyond which new uploads are rejected, 0 for no limit
+INGESTION_QUEUE_MAX_SIZE = os.environ.get("INGESTION_QUEUE_MAX_SIZE", "1000")
+
+if INGESTION_QUEUE_MAX_SIZE == "":
+    INGESTION_QUEUE_MAX_SIZE = 1000
+else:
+    try:
+        INGESTION_QUEUE_MAX_SIZE = int(INGESTION_QUEUE_MAX_SIZE)
+    except Exception:
+        INGESTION_QUEUE_MAX_SIZE = 1000
+
+INGESTION_JOB_MAX_ATTEMPTS = os.environ.get("INGESTION_JOB_MAX_ATTEMPTS", "3")
+
+if INGESTION_JOB_MAX_ATTEMPTS == "":
+    INGESTION_JOB_MAX_ATTEMPTS = 3
+else:
+    try:
+        INGESTION_JOB_MAX_ATTEMPTS = max(int(INGESTION_JOB_MAX_ATTEMPTS), 1)
+    except Exception:
+        INGESTION_JOB_MAX_ATTEMPTS = 3
+
+# Seconds a batch processing request waits for its job before returning 202
+# with the job's id, 0 to wait until it's done
+INGESTION_BATCH_WAIT_TIMEOUT = os.environ.get("INGESTION_BATCH_WAIT_TIMEOUT", "300")
+
+if INGESTION_BATCH_WAIT_TIMEOUT == "":
+    INGESTION_BATCH_WAIT_TIMEOUT = 300.0
+else:
+    try:
+        INGESTION_BATCH_WAIT_TIMEOUT = max(float(INGESTION_BATCH_WAIT_TIMEOUT), 0.0)
+    except Exception:
+        INGESTION_BATCH_WAIT_TIMEOUT = 300.0
+
+# Seconds before the first retry of a failed job, doubling on each retry
+INGESTION_JOB_RETRY_DELAY = os.environ.get("INGESTION_JOB_RETRY_DELAY", "10")
+
+if INGESTION_JOB_RETRY_DELAY == "":
+    INGESTION_JOB_RETRY_DELAY = 10.0
+else:
+    try:
+        INGESTION_JOB_RETRY_DELAY = float(INGESTION_JOB_RETRY_DELAY)
+    except Exception:
+        INGESTION_JOB_RETRY_DELAY = 10.0
+
 
 ####################################
 # SENTENCE TRANSFORMERS
@@ -62,11 +62,13 @@ from open_webui.utils.audit import AuditLevel, AuditLoggingMiddleware
 from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     MODELS,
+    SESSION_POOL,
     app as socket_app,
     periodic_usage_pool_cleanup,
     get_event_emitter,
     get_models_in_use,
 )
+from open_webui.socket.utils import CachedRedisDict
 from open_webui.routers import (
     audio,
     images,
@@ -478,8 +480,14 @@ from open_webui.utils.models import (
     get_all_models,
     get_all_base_models,
     check_model_access,
-    get_filtered_models,
 )
+from open_webui.utils.chat_buffer import CHAT_MESSAGE_BUFFER
+from open_webui.utils.file_status import FILE_STATUS
+from open_webui.utils.ingestion import INGESTION_QUEUE
+from open_webui.utils.last_active import LAST_ACTIVE_BUFFER
+from open_webui.utils.model_lists import MODEL_LIST_CACHE
+from open_webui.utils.session_pool import HTTP_SESSION_POOL
+from open_webui.utils.model_catalog import MODEL_CATALOG, etag_matches
 from open_webui.utils.chat import (
     generate_chat_completion as chat_completion_handler,
     chat_completed as chat_completed_handler,
@@ -592,12 +600,20 @@ async def lifespan(app: FastAPI):
         app.state.redis_task_command_listener = asyncio.create_task(
             redis_task_command_listener(app)
         )
+        app.state.file_status_listener = asyncio.create_task(
+            FILE_STATUS.listen(app.state.redis)
+        )
 
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    for redis_dict in (MODELS, SESSION_POOL):
+        if isinstance(redis_dict, CachedRedisDict):
+            asyncio.create_task(redis_dict.listen())
+    asyncio.create_task(MODEL_LIST_CACHE.run())
+    INGESTION_QUEUE.start(app)
 
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         await get_all_models(
@@ -622,9 +638,17 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await CHAT_MESSAGE_BUFFER.flush_all()
+    await LAST_ACTIVE_BUFFER.flush()
+    await INGESTION_QUEUE.stop()
+    await HTTP_SESSION_POOL.close()
+
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    if hasattr(app.state, "file_status_listener"):
+        app.state.file_status_listener.cancel()
+
 
 app = FastAPI(
     title="Private AI",
@@ -1429,51 +1453,15 @@ if audit_level != AuditLevel.NONE:
 async def get_models(
     request: Request, refresh: bool = False, user=Depends(get_verified_user)
 ):
-    all_models = await get_all_models(request, refresh=refresh, user=user)
-
-    models = []
-    for model in all_models:
-        # Filter out filter pipelines
-        if "pipeline" in model and model["pipeline"].get("type", None) == "filter":
-            continue
-
-        # Remove profile image URL to reduce payload size
-        if model.get("info", {}).get("meta", {}).get("profile_image_url"):
-            model["info"]["meta"].pop("profile_image_url", None)
-
-        try:
-            model_tags = [
-                tag.get("name")
-                for tag in model.get("info", {}).get("meta", {}).get("tags", [])
-            ]
-            tags = [tag.get("name") for tag in model.get("tags", [])]
-
-            tags = list(set(model_tags + tags))
-            model["tags"] = [{"name": tag} for tag in tags]
-        except Exception as e:
-            log.debug(f"Error processing model tags: {e}")
-            model["tags"] = []
-            pass
-
-        models.append(model)
-
-    model_order_list = request.app.state.config.MODEL_ORDER_LIST
-    if model_order_list:
-        model_order_dict = {model_id: i for i, model_id in enumerate(model_order_list)}
-        # Sort models by order list priority, with fallback for those not in the list
-        models.sort(
-            key=lambda model: (
-                model_order_dict.get(model.get("id", ""), float("inf")),
-                (model.get("name", "") or ""),
-            )
-        )
+    catalog = await MODEL_CATALOG.get(request, user, refresh=refresh)
+    etag, body = catalog.get_response(user)
 
-    models = get_filtered_models(models, user)
+    # Responses differ per user, browsers should revalidate every time
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
 
-    log.debug(
-        f"/api/models returned filtered models accessible to the user: {json.dumps([model.get('id') for model in models])}"
-    )
-    return {"data": models}
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/models/base")
@@ -1589,6 +1577,8 @@ async def chat_completion(
             "params": {
                 "stream_delta_chunk_size": stream_delta_chunk_size,
                 "reasoning_tags": reasoning_tags,
+                # Client applies `content_delta` chat:completion events
+                "content_delta": bool(form_data.pop("content_delta", False)),
                 "function_calling": (
                     "native"
                     if (
@@ -1629,7 +1619,9 @@ async def chat_completion(
             if metadata.get("chat_id") and metadata.get("message_id"):
                 try:
                     if not metadata["chat_id"].startswith("local:"):
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await CHAT_MESSAGE_BUFFER.run(
+                            metadata["chat_id"],
+                            Chats.patch_message_by_id_and_message_id,
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1662,7 +1654,9 @@ async def chat_completion(
                 # Update the chat message with the error
                 try:
                     if not metadata["chat_id"].startswith("local:"):
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await CHAT_MESSAGE_BUFFER.run(
+                            metadata["chat_id"],
+                            Chats.patch_message_by_id_and_message_id,
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
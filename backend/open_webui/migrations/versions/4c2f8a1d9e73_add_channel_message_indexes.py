@@ -0,0 +1,37 @@
+"""Add channel message indexes
+
+Revision ID: 4c2f8a1d9e73
+Revises: b12b5b96ac08
+Create Date: 2026-10-16 14:05:27.530912
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4c2f8a1d9e73"
+down_revision: Union[str, None] = "b12b5b96ac08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "message_channel_id_created_at_idx", "message", ["channel_id", "created_at"]
+    )
+    op.create_index(
+        "channel_member_channel_id_user_id_idx",
+        "channel_member",
+        ["channel_id", "user_id"],
+    )
+    op.create_index("channel_member_user_id_idx", "channel_member", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("channel_member_user_id_idx", table_name="channel_member")
+    op.drop_index("channel_member_channel_id_user_id_idx", table_name="channel_member")
+    op.drop_index("message_channel_id_created_at_idx", table_name="message")
@@ -0,0 +1,31 @@
+"""Add message reply and reaction indexes
+
+Revision ID: 9a7e3c51b2d4
+Revises: 4c2f8a1d9e73
+Create Date: 2026-10-16 16:42:09.274518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a7e3c51b2d4"
+down_revision: Union[str, None] = "4c2f8a1d9e73"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("message_parent_id_idx", "message", ["parent_id"])
+    op.create_index(
+        "message_reaction_message_id_idx", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("message_reaction_message_id_idx", table_name="message_reaction")
+    op.drop_index("message_parent_id_idx", table_name="message")
@@ -10,7 +10,17 @@ from pydantic import BaseModel, ConfigDict
 from sqlalchemy.dialects.postgresql import JSONB
 
 
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, case, cast
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    String,
+    Text,
+    JSON,
+    Index,
+    case,
+    cast,
+)
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -106,6 +116,11 @@ class ChannelMember(Base):
     created_at = Column(BigInteger)
     updated_at = Column(BigInteger)
 
+    __table_args__ = (
+        Index("channel_member_channel_id_user_id_idx", "channel_id", "user_id"),
+        Index("channel_member_user_id_idx", "user_id"),
+    )
+
 
 class ChannelMemberModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -566,6 +581,26 @@ class ChannelTable:
                 for membership in memberships
             ]
 
+    def get_members_by_channel_ids(
+        self, channel_ids: list[str]
+    ) -> dict[str, list[ChannelMemberModel]]:
+        if not channel_ids:
+            return {}
+
+        with get_db() as db:
+            memberships = (
+                db.query(ChannelMember)
+                .filter(ChannelMember.channel_id.in_(channel_ids))
+                .all()
+            )
+
+            members = {channel_id: [] for channel_id in channel_ids}
+            for membership in memberships:
+                members[membership.channel_id].append(
+                    ChannelMemberModel.model_validate(membership)
+                )
+            return members
+
     def pin_channel(self, channel_id: str, user_id: str, is_pinned: bool) -> bool:
         with get_db() as db:
             membership = (
@@ -11,7 +11,8 @@ from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import or_, func, select, and_, text, cast, update
+from sqlalchemy.dialects.postgresql import JSONB, array
 from sqlalchemy.sql import exists
 from sqlalchemy.sql.expression import bindparam
 
@@ -295,12 +296,124 @@ class ChatTable:
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
+        # Extract the single message on the database side instead of loading
+        # and validating the whole chat blob
+        try:
+            with get_db() as db:
+                result = db.execute(
+                    select(
+                        Chat.id, Chat.chat[("history", "messages", message_id)]
+                    ).where(Chat.id == id)
+                ).first()
+
+                if result is None:
+                    return None
+
+                message = result[1]
+                return message if isinstance(message, dict) else {}
+        except Exception as e:
+            log.debug(f"Falling back to full chat read for message {message_id}: {e}")
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
+    def _get_message_patch_value(
+        self, db, message_id: str, message: dict, set_current: bool = True
+    ):
+        """
+        Build a SQL expression that merges `message` into
+        `chat.history.messages[message_id]` (and optionally points `currentId`
+        at it) without round-tripping the rest of the chat JSON through Python.
+        """
+        dialect_name = db.bind.dialect.name
+
+        if dialect_name == "sqlite":
+            # JSON paths are built by hand, bail out on keys that would need escaping
+            if any('"' in key for key in [message_id, *message.keys()]):
+                return None, None
+
+            message_path = f'$.history.messages."{message_id}"'
+
+            args = []
+            for key, value in message.items():
+                args.extend([f'{message_path}."{key}"', func.json(json.dumps(value))])
+            if set_current:
+                args.extend(["$.history.currentId", message_id])
+
+            # The message has to exist before its keys can be set, and older
+            # SQLite versions don't see paths created earlier in the same call
+            return (
+                func.json_set(
+                    func.json_insert(Chat.chat, message_path, func.json("{}")),
+                    *args,
+                ),
+                func.json_type(Chat.chat, "$.history.messages") == "object",
+            )
+        elif dialect_name == "postgresql":
+            chat = cast(Chat.chat, JSONB)
+            message_path = array(["history", "messages", message_id])
+
+            merged_message = func.coalesce(
+                chat.op("#>")(message_path), cast({}, JSONB)
+            ).op("||")(cast(message, JSONB))
+
+            value = func.jsonb_set(chat, message_path, merged_message)
+            if set_current:
+                value = func.jsonb_set(
+                    value,
+                    array(["history", "currentId"]),
+                    func.to_jsonb(cast(message_id, Text)),
+                )
+
+            return (
+                cast(value, JSON),
+                func.jsonb_typeof(chat.op("#>")(array(["history", "messages"])))
+                == "object",
+            )
+
+        return None, None
+
+    def patch_message_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict, set_current: bool = True
+    ) -> bool:
+        """
+        Merge `message` into a single message of the chat history.
+
+        Unlike `upsert_message_to_chat_by_id_and_message_id`, the update is
+        applied as a JSON path patch in the database, so the cost of a write
+        does not grow with the size of the chat. Used by the streaming and
+        event emitter paths, which save on every delta.
+        """
+        message = self._clean_null_bytes(message)
+
+        try:
+            with get_db() as db:
+                value, condition = self._get_message_patch_value(
+                    db, message_id, message, set_current
+                )
+
+                if value is not None:
+                    result = db.execute(
+                        update(Chat)
+                        .where(Chat.id == id, condition)
+                        .values(chat=value, updated_at=int(time.time()))
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+
+                    if result.rowcount:
+                        return True
+        except Exception as e:
+            log.debug(f"Falling back to full chat write for message {message_id}: {e}")
+
+        return (
+            self.upsert_message_to_chat_by_id_and_message_id(id, message_id, message)
+            is not None
+        )
+
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
     ) -> Optional[ChatModel]:
@@ -330,41 +443,33 @@ class ChatTable:
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+    ) -> bool:
+        message = self.get_message_by_id_and_message_id(id, message_id)
+        if not message:
+            return False
 
-        chat = chat.chat
-        history = chat.get("history", {})
+        status_history = message.get("statusHistory", [])
+        status_history.append(status)
 
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
-
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        return self.patch_message_by_id_and_message_id(
+            id, message_id, {"statusHistory": status_history}, set_current=False
+        )
 
     def add_message_files_by_id_and_message_id(
         self, id: str, message_id: str, files: list[dict]
     ) -> list[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
+        message = self.get_message_by_id_and_message_id(id, message_id)
+        if message is None:
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
-
         message_files = []
 
-        if message_id in history.get("messages", {}):
-            message_files = history["messages"][message_id].get("files", [])
-            message_files = message_files + files
-            history["messages"][message_id]["files"] = message_files
+        if message:
+            message_files = message.get("files", []) + files
+            self.patch_message_by_id_and_message_id(
+                id, message_id, {"files": message_files}, set_current=False
+            )
 
-        chat["history"] = history
-        self.update_chat_by_id(id, chat)
         return message_files
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
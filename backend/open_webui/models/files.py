@@ -4,6 +4,7 @@ from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.file_status import FILE_STATUS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
@@ -228,6 +229,9 @@ class FilesTable:
 
                 file.updated_at = int(time.time())
                 db.commit()
+
+                if form_data.data is not None and "status" in form_data.data:
+                    FILE_STATUS.notify(id)
                 return FileModel.model_validate(file)
             except Exception as e:
                 log.exception(f"Error updating file completely by id: {e}")
@@ -250,6 +254,9 @@ class FilesTable:
                 file = db.query(File).filter_by(id=id).first()
                 file.data = {**(file.data if file.data else {}), **data}
                 db.commit()
+
+                if "status" in data:
+                    FILE_STATUS.notify(id)
                 return FileModel.model_validate(file)
             except Exception as e:
 
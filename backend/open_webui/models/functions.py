@@ -104,6 +104,11 @@ class FunctionValves(BaseModel):
 
 
 class FunctionsTable:
+    def __init__(self):
+        # Bumped on every function or valves change in this process, so state
+        # derived from them (e.g. compiled stream filters) can tell it's stale
+        self.version = 0
+
     def insert_new_function(
         self, user_id: str, type: str, form_data: FunctionForm
     ) -> Optional[FunctionModel]:
@@ -123,6 +128,7 @@ class FunctionsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                self.version += 1
                 if result:
                     return FunctionModel.model_validate(result)
                 else:
@@ -170,6 +176,7 @@ class FunctionsTable:
                         db.delete(func)
 
                 db.commit()
+                self.version += 1
 
                 return [
                     FunctionModel.model_validate(func)
@@ -283,6 +290,7 @@ class FunctionsTable:
                 function.updated_at = int(time.time())
                 db.commit()
                 db.refresh(function)
+                self.version += 1
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -303,6 +311,7 @@ class FunctionsTable:
                     function.updated_at = int(time.time())
                     db.commit()
                     db.refresh(function)
+                    self.version += 1
                     return self.get_function_by_id(id)
                 else:
                     return None
@@ -345,6 +354,7 @@ class FunctionsTable:
 
             # Update the user settings in the database
             Users.update_user_by_id(user_id, {"settings": user_settings})
+            self.version += 1
 
             return user_settings["functions"]["valves"][id]
         except Exception as e:
@@ -363,6 +373,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                self.version += 1
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -377,6 +388,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                self.version += 1
                 return True
             except Exception:
                 return None
@@ -386,6 +398,7 @@ class FunctionsTable:
             try:
                 db.query(Function).filter_by(id=id).delete()
                 db.commit()
+                self.version += 1
 
                 return True
             except Exception:
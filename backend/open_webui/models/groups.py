@@ -6,6 +6,7 @@ import uuid
 
 from open_webui.internal.db import Base, get_db
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.group_cache import GROUP_CACHE
 
 from open_webui.models.files import FileMetadataResponse
 
@@ -296,6 +297,7 @@ class GroupTable:
 
             db.add_all(new_members)
             db.commit()
+            GROUP_CACHE.invalidate()
 
     def get_group_member_count_by_id(self, id: str) -> int:
         with get_db() as db:
@@ -318,6 +320,7 @@ class GroupTable:
                     }
                 )
                 db.commit()
+                GROUP_CACHE.invalidate()
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -328,6 +331,7 @@ class GroupTable:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
+                GROUP_CACHE.invalidate()
                 return True
         except Exception:
             return False
@@ -337,6 +341,7 @@ class GroupTable:
             try:
                 db.query(Group).delete()
                 db.commit()
+                GROUP_CACHE.invalidate()
 
                 return True
             except Exception:
@@ -364,6 +369,7 @@ class GroupTable:
                     )
 
                 db.commit()
+                GROUP_CACHE.invalidate()
                 return True
 
             except Exception:
@@ -455,6 +461,7 @@ class GroupTable:
                     )
 
                 db.commit()
+                GROUP_CACHE.invalidate()
                 return True
 
             except Exception as e:
@@ -492,6 +499,7 @@ class GroupTable:
 
                 group.updated_at = now
                 db.commit()
+                GROUP_CACHE.invalidate()
                 db.refresh(group)
 
                 return GroupModel.model_validate(group)
@@ -522,6 +530,7 @@ class GroupTable:
                 group.updated_at = int(time.time())
 
                 db.commit()
+                GROUP_CACHE.invalidate()
                 db.refresh(group)
                 return GroupModel.model_validate(group)
 
@@ -0,0 +1,259 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, Integer, Text, JSON, func
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# IngestionJob DB Schema
+####################
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_job"
+
+    id = Column(Text, unique=True, primary_key=True)
+    user_id = Column(Text, nullable=False)
+
+    # Name of the handler registered with the ingestion queue
+    kind = Column(Text, nullable=False)
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    # Higher runs first
+    priority = Column(Integer, nullable=False, default=0)
+    # "pending", "running", "completed" or "failed"
+    status = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    # Pending jobs don't run before, e.g. when waiting to be retried
+    run_at = Column(BigInteger, nullable=False)
+
+    created_at = Column(BigInteger, nullable=False)
+    # Kept fresh while running, so jobs of crashed instances can be requeued
+    updated_at = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index("ix_ingestion_job_status_run_at", "status", "run_at"),
+        Index("ix_ingestion_job_user_id", "user_id"),
+    )
+
+
+class IngestionJobModel(BaseModel):
+    id: str
+    user_id: str
+
+    kind: str
+    payload: Optional[dict] = None
+    result: Optional[dict] = None
+
+    priority: int
+    status: str
+    attempts: int
+    error: Optional[str] = None
+
+    run_at: int  # timestamp in epoch
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class IngestionJobsTable:
+    def insert_new_job(
+        self, user_id: str, kind: str, payload: dict, priority: int = 0
+    ) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            now = int(time.time())
+            job = IngestionJob(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                kind=kind,
+                payload=payload,
+                priority=priority,
+                status="pending",
+                attempts=0,
+                run_at=now,
+                created_at=now,
+                updated_at=now,
+            )
+
+            try:
+                db.add(job)
+                db.commit()
+                db.refresh(job)
+                return IngestionJobModel.model_validate(job)
+            except Exception as e:
+                log.exception(f"Error inserting ingestion job: {e}")
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            job = db.get(IngestionJob, id)
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def get_job_counts(self) -> dict[str, int]:
+        """Count jobs by status."""
+        with get_db() as db:
+            return dict(
+                db.query(IngestionJob.status, func.count(IngestionJob.id))
+                .group_by(IngestionJob.status)
+                .all()
+            )
+
+    def claim_next_job(self) -> Optional[IngestionJobModel]:
+        """
+        Mark the next job to run as running and return it.
+
+        Jobs run by priority, then users with fewer jobs running go first, so
+        one user's batch doesn't hold up everyone else's uploads, then oldest
+        first. Claims are atomic, so several instances can share the table.
+        """
+        with get_db() as db:
+            for _ in range(3):
+                now = int(time.time())
+                eligible = (
+                    IngestionJob.status == "pending",
+                    IngestionJob.run_at <= now,
+                )
+
+                priority = (
+                    db.query(func.max(IngestionJob.priority)).filter(*eligible).scalar()
+                )
+                if priority is None:
+                    return None
+
+                # The oldest job of each user, however many others queued first
+                oldest = (
+                    db.query(IngestionJob.user_id, func.min(IngestionJob.created_at))
+                    .filter(*eligible, IngestionJob.priority == priority)
+                    .group_by(IngestionJob.user_id)
+                    .all()
+                )
+                if not oldest:
+                    continue
+
+                running = dict(
+                    db.query(IngestionJob.user_id, func.count(IngestionJob.id))
+                    .filter(IngestionJob.status == "running")
+                    .group_by(IngestionJob.user_id)
+                    .all()
+                )
+                user_id, _ = min(
+                    oldest,
+                    key=lambda row: (running.get(row[0], 0), row[1]),
+                )
+
+                job = (
+                    db.query(IngestionJob)
+                    .filter(
+                        *eligible,
+                        IngestionJob.priority == priority,
+                        IngestionJob.user_id == user_id,
+                    )
+                    .order_by(IngestionJob.created_at)
+                    .first()
+                )
+                if job is None:
+                    continue
+
+                claimed = (
+                    db.query(IngestionJob)
+                    .filter_by(id=job.id, status="pending")
+                    .update(
+                        {
+                            "status": "running",
+                            "attempts": IngestionJob.attempts + 1,
+                            "updated_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+
+                if claimed:
+                    db.refresh(job)
+                    return IngestionJobModel.model_validate(job)
+
+                # Claimed by another instance in the meantime
+                db.expire_all()
+
+            return None
+
+    def complete_job(self, id: str, result: Optional[dict] = None) -> bool:
+        with get_db() as db:
+            db.query(IngestionJob).filter_by(id=id).update(
+                {
+                    "status": "completed",
+                    "result": result,
+                    "error": None,
+                    "updated_at": int(time.time()),
+                }
+            )
+            db.commit()
+            return True
+
+    def fail_job(self, id: str, error: str, retry_at: Optional[int] = None) -> bool:
+        """Mark a job failed, or pending again until `retry_at` if given."""
+        with get_db() as db:
+            db.query(IngestionJob).filter_by(id=id).update(
+                {
+                    "status": "pending" if retry_at is not None else "failed",
+                    "error": error,
+                    **({"run_at": retry_at} if retry_at is not None else {}),
+                    "updated_at": int(time.time()),
+                }
+            )
+            db.commit()
+            return True
+
+    def touch_jobs_by_ids(self, ids: list[str]):
+        if not ids:
+            return
+
+        with get_db() as db:
+            db.query(IngestionJob).filter(
+                IngestionJob.id.in_(ids), IngestionJob.status == "running"
+            ).update({"updated_at": int(time.time())}, synchronize_session=False)
+            db.commit()
+
+    def requeue_stale_jobs(self, timeout: int) -> int:
+        """Put back running jobs not updated for `timeout` seconds."""
+        with get_db() as db:
+            count = (
+                db.query(IngestionJob)
+                .filter(
+                    IngestionJob.status == "running",
+                    IngestionJob.updated_at < int(time.time()) - timeout,
+                )
+                .update(
+                    {"status": "pending", "updated_at": int(time.time())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return count
+
+    def delete_finished_jobs(self, before: int) -> int:
+        with get_db() as db:
+            count = (
+                db.query(IngestionJob)
+                .filter(
+                    IngestionJob.status.in_(["completed", "failed"]),
+                    IngestionJob.updated_at < before,
+                )
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return count
+
+
+IngestionJobs = IngestionJobsTable()
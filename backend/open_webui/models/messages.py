@@ -6,12 +6,12 @@ from typing import Optional
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.models.users import Users, User, UserNameResponse
-from open_webui.models.channels import Channels, ChannelMember
+from open_webui.models.channels import Channel, Channels, ChannelMember
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
+from sqlalchemy import or_, func, select, and_, text, case
 from sqlalchemy.sql import exists
 
 ####################
@@ -27,6 +27,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("message_reaction_message_id_idx", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -60,6 +62,11 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        Index("message_channel_id_created_at_idx", "channel_id", "created_at"),
+        Index("message_parent_id_idx", "parent_id"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -169,7 +176,7 @@ class MessageTable:
             )
 
             reactions = self.get_reactions_by_message_id(id)
-            thread_replies = self.get_thread_replies_by_message_id(id)
+            replies = self.get_reply_summaries_by_message_ids([id]).get(id, {})
 
             user = Users.get_user_by_id(message.user_id)
             return MessageResponse.model_validate(
@@ -179,10 +186,8 @@ class MessageTable:
                     "reply_to_message": (
                         reply_to_message.model_dump() if reply_to_message else None
                     ),
-                    "latest_reply_at": (
-                        thread_replies[0].created_at if thread_replies else None
-                    ),
-                    "reply_count": len(thread_replies),
+                    "latest_reply_at": replies.get("latest_reply_at"),
+                    "reply_count": replies.get("reply_count", 0),
                     "reactions": reactions,
                 }
             )
@@ -195,27 +200,7 @@ class MessageTable:
                 .order_by(Message.created_at.desc())
                 .all()
             )
-
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(message.reply_to_id)
-                    if message.reply_to_id
-                    else None
-                )
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._get_reply_to_responses(db, all_messages)
 
     def get_reply_user_ids_by_message_id(self, id: str) -> list[str]:
         with get_db() as db:
@@ -224,39 +209,146 @@ class MessageTable:
                 for message in db.query(Message).filter_by(parent_id=id).all()
             ]
 
+    def _get_reply_to_responses(
+        self, db, messages: list[Message]
+    ) -> list[MessageReplyToResponse]:
+        # Load the messages replied to, and their authors, in one query each
+        reply_to_ids = {message.reply_to_id for message in messages}
+        reply_to_ids.discard(None)
+        reply_to_messages = (
+            {
+                message.id: MessageModel.model_validate(message)
+                for message in db.query(Message)
+                .filter(Message.id.in_(reply_to_ids))
+                .all()
+            }
+            if reply_to_ids
+            else {}
+        )
+        users = self._get_users_by_ids(
+            [message.user_id for message in reply_to_messages.values()]
+        )
+
+        responses = []
+        for message in messages:
+            reply_to_message = reply_to_messages.get(message.reply_to_id)
+            responses.append(
+                MessageReplyToResponse.model_validate(
+                    {
+                        **MessageModel.model_validate(message).model_dump(),
+                        "reply_to_message": (
+                            {
+                                **reply_to_message.model_dump(),
+                                "user": users.get(reply_to_message.user_id),
+                            }
+                            if reply_to_message
+                            else None
+                        ),
+                    }
+                )
+            )
+        return responses
+
+    def _get_users_by_ids(self, user_ids: list[str]) -> dict[str, dict]:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return {}
+        return {
+            user.id: user.model_dump() for user in Users.get_users_by_user_ids(user_ids)
+        }
+
+    def get_message_responses(
+        self, messages: list[MessageModel], with_replies: bool = True
+    ) -> list[MessageResponse]:
+        """
+        Add the author, reactions and thread summary to each message, loading
+        them for the whole list at once.
+        """
+        message_ids = [message.id for message in messages]
+        users = self._get_users_by_ids([message.user_id for message in messages])
+        reactions = self.get_reactions_by_message_ids(message_ids)
+        replies = (
+            self.get_reply_summaries_by_message_ids(message_ids) if with_replies else {}
+        )
+
+        return [
+            MessageResponse.model_validate(
+                {
+                    **message.model_dump(),
+                    "user": users.get(message.user_id),
+                    "reactions": reactions.get(message.id, []),
+                    "reply_count": replies.get(message.id, {}).get("reply_count", 0),
+                    "latest_reply_at": replies.get(message.id, {}).get(
+                        "latest_reply_at"
+                    ),
+                }
+            )
+            for message in messages
+        ]
+
+    def get_reply_summaries_by_message_ids(
+        self, message_ids: list[str]
+    ) -> dict[str, dict]:
+        """Get the number of thread replies to each message, and the latest."""
+        if not message_ids:
+            return {}
+
+        with get_db() as db:
+            rows = (
+                db.query(
+                    Message.parent_id,
+                    func.count(Message.id),
+                    func.max(Message.created_at),
+                )
+                .filter(Message.parent_id.in_(message_ids))
+                .group_by(Message.parent_id)
+                .all()
+            )
+            return {
+                parent_id: {
+                    "reply_count": reply_count,
+                    "latest_reply_at": latest_reply_at,
+                }
+                for parent_id, reply_count, latest_reply_at in rows
+            }
+
     def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before_id: Optional[str] = None,
     ) -> list[MessageReplyToResponse]:
+        """
+        Get the top-level messages of a channel, newest first. Pass the id of
+        the oldest message loaded as `before_id` to get the page before it,
+        which unlike `skip` doesn't get slower deeper in history.
+        """
         with get_db() as db:
+            query = db.query(Message).filter_by(channel_id=channel_id, parent_id=None)
+            if before_id is not None:
+                before = db.get(Message, before_id)
+                if not before or before.channel_id != channel_id:
+                    return []
+
+                # Messages created in the same nanosecond are ordered by id
+                query = query.filter(
+                    or_(
+                        Message.created_at < before.created_at,
+                        and_(
+                            Message.created_at == before.created_at,
+                            Message.id < before.id,
+                        ),
+                    )
+                )
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
+                query.order_by(Message.created_at.desc(), Message.id.desc())
                 .offset(skip)
                 .limit(limit)
                 .all()
             )
-
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(message.reply_to_id)
-                    if message.reply_to_id
-                    else None
-                )
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._get_reply_to_responses(db, all_messages)
 
     def get_messages_by_parent_id(
         self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
@@ -280,26 +372,7 @@ class MessageTable:
             if len(all_messages) < limit:
                 all_messages.append(message)
 
-            messages = []
-            for message in all_messages:
-                reply_to_message = (
-                    self.get_message_by_id(message.reply_to_id)
-                    if message.reply_to_id
-                    else None
-                )
-                messages.append(
-                    MessageReplyToResponse.model_validate(
-                        {
-                            **MessageModel.model_validate(message).model_dump(),
-                            "reply_to_message": (
-                                reply_to_message.model_dump()
-                                if reply_to_message
-                                else None
-                            ),
-                        }
-                    )
-                )
-            return messages
+            return self._get_reply_to_responses(db, all_messages)
 
     def get_last_message_by_channel_id(self, channel_id: str) -> Optional[MessageModel]:
         with get_db() as db:
@@ -369,6 +442,63 @@ class MessageTable:
                 query = query.filter(Message.user_id != user_id)
             return query.count()
 
+    def get_channel_summaries_by_channel_ids(
+        self, channel_ids: list[str], user_id: str
+    ) -> dict[str, dict]:
+        """
+        Get the time of the last message of each channel, and the number of
+        messages `user_id` hasn't read in it, as get_last_message_by_channel_id
+        and get_unread_message_count would, in a single query.
+
+        Both are subqueries per channel on the (channel_id, created_at) index:
+        the last message is one index lookup, and only unread messages are
+        scanned to count them.
+        """
+        if not channel_ids:
+            return {}
+
+        with get_db() as db:
+            last_message_at = (
+                select(func.max(Message.created_at))
+                .where(Message.channel_id == Channel.id)
+                .scalar_subquery()
+            )
+            unread_count = (
+                select(func.count(Message.id))
+                .where(
+                    Message.channel_id == Channel.id,
+                    Message.created_at > func.coalesce(ChannelMember.last_read_at, 0),
+                    Message.parent_id.is_(None),  # only count top-level messages
+                    Message.user_id != user_id,
+                )
+                .scalar_subquery()
+            )
+
+            rows = (
+                db.query(
+                    Channel.id,
+                    last_message_at,
+                    # Channels the user isn't a member of have nothing unread
+                    case((ChannelMember.id.is_(None), 0), else_=unread_count),
+                )
+                .outerjoin(
+                    ChannelMember,
+                    and_(
+                        ChannelMember.channel_id == Channel.id,
+                        ChannelMember.user_id == user_id,
+                    ),
+                )
+                .filter(Channel.id.in_(channel_ids))
+                .all()
+            )
+            return {
+                channel_id: {
+                    "last_message_at": last_message_at,
+                    "unread_count": int(unread_count or 0),
+                }
+                for channel_id, last_message_at, unread_count in rows
+            }
+
     def add_reaction_to_message(
         self, id: str, user_id: str, name: str
     ) -> Optional[MessageReactionModel]:
@@ -397,34 +527,49 @@ class MessageTable:
             return MessageReactionModel.model_validate(result) if result else None
 
     def get_reactions_by_message_id(self, id: str) -> list[Reactions]:
+        return self.get_reactions_by_message_ids([id]).get(id, [])
+
+    def get_reactions_by_message_ids(
+        self, message_ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        if not message_ids:
+            return {}
+
         with get_db() as db:
             # JOIN User so all user info is fetched in one query
             results = (
                 db.query(MessageReaction, User)
                 .join(User, MessageReaction.user_id == User.id)
-                .filter(MessageReaction.message_id == id)
+                .filter(MessageReaction.message_id.in_(message_ids))
+                .order_by(MessageReaction.created_at)
                 .all()
             )
 
             reactions = {}
 
             for reaction, user in results:
-                if reaction.name not in reactions:
-                    reactions[reaction.name] = {
+                message_reactions = reactions.setdefault(reaction.message_id, {})
+                if reaction.name not in message_reactions:
+                    message_reactions[reaction.name] = {
                         "name": reaction.name,
                         "users": [],
                         "count": 0,
                     }
 
-                reactions[reaction.name]["users"].append(
+                message_reactions[reaction.name]["users"].append(
                     {
                         "id": user.id,
                         "name": user.name,
                     }
                 )
-                reactions[reaction.name]["count"] += 1
+                message_reactions[reaction.name]["count"] += 1
 
-            return [Reactions(**reaction) for reaction in reactions.values()]
+            return {
+                message_id: [
+                    Reactions(**reaction) for reaction in message_reactions.values()
+                ]
+                for message_id, message_reactions in reactions.items()
+            }
 
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
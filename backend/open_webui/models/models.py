@@ -5,7 +5,6 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 
-from open_webui.models.groups import Groups
 from open_webui.models.users import User, UserModel, Users, UserResponse
 
 
@@ -18,7 +17,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
 
 
 log = logging.getLogger(__name__)
@@ -151,6 +150,11 @@ class ModelForm(BaseModel):
 
 
 class ModelsTable:
+    def __init__(self):
+        # Bumped on every model change in this process, so state derived from
+        # models (e.g. the model catalog) can tell it's stale
+        self.version = 0
+
     def insert_new_model(
         self, form_data: ModelForm, user_id: str
     ) -> Optional[ModelModel]:
@@ -167,6 +171,7 @@ class ModelsTable:
                 result = Model(**model.model_dump())
                 db.add(result)
                 db.commit()
+                self.version += 1
                 db.refresh(result)
 
                 if result:
@@ -214,7 +219,7 @@ class ModelsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
         models = self.get_models()
-        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user_id)}
+        user_group_ids = get_user_group_ids(user_id)
         return [
             model
             for model in models
@@ -371,6 +376,7 @@ class ModelsTable:
                     }
                 )
                 db.commit()
+                self.version += 1
 
                 return self.get_model_by_id(id)
             except Exception:
@@ -384,6 +390,7 @@ class ModelsTable:
                 result = db.query(Model).filter_by(id=id).update(data)
 
                 db.commit()
+                self.version += 1
 
                 model = db.get(Model, id)
                 db.refresh(model)
@@ -397,6 +404,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).filter_by(id=id).delete()
                 db.commit()
+                self.version += 1
 
                 return True
         except Exception:
@@ -407,6 +415,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).delete()
                 db.commit()
+                self.version += 1
 
                 return True
         except Exception:
@@ -448,6 +457,7 @@ class ModelsTable:
                         db.delete(model)
 
                 db.commit()
+                self.version += 1
 
                 return [
                     ModelModel.model_validate(model) for model in db.query(Model).all()
@@ -4,13 +4,12 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 
 
-from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups, GroupMember
 from open_webui.models.channels import ChannelMember
 
 
-from open_webui.utils.misc import throttle
+from open_webui.utils.user_cache import USER_CACHE
 
 
 from pydantic import BaseModel, ConfigDict
@@ -513,6 +512,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                USER_CACHE.invalidate(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -527,6 +527,7 @@ class UsersTable:
                     {**form_data.model_dump(exclude_none=True)}
                 )
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -542,25 +543,19 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
             return None
 
-    @throttle(DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL)
-    def update_last_active_by_id(self, id: str) -> Optional[UserModel]:
-        try:
-            with get_db() as db:
-                db.query(User).filter_by(id=id).update(
-                    {"last_active_at": int(time.time())}
-                )
-                db.commit()
-
-                user = db.query(User).filter_by(id=id).first()
-                return UserModel.model_validate(user)
-        except Exception:
-            return None
+    def update_last_active_by_ids(self, ids: list[str], last_active_at: int):
+        with get_db() as db:
+            db.query(User).filter(User.id.in_(ids)).update(
+                {"last_active_at": last_active_at}, synchronize_session=False
+            )
+            db.commit()
 
     def update_user_oauth_by_id(
         self, id: str, provider: str, sub: str
@@ -588,6 +583,7 @@ class UsersTable:
                 # Persist updated JSON
                 db.query(User).filter_by(id=id).update({"oauth": oauth})
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 return UserModel.model_validate(user)
 
@@ -599,6 +595,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -619,6 +616,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -637,6 +635,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                    USER_CACHE.invalidate(id)
 
                 return True
             else:
@@ -657,6 +656,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(ApiKey).filter_by(user_id=id).delete()
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 now = int(time.time())
                 new_api_key = ApiKey(
@@ -679,6 +679,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(ApiKey).filter_by(user_id=id).delete()
                 db.commit()
+                USER_CACHE.invalidate(id)
                 return True
         except Exception:
             return False
@@ -708,11 +709,14 @@ class UsersTable:
     def is_user_active(self, user_id: str) -> bool:
         with get_db() as db:
             user = db.query(User).filter_by(id=user_id).first()
-            if user and user.last_active_at:
-                # Consider user active if last_active_at within the last 3 minutes
-                three_minutes_ago = int(time.time()) - 180
-                return user.last_active_at >= three_minutes_ago
-            return False
+            return self.is_active(user.last_active_at) if user else False
+
+    def is_active(self, last_active_at: Optional[int]) -> bool:
+        if last_active_at:
+            # Consider user active if last_active_at within the last 3 minutes
+            three_minutes_ago = int(time.time()) - 180
+            return last_active_at >= three_minutes_ago
+        return False
 
 
 Users = UsersTable()
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from open_webui.config import (
+    ENABLE_RAG_EMBEDDING_CACHE_REDIS,
+    ENABLE_RAG_EMBEDDING_STORE,
+    RAG_EMBEDDING_CACHE_MAX_SIZE,
+    RAG_EMBEDDING_CACHE_REDIS_TTL,
+    RAG_EMBEDDING_STORE_MAX_SIZE,
+    RAG_EMBEDDING_STORE_PATH,
+)
+from open_webui.env import REDIS_KEY_PREFIX, SRC_LOG_LEVELS
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def get_embedding_cache_key(
+    engine: str,
+    model: str,
+    prefix: Optional[str],
+    text: str,
+    url: Optional[str] = None,
+    azure_api_version: Optional[str] = None,
+) -> str:
+    # Endpoints serving a model of the same name may not return the same vectors
+    return hashlib.sha256(
+        "\0".join(
+            [
+                engine or "",
+                (url or "").rstrip("/"),
+                azure_api_version or "",
+                model or "",
+                prefix or "",
+                text,
+            ]
+        ).encode()
+    ).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embeddings keyed by engine, endpoint, model, prefix and
+    text, with an optional Redis tier shared between instances.
+
+    Redis errors are logged and treated as misses, so the cache never fails
+    an embedding request.
+    """
+
+    def __init__(self, max_size: int, redis=None, redis_ttl: Optional[int] = None):
+        self.max_size = max_size
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+
+        self.entries: OrderedDict[str, list[float]] = OrderedDict()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def get_redis_key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:embedding:{key}"
+
+    async def get_embeddings(
+        self,
+        engine: str,
+        model: str,
+        texts: list[str],
+        prefix: Optional[str],
+        embed: Callable[[list[str]], Awaitable[Optional[list]]],
+        url: Optional[str] = None,
+        azure_api_version: Optional[str] = None,
+    ) -> Optional[list]:
+        keys = [
+            get_embedding_cache_key(engine, model, prefix, text, url, azure_api_version)
+            for text in texts
+        ]
+        embeddings = {}
+
+        for key in keys:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                embeddings[key] = self.entries[key]
+                self.hits += 1
+
+        missing = list(dict.fromkeys(key for key in keys if key not in embeddings))
+        if missing and self.redis is not None:
+            try:
+                # Pipelined GETs rather than MGET, which fails across cluster slots
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key in missing:
+                        pipe.get(self.get_redis_key(key))
+                    values = await pipe.execute()
+                for key, value in zip(missing, values):
+                    if value is not None:
+                        embeddings[key] = json.loads(value)
+                        self._set(key, embeddings[key])
+                        self.redis_hits += 1
+            except Exception as e:
+                log.warning(f"Failed to read embeddings from Redis: {e}")
+
+        missing = [key for key in missing if key not in embeddings]
+        if missing:
+            self.misses += len(missing)
+
+            texts_by_key = dict(zip(keys, texts))
+            results = await embed([texts_by_key[key] for key in missing])
+            if not results or len(results) != len(missing):
+                # Failed requests aren't cached, let the caller see the failure
+                return results
+
+            for key, embedding in zip(missing, results):
+                embeddings[key] = embedding
+                self._set(key, embedding)
+
+            if self.redis is not None:
+                try:
+                    async with self.redis.pipeline(transaction=False) as pipe:
+                        for key, embedding in zip(missing, results):
+                            pipe.set(
+                                self.get_redis_key(key),
+                                json.dumps(embedding),
+                                ex=self.redis_ttl,
+                            )
+                        await pipe.execute()
+                except Exception as e:
+                    log.warning(f"Failed to write embeddings to Redis: {e}")
+
+        return [embeddings[key] for key in keys]
+
+    def _set(self, key: str, embedding: list[float]):
+        self.entries[key] = embedding
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+class EmbeddingStore:
+    """
+    Persistent store of document chunk embeddings in SQLite, so re-uploading
+    or reprocessing content only embeds chunks that weren't seen before.
+
+    Embeddings are stored as float32, the precision embedding models produce.
+    Once more than `max_size` embeddings are stored, the least recently used
+    ones are pruned.
+    """
+
+    # SQLite's default limit on bound parameters is 999
+    BATCH_SIZE = 500
+
+    def __init__(self, path: str, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.local = threading.local()
+
+        self.get_connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                used_at INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self.get_connection().execute(
+            "CREATE INDEX IF NOT EXISTS embedding_used_at ON embedding (used_at)"
+        )
+
+        # Upper bound of the number of stored embeddings, so writes only count
+        # rows when the store may be full
+        (self.count,) = (
+            self.get_connection().execute("SELECT COUNT(*) FROM embedding").fetchone()
+        )
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, keys: list[str]) -> dict[str, list[float]]:
+        conn = self.get_connection()
+        embeddings = {}
+
+        for i in range(0, len(keys), self.BATCH_SIZE):
+            batch = keys[i : i + self.BATCH_SIZE]
+            rows = conn.execute(
+                "SELECT key, vector FROM embedding "
+                f"WHERE key IN ({', '.join('?' * len(batch))})",
+                batch,
+            )
+            for key, vector in rows:
+                embeddings[key] = array("f", vector).tolist()
+
+        if embeddings:
+            with conn:
+                conn.executemany(
+                    "UPDATE embedding SET used_at = ? WHERE key = ?",
+                    [(int(time.time()), key) for key in embeddings],
+                )
+
+        return embeddings
+
+    def set(self, embeddings: dict[str, list[float]]):
+        conn = self.get_connection()
+        now = int(time.time())
+
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding VALUES (?, ?, ?)",
+                [
+                    (key, array("f", embedding).tobytes(), now)
+                    for key, embedding in embeddings.items()
+                ],
+            )
+
+            self.count += len(embeddings)
+            if self.count > self.max_size:
+                (count,) = conn.execute("SELECT COUNT(*) FROM embedding").fetchone()
+                if count > self.max_size:
+                    conn.execute(
+                        "DELETE FROM embedding WHERE key IN "
+                        "(SELECT key FROM embedding ORDER BY used_at LIMIT ?)",
+                        (count - self.max_size,),
+                    )
+                self.count = min(count, self.max_size)
+
+    async def get_embeddings(
+        self,
+        engine: str,
+        model: str,
+        texts: list[str],
+        prefix: Optional[str],
+        embed: Callable[[list[str]], Awaitable[Optional[list]]],
+        url: Optional[str] = None,
+        azure_api_version: Optional[str] = None,
+    ) -> Optional[list]:
+        keys = [
+            get_embedding_cache_key(engine, model, prefix, text, url, azure_api_version)
+            for text in texts
+        ]
+
+        try:
+            embeddings = self.get(list(dict.fromkeys(keys)))
+        except Exception as e:
+            log.warning(f"Failed to read stored embeddings: {e}")
+            embeddings = {}
+
+        texts_by_key = dict(zip(keys, texts))
+        missing = [key for key in texts_by_key if key not in embeddings]
+        log.info(f"embedding store: {len(embeddings)} stored, {len(missing)} new")
+
+        if missing:
+            results = await embed([texts_by_key[key] for key in missing])
+            if not results or len(results) != len(missing):
+                return results
+
+            # A failing store only costs re-embedding next time
+            new_embeddings = dict(zip(missing, results))
+            try:
+                self.set(new_embeddings)
+            except Exception as e:
+                log.warning(f"Failed to store embeddings: {e}")
+            embeddings.update(new_embeddings)
+
+        return [embeddings[key] for key in keys]
+
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(
+        max_size=RAG_EMBEDDING_CACHE_MAX_SIZE,
+        redis=(
+            get_redis_client(async_mode=True)
+            if ENABLE_RAG_EMBEDDING_CACHE_REDIS
+            else None
+        ),
+        redis_ttl=RAG_EMBEDDING_CACHE_REDIS_TTL,
+    )
+    if RAG_EMBEDDING_CACHE_MAX_SIZE > 0
+    else None
+)
+
+EMBEDDING_STORE = (
+    EmbeddingStore(RAG_EMBEDDING_STORE_PATH, max_size=RAG_EMBEDDING_STORE_MAX_SIZE)
+    if ENABLE_RAG_EMBEDDING_STORE
+    else None
+)
@@ -1,23 +1,26 @@
 import logging
 import os
-from typing import Awaitable, Optional, Union
+from typing import Awaitable, Optional, Sequence, Union
 
 import requests
-import aiohttp
 import asyncio
 import hashlib
+import operator
 from concurrent.futures import ThreadPoolExecutor
 import time
 import re
+from collections import defaultdict
 
 from urllib.parse import quote
 from huggingface_hub import snapshot_download
-from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
+from langchain.retrievers import EnsembleRetriever
 from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE, EmbeddingCache
+from open_webui.retrieval.vector.bm25 import get_enriched_text
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT, BM25_INDEX
 
 
 from open_webui.models.users import UserModel
@@ -28,9 +31,11 @@ from open_webui.models.chats import Chats
 from open_webui.models.notes import Notes
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.models.base_reranker import BaseReranker
 from open_webui.utils.access_control import has_access
 from open_webui.utils.headers import include_user_info_headers
 from open_webui.utils.misc import get_message_list
+from open_webui.utils.session_pool import HTTP_SESSION_POOL
 
 from open_webui.retrieval.web.utils import get_web_loader
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
@@ -45,6 +50,7 @@ from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    RAG_RERANKING_BATCH_SIZE,
 )
 
 log = logging.getLogger(__name__)
@@ -132,6 +138,43 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25IndexRetriever(BaseRetriever):
+    collection_name: Any
+    top_k: int
+    enable_enriched_texts: bool = False
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return [
+            Document(metadata=metadata, page_content=text)
+            for text, metadata, _ in BM25_INDEX.search(
+                self.collection_name,
+                query,
+                k=self.top_k,
+                enriched=self.enable_enriched_texts,
+            )
+        ]
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return await asyncio.to_thread(
+            self._get_relevant_documents, query, run_manager=run_manager
+        )
+
+
+def build_bm25_index(collection_name: str) -> int:
+    """Index the collection for BM25 on first use, returns its document count."""
+    return BM25_INDEX.build(
+        collection_name,
+        lambda: VECTOR_DB_CLIENT.get(collection_name=collection_name),
+    )
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -167,76 +210,51 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 
 def get_enriched_texts(collection_result: GetResult) -> list[str]:
-    enriched_texts = []
-    for idx, text in enumerate(collection_result.documents[0]):
-        metadata = collection_result.metadatas[0][idx]
-        metadata_parts = [text]
-
-        # Add filename (repeat twice for extra weight in BM25 scoring)
-        if metadata.get("name"):
-            filename = metadata["name"]
-            filename_tokens = (
-                filename.replace("_", " ").replace("-", " ").replace(".", " ")
-            )
-            metadata_parts.append(
-                f"Filename: {filename} {filename_tokens} {filename_tokens}"
-            )
-
-        # Add title if available
-        if metadata.get("title"):
-            metadata_parts.append(f"Title: {metadata['title']}")
-
-        # Add document section headings if available (from markdown splitter)
-        if metadata.get("headings") and isinstance(metadata["headings"], list):
-            headings = " > ".join(str(h) for h in metadata["headings"])
-            metadata_parts.append(f"Section: {headings}")
-
-        # Add source URL/path if available
-        if metadata.get("source"):
-            metadata_parts.append(f"Source: {metadata['source']}")
-
-        # Add snippet for web search results
-        if metadata.get("snippet"):
-            metadata_parts.append(f"Snippet: {metadata['snippet']}")
-
-        enriched_texts.append(" ".join(metadata_parts))
-
-    return enriched_texts
+    return [
+        get_enriched_text(text, collection_result.metadatas[0][idx])
+        for idx, text in enumerate(collection_result.documents[0])
+    ]
 
 
-async def query_doc_with_hybrid_search(
+async def get_hybrid_search_candidates(
     collection_name: str,
-    collection_result: GetResult,
+    collection_result: Optional[GetResult],
     query: str,
     embedding_function,
     k: int,
-    reranking_function,
-    k_reranker: int,
-    r: float,
     hybrid_bm25_weight: float,
     enable_enriched_texts: bool = False,
-) -> dict:
-    try:
-        # First check if collection_result has the required attributes
-        if (
-            not collection_result
-            or not hasattr(collection_result, "documents")
-            or not hasattr(collection_result, "metadatas")
-        ):
+) -> Optional[list[Document]]:
+    """BM25 and vector search candidates before reranking, None if the collection is empty."""
+    if BM25_INDEX:
+        # Only the postings of the query terms are read from the index
+        if not await asyncio.to_thread(build_bm25_index, collection_name):
             log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
-            return {"documents": [], "metadatas": [], "distances": []}
-
-        # Now safely check the documents content after confirming attributes exist
-        if (
-            not collection_result.documents
-            or len(collection_result.documents) == 0
-            or not collection_result.documents[0]
-        ):
-            log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
-            return {"documents": [], "metadatas": [], "distances": []}
+            return None
 
-        log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
+        bm25_retriever = BM25IndexRetriever(
+            collection_name=collection_name,
+            top_k=k,
+            enable_enriched_texts=enable_enriched_texts,
+        )
+    # First check if collection_result has the required attributes
+    elif (
+        not collection_result
+        or not hasattr(collection_result, "documents")
+        or not hasattr(collection_result, "metadatas")
+    ):
+        log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+        return None
 
+    # Now safely check the documents content after confirming attributes exist
+    elif (
+        not collection_result.documents
+        or len(collection_result.documents) == 0
+        or not collection_result.documents[0]
+    ):
+        log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+        return None
+    else:
         bm25_texts = (
             get_enriched_texts(collection_result)
             if enable_enriched_texts
@@ -249,60 +267,161 @@ async def query_doc_with_hybrid_search(
         )
         bm25_retriever.k = k
 
-        vector_search_retriever = VectorSearchRetriever(
-            collection_name=collection_name,
-            embedding_function=embedding_function,
-            top_k=k,
+    log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
+
+    vector_search_retriever = VectorSearchRetriever(
+        collection_name=collection_name,
+        embedding_function=embedding_function,
+        top_k=k,
+    )
+
+    if hybrid_bm25_weight <= 0:
+        ensemble_retriever = EnsembleRetriever(
+            retrievers=[vector_search_retriever], weights=[1.0]
+        )
+    elif hybrid_bm25_weight >= 1:
+        ensemble_retriever = EnsembleRetriever(
+            retrievers=[bm25_retriever], weights=[1.0]
+        )
+    else:
+        ensemble_retriever = EnsembleRetriever(
+            retrievers=[bm25_retriever, vector_search_retriever],
+            weights=[hybrid_bm25_weight, 1.0 - hybrid_bm25_weight],
         )
 
-        if hybrid_bm25_weight <= 0:
-            ensemble_retriever = EnsembleRetriever(
-                retrievers=[vector_search_retriever], weights=[1.0]
-            )
-        elif hybrid_bm25_weight >= 1:
-            ensemble_retriever = EnsembleRetriever(
-                retrievers=[bm25_retriever], weights=[1.0]
-            )
-        else:
-            ensemble_retriever = EnsembleRetriever(
-                retrievers=[bm25_retriever, vector_search_retriever],
-                weights=[hybrid_bm25_weight, 1.0 - hybrid_bm25_weight],
-            )
+    return await ensemble_retriever.ainvoke(query)
 
-        compressor = RerankCompressor(
-            embedding_function=embedding_function,
-            top_n=k_reranker,
-            reranking_function=reranking_function,
-            r_score=r,
+
+async def get_rerank_scores(
+    queries: list[str],
+    documents: list[Document],
+    embedding_function,
+    reranking_function,
+) -> Optional[list[float]]:
+    """
+    Score each (queries[i], documents[i]) pair in one batched pass, with the
+    reranking model off the event loop or, without one, by cosine similarity.
+    """
+    if not documents:
+        return []
+
+    if reranking_function is not None:
+        scores = await asyncio.to_thread(reranking_function, queries, documents)
+    else:
+        from sentence_transformers import util
+
+        unique_queries = list(dict.fromkeys(queries))
+        unique_contents = list(dict.fromkeys(doc.page_content for doc in documents))
+
+        query_embeddings = await embedding_function(
+            unique_queries, RAG_EMBEDDING_QUERY_PREFIX
         )
+        document_embeddings = await embedding_function(
+            unique_contents, RAG_EMBEDDING_CONTENT_PREFIX
+        )
+        similarities = util.cos_sim(query_embeddings, document_embeddings)
+
+        query_indices = {query: idx for idx, query in enumerate(unique_queries)}
+        content_indices = {content: idx for idx, content in enumerate(unique_contents)}
+        scores = [
+            similarities[query_indices[query]][content_indices[doc.page_content]]
+            for query, doc in zip(queries, documents)
+        ]
+        scores = [float(score) for score in scores]
 
-        compression_retriever = ContextualCompressionRetriever(
-            base_compressor=compressor, base_retriever=ensemble_retriever
+    if scores is None:
+        return None
+    return scores.tolist() if not isinstance(scores, list) else scores
+
+
+def get_reranked_documents(
+    documents: Sequence[Document],
+    scores: Optional[list[float]],
+    top_n: int,
+    r_score: float,
+) -> Sequence[Document]:
+    if scores is None:
+        log.warning(
+            "No valid scores found, check your reranking function. Returning original documents."
         )
+        return documents
 
-        result = await compression_retriever.ainvoke(query)
+    docs_with_scores = list(zip(documents, scores))
+    if r_score:
+        docs_with_scores = [(d, s) for d, s in docs_with_scores if s >= r_score]
 
-        distances = [d.metadata.get("score") for d in result]
-        documents = [d.page_content for d in result]
-        metadatas = [d.metadata for d in result]
+    result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
+    return [
+        # Candidates can be shared between collections and queries, don't annotate in place
+        Document(
+            page_content=doc.page_content, metadata={**doc.metadata, "score": score}
+        )
+        for doc, score in result[:top_n]
+    ]
 
-        # retrieve only min(k, k_reranker) items, sort and cut by distance if k < k_reranker
-        if k < k_reranker:
-            sorted_items = sorted(
-                zip(distances, metadatas, documents), key=lambda x: x[0], reverse=True
-            )
-            sorted_items = sorted_items[:k]
 
-            if sorted_items:
-                distances, documents, metadatas = map(list, zip(*sorted_items))
-            else:
-                distances, documents, metadatas = [], [], []
+def get_hybrid_search_result(
+    documents: Sequence[Document], k: int, k_reranker: int
+) -> dict:
+    distances = [d.metadata.get("score") for d in documents]
+    metadatas = [d.metadata for d in documents]
+    documents = [d.page_content for d in documents]
+
+    # retrieve only min(k, k_reranker) items, sort and cut by distance if k < k_reranker
+    if k < k_reranker:
+        sorted_items = sorted(
+            zip(distances, documents, metadatas), key=lambda x: x[0], reverse=True
+        )
+        sorted_items = sorted_items[:k]
+
+        if sorted_items:
+            distances, documents, metadatas = map(list, zip(*sorted_items))
+        else:
+            distances, documents, metadatas = [], [], []
+
+    return {
+        "distances": [distances],
+        "documents": [documents],
+        "metadatas": [metadatas],
+    }
 
-        result = {
-            "distances": [distances],
-            "documents": [documents],
-            "metadatas": [metadatas],
-        }
+
+async def query_doc_with_hybrid_search(
+    collection_name: str,
+    collection_result: Optional[GetResult],
+    query: str,
+    embedding_function,
+    k: int,
+    reranking_function,
+    k_reranker: int,
+    r: float,
+    hybrid_bm25_weight: float,
+    enable_enriched_texts: bool = False,
+) -> dict:
+    try:
+        documents = await get_hybrid_search_candidates(
+            collection_name=collection_name,
+            collection_result=collection_result,
+            query=query,
+            embedding_function=embedding_function,
+            k=k,
+            hybrid_bm25_weight=hybrid_bm25_weight,
+            enable_enriched_texts=enable_enriched_texts,
+        )
+        if documents is None:
+            return {"documents": [], "metadatas": [], "distances": []}
+
+        scores = await get_rerank_scores(
+            [query] * len(documents),
+            documents,
+            embedding_function,
+            reranking_function,
+        )
+        result = get_hybrid_search_result(
+            get_reranked_documents(documents, scores, k_reranker, r),
+            k,
+            k_reranker,
+        )
 
         log.info(
             "query_doc_with_hybrid_search:result "
@@ -468,8 +587,13 @@ async def query_collection_with_hybrid_search(
     error = False
     # Fetch collection data once per collection sequentially
     # Avoid fetching the same data multiple times later
+    # Not needed with the BM25 index, which is built on first use
     collection_results = {}
     for collection_name in collection_names:
+        if BM25_INDEX:
+            collection_results[collection_name] = None
+            continue
+
         try:
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
@@ -487,19 +611,16 @@ async def query_collection_with_hybrid_search(
 
     async def process_query(collection_name, query):
         try:
-            result = await query_doc_with_hybrid_search(
+            documents = await get_hybrid_search_candidates(
                 collection_name=collection_name,
                 collection_result=collection_results[collection_name],
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
-                reranking_function=reranking_function,
-                k_reranker=k_reranker,
-                r=r,
                 hybrid_bm25_weight=hybrid_bm25_weight,
                 enable_enriched_texts=enable_enriched_texts,
             )
-            return result, None
+            return documents, None
         except Exception as e:
             log.exception(f"Error when querying the collection with hybrid_search: {e}")
             return None, e
@@ -509,7 +630,7 @@ async def query_collection_with_hybrid_search(
     tasks = [
         (collection_name, query)
         for collection_name in collection_names
-        if collection_results[collection_name] is not None
+        if BM25_INDEX or collection_results[collection_name] is not None
         for query in queries
     ]
 
@@ -518,11 +639,41 @@ async def query_collection_with_hybrid_search(
         *[process_query(collection_name, query) for collection_name, query in tasks]
     )
 
-    for result, err in task_results:
+    # Rerank the candidates of all collections and queries in a single pass,
+    # scoring every distinct (query, document) pair once
+    pairs = {}
+    for (_, query), (documents, _) in zip(tasks, task_results):
+        for doc in documents or []:
+            pairs.setdefault((query, doc.page_content), doc)
+
+    scores = await get_rerank_scores(
+        [query for query, _ in pairs],
+        list(pairs.values()),
+        embedding_function,
+        reranking_function,
+    )
+    pair_scores = dict(zip(pairs, scores)) if scores is not None else None
+
+    for (_, query), (documents, err) in zip(tasks, task_results):
         if err is not None:
             error = True
-        elif result is not None:
-            results.append(result)
+        elif documents is not None:
+            results.append(
+                get_hybrid_search_result(
+                    get_reranked_documents(
+                        documents,
+                        (
+                            [pair_scores[(query, d.page_content)] for d in documents]
+                            if pair_scores is not None
+                            else None
+                        ),
+                        k_reranker,
+                        r,
+                    ),
+                    k,
+                    k_reranker,
+                )
+            )
 
     if error and not results:
         raise Exception(
@@ -594,16 +745,16 @@ async def agenerate_openai_batch_embeddings(
         if ENABLE_FORWARD_USER_INFO_HEADERS and user:
             headers = include_user_info_headers(headers, user)
 
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            async with session.post(
-                f"{url}/embeddings", headers=headers, json=form_data
-            ) as r:
-                r.raise_for_status()
-                data = await r.json()
-                if "data" in data:
-                    return [item["embedding"] for item in data["data"]]
-                else:
-                    raise Exception("Something went wrong :/")
+        session = HTTP_SESSION_POOL.get_session(url)
+        async with session.post(
+            f"{url}/embeddings", headers=headers, json=form_data
+        ) as r:
+            r.raise_for_status()
+            data = await r.json()
+            if "data" in data:
+                return [item["embedding"] for item in data["data"]]
+            else:
+                raise Exception("Something went wrong :/")
     except Exception as e:
         log.exception(f"Error generating openai batch embeddings: {e}")
         return None
@@ -683,14 +834,14 @@ async def agenerate_azure_openai_batch_embeddings(
         if ENABLE_FORWARD_USER_INFO_HEADERS and user:
             headers = include_user_info_headers(headers, user)
 
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            async with session.post(full_url, headers=headers, json=form_data) as r:
-                r.raise_for_status()
-                data = await r.json()
-                if "data" in data:
-                    return [item["embedding"] for item in data["data"]]
-                else:
-                    raise Exception("Something went wrong :/")
+        session = HTTP_SESSION_POOL.get_session(full_url)
+        async with session.post(full_url, headers=headers, json=form_data) as r:
+            r.raise_for_status()
+            data = await r.json()
+            if "data" in data:
+                return [item["embedding"] for item in data["data"]]
+            else:
+                raise Exception("Something went wrong :/")
     except Exception as e:
         log.exception(f"Error generating azure openai batch embeddings: {e}")
         return None
@@ -759,16 +910,16 @@ async def agenerate_ollama_batch_embeddings(
         if ENABLE_FORWARD_USER_INFO_HEADERS and user:
             headers = include_user_info_headers(headers, user)
 
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            async with session.post(
-                f"{url}/api/embed", headers=headers, json=form_data
-            ) as r:
-                r.raise_for_status()
-                data = await r.json()
-                if "embeddings" in data:
-                    return data["embeddings"]
-                else:
-                    raise Exception("Something went wrong :/")
+        session = HTTP_SESSION_POOL.get_session(url)
+        async with session.post(
+            f"{url}/api/embed", headers=headers, json=form_data
+        ) as r:
+            r.raise_for_status()
+            data = await r.json()
+            if "embeddings" in data:
+                return data["embeddings"]
+            else:
+                raise Exception("Something went wrong :/")
     except Exception as e:
         log.exception(f"Error generating ollama batch embeddings: {e}")
         return None
@@ -783,6 +934,7 @@ def get_embedding_function(
     embedding_batch_size,
     azure_api_version=None,
     enable_async=True,
+    cache: Optional[EmbeddingCache] = EMBEDDING_CACHE,
 ) -> Awaitable:
     if embedding_engine == "":
         # Sentence transformers: CPU-bound sync operation
@@ -797,7 +949,6 @@ def get_embedding_function(
                 prefix,
             )
 
-        return async_embedding_function
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
         embedding_function = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
@@ -851,10 +1002,29 @@ def get_embedding_function(
             else:
                 return await embedding_function(query, prefix, user)
 
-        return async_embedding_function
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
+    if cache is None:
+        return async_embedding_function
+
+    async def cached_embedding_function(query, prefix=None, user=None):
+        embeddings = await cache.get_embeddings(
+            embedding_engine,
+            embedding_model,
+            query if isinstance(query, list) else [query],
+            prefix,
+            lambda texts: async_embedding_function(texts, prefix=prefix, user=user),
+            url=url,
+            azure_api_version=azure_api_version,
+        )
+
+        if isinstance(query, list) or not embeddings:
+            return embeddings
+        return embeddings[0]
+
+    return cached_embedding_function
+
 
 async def generate_embeddings(
     engine: str,
@@ -907,14 +1077,47 @@ async def generate_embeddings(
 def get_reranking_function(reranking_engine, reranking_model, reranking_function):
     if reranking_function is None:
         return None
-    if reranking_engine == "external":
-        return lambda query, documents, user=None: reranking_function.predict(
-            [(query, doc.page_content) for doc in documents], user=user
-        )
-    else:
-        return lambda query, documents, user=None: reranking_function.predict(
-            [(query, doc.page_content) for doc in documents]
-        )
+
+    def predict(sentences, user=None):
+        if reranking_engine == "external":
+            return reranking_function.predict(sentences, user=user)
+        elif isinstance(reranking_function, BaseReranker):
+            return reranking_function.predict(sentences)
+        else:
+            return reranking_function.predict(
+                sentences, batch_size=RAG_RERANKING_BATCH_SIZE
+            )
+
+    def rerank(query, documents, user=None):
+        """
+        Score `documents` against `query`, or against `query[i]` when given a
+        list of queries, so pairs from several queries are scored in one call.
+        """
+        queries = [query] * len(documents) if isinstance(query, str) else query
+        sentences = [(q, doc.page_content) for q, doc in zip(queries, documents)]
+        if not sentences:
+            return []
+
+        if not isinstance(reranking_function, BaseReranker):
+            return predict(sentences, user=user)
+
+        # External and ColBERT rerankers take a single query per call
+        indices = defaultdict(list)
+        for idx, q in enumerate(queries):
+            indices[q].append(idx)
+
+        scores = [None] * len(sentences)
+        for q, idxs in indices.items():
+            q_scores = predict([sentences[idx] for idx in idxs], user=user)
+            if q_scores is None:
+                return None
+
+            for idx, score in zip(idxs, list(q_scores)):
+                scores[idx] = float(score)
+
+        return scores
+
+    return rerank
 
 
 async def get_sources_from_items(
@@ -1235,9 +1438,6 @@ def get_model_path(model: str, update_model: bool = False):
         return model
 
 
-import operator
-from typing import Optional, Sequence
-
 from langchain_core.callbacks import Callbacks
 from langchain_core.documents import BaseDocumentCompressor, Document
 
@@ -1277,47 +1477,10 @@ class RerankCompressor(BaseDocumentCompressor):
         query: str,
         callbacks: Optional[Callbacks] = None,
     ) -> Sequence[Document]:
-        reranking = self.reranking_function is not None
-
-        scores = None
-        if reranking:
-            scores = self.reranking_function(query, documents)
-        else:
-            from sentence_transformers import util
-
-            query_embedding = await self.embedding_function(
-                query, RAG_EMBEDDING_QUERY_PREFIX
-            )
-            document_embedding = await self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
-            )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
-
-        if scores is not None:
-            docs_with_scores = list(
-                zip(
-                    documents,
-                    scores.tolist() if not isinstance(scores, list) else scores,
-                )
-            )
-            if self.r_score:
-                docs_with_scores = [
-                    (d, s) for d, s in docs_with_scores if s >= self.r_score
-                ]
-
-            result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
-            final_results = []
-            for doc, doc_score in result[: self.top_n]:
-                metadata = doc.metadata
-                metadata["score"] = doc_score
-                doc = Document(
-                    page_content=doc.page_content,
-                    metadata=metadata,
-                )
-                final_results.append(doc)
-            return final_results
-        else:
-            log.warning(
-                "No valid scores found, check your reranking function. Returning original documents."
-            )
-            return documents
+        scores = await get_rerank_scores(
+            [query] * len(documents),
+            list(documents),
+            self.embedding_function,
+            self.reranking_function,
+        )
+        return get_reranked_documents(documents, scores, self.top_n, self.r_score)
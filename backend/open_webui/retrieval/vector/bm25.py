@@ -0,0 +1,621 @@
+import heapq
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    VectorItem,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Okapi BM25 parameters, same defaults as rank_bm25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Stay below SQLite's default limit on bound parameters
+MAX_QUERY_TERMS = 500
+
+# Seconds after which a build that never finished, e.g. because its process
+# died, is taken over, and between checks for builds of other processes
+BUILD_TIMEOUT = 600
+BUILD_POLL_INTERVAL = 0.1
+
+
+def tokenize(text: str) -> list[str]:
+    # Same as langchain's BM25Retriever default preprocessing
+    return text.split()
+
+
+def get_enriched_text(text: str, metadata: dict) -> str:
+    metadata_parts = [text]
+
+    # Add filename (repeat twice for extra weight in BM25 scoring)
+    if metadata.get("name"):
+        filename = metadata["name"]
+        filename_tokens = filename.replace("_", " ").replace("-", " ").replace(".", " ")
+        metadata_parts.append(
+            f"Filename: {filename} {filename_tokens} {filename_tokens}"
+        )
+
+    # Add title if available
+    if metadata.get("title"):
+        metadata_parts.append(f"Title: {metadata['title']}")
+
+    # Add document section headings if available (from markdown splitter)
+    if metadata.get("headings") and isinstance(metadata["headings"], list):
+        headings = " > ".join(str(h) for h in metadata["headings"])
+        metadata_parts.append(f"Section: {headings}")
+
+    # Add source URL/path if available
+    if metadata.get("source"):
+        metadata_parts.append(f"Source: {metadata['source']}")
+
+    # Add snippet for web search results
+    if metadata.get("snippet"):
+        metadata_parts.append(f"Snippet: {metadata['snippet']}")
+
+    return " ".join(metadata_parts)
+
+
+class BM25Index:
+    """
+    Persistent BM25 index over the documents of vector DB collections.
+
+    Postings are stored per (collection, term) in SQLite, so a query only
+    reads the postings of its own terms instead of scoring every document.
+    Term frequencies are kept both for the plain text and for the text
+    enriched with metadata (see `get_enriched_text`).
+
+    Collections are indexed on first use with `build` and then kept up to
+    date incrementally by `BM25IndexedVectorDB`.
+
+    Processes on a node share the file. A build marks the collection as
+    being built in the same transaction that checks whether it's indexed,
+    so writes from other processes made while it reads the collection are
+    queued and applied on top of what it read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.local = threading.local()
+        self.locks: dict[str, threading.RLock] = defaultdict(threading.RLock)
+        self.locks_lock = threading.Lock()
+
+        self.get_connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bm25_collection (
+                name TEXT PRIMARY KEY,
+                doc_count INTEGER NOT NULL,
+                total_length INTEGER NOT NULL,
+                total_enriched_length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bm25_document (
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                enriched_length INTEGER NOT NULL,
+                PRIMARY KEY (collection, id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS bm25_posting (
+                collection TEXT NOT NULL,
+                term TEXT NOT NULL,
+                id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                enriched_tf INTEGER NOT NULL,
+                PRIMARY KEY (collection, term, id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS bm25_build (
+                collection TEXT PRIMARY KEY,
+                id TEXT NOT NULL,
+                started_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bm25_pending (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                collection TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                payload TEXT NOT NULL
+            );
+            """
+        )
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def lock(self, collection_name: str) -> threading.RLock:
+        """Serializes builds and vector DB writes of a collection within this process."""
+        with self.locks_lock:
+            return self.locks[collection_name]
+
+    def get_document_count(self, collection_name: str) -> Optional[int]:
+        """Number of indexed documents, or None if the collection isn't indexed."""
+        row = (
+            self.get_connection()
+            .execute(
+                "SELECT doc_count FROM bm25_collection WHERE name = ?",
+                (collection_name,),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def build(
+        self,
+        collection_name: str,
+        get_collection: Callable[[], Optional[GetResult]],
+    ) -> int:
+        """Index a collection from its full contents unless already indexed."""
+        with self.lock(collection_name):
+            build_id = str(uuid.uuid4())
+            while True:
+                with self.transaction() as conn:
+                    if self._has_collection(conn, collection_name):
+                        return self.get_document_count(collection_name)
+
+                    row = conn.execute(
+                        "SELECT started_at FROM bm25_build WHERE collection = ?",
+                        (collection_name,),
+                    ).fetchone()
+                    if row is None or row[0] < time.time() - BUILD_TIMEOUT:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO bm25_build VALUES (?, ?, ?)",
+                            (collection_name, build_id, time.time()),
+                        )
+                        conn.execute(
+                            "DELETE FROM bm25_pending WHERE collection = ?",
+                            (collection_name,),
+                        )
+                        break
+
+                # Being built by another process
+                time.sleep(BUILD_POLL_INTERVAL)
+
+            log.info(f"Building BM25 index for collection {collection_name}")
+            try:
+                result = get_collection()
+            except Exception:
+                with self.transaction() as conn:
+                    self._end_build(conn, collection_name, build_id)
+                raise
+
+            items = []
+            if result and result.ids:
+                items = list(
+                    zip(result.ids[0], result.documents[0], result.metadatas[0])
+                )
+
+            with self.transaction() as conn:
+                # Taken over after BUILD_TIMEOUT, leave it to the new build
+                if self._end_build(conn, collection_name, build_id):
+                    pending = conn.execute(
+                        "SELECT operation, payload FROM bm25_pending "
+                        "WHERE collection = ? ORDER BY seq",
+                        (collection_name,),
+                    ).fetchall()
+                    conn.execute(
+                        "DELETE FROM bm25_pending WHERE collection = ?",
+                        (collection_name,),
+                    )
+
+                    self._delete_collection(conn, collection_name)
+                    conn.execute(
+                        "INSERT INTO bm25_collection VALUES (?, 0, 0, 0)",
+                        (collection_name,),
+                    )
+                    self._add(conn, collection_name, items)
+
+                    # Writes made while the collection was read
+                    for operation, payload in pending:
+                        self._apply(
+                            conn, collection_name, operation, json.loads(payload)
+                        )
+
+            return self.get_document_count(collection_name) or 0
+
+    def add(self, collection_name: str, items: list[tuple[str, str, dict]]):
+        """Add or replace (id, text, metadata) items of an indexed collection."""
+        self._write(collection_name, "add", {"items": items})
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ):
+        self._write(collection_name, "delete", {"ids": ids, "filter": filter})
+
+    def delete_collection(self, collection_name: str):
+        self._write(collection_name, "delete_collection", {})
+
+    def reset(self):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM bm25_posting")
+            conn.execute("DELETE FROM bm25_document")
+            conn.execute("DELETE FROM bm25_collection")
+            conn.execute("DELETE FROM bm25_build")
+            conn.execute("DELETE FROM bm25_pending")
+
+    def search(
+        self,
+        collection_name: str,
+        query: str,
+        k: int,
+        enriched: bool = False,
+    ) -> list[tuple[str, dict, float]]:
+        """Top `k` (text, metadata, score) documents for `query`."""
+        conn = self.get_connection()
+
+        stats = conn.execute(
+            "SELECT doc_count, total_length, total_enriched_length "
+            "FROM bm25_collection WHERE name = ?",
+            (collection_name,),
+        ).fetchone()
+        if not stats or not stats[0]:
+            return []
+
+        doc_count = stats[0]
+        avg_length = (stats[2] if enriched else stats[1]) / doc_count or 1
+
+        tf_column, length_column = (
+            ("enriched_tf", "enriched_length") if enriched else ("tf", "length")
+        )
+
+        # term -> [(id, tf, document length)]
+        postings = defaultdict(list)
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if terms:
+            rows = conn.execute(
+                f"SELECT p.term, p.id, p.{tf_column}, d.{length_column} "
+                "FROM bm25_posting p JOIN bm25_document d "
+                "ON d.collection = p.collection AND d.id = p.id "
+                f"WHERE p.collection = ? AND p.{tf_column} > 0 "
+                f"AND p.term IN ({', '.join('?' * len(terms))})",
+                [collection_name, *terms],
+            )
+            for term, id, tf, length in rows:
+                postings[term].append((id, tf, length))
+
+        scores = defaultdict(float)
+        for term_postings in postings.values():
+            df = len(term_postings)
+            idf = math.log((doc_count - df + 0.5) / (df + 0.5) + 1)
+
+            for id, tf, length in term_postings:
+                scores[id] += (
+                    idf
+                    * tf
+                    * (BM25_K1 + 1)
+                    / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                )
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        if not top:
+            return []
+
+        documents = {
+            id: (text, json.loads(metadata))
+            for id, text, metadata in conn.execute(
+                "SELECT id, text, metadata FROM bm25_document "
+                f"WHERE collection = ? AND id IN ({', '.join('?' * len(top))})",
+                [collection_name, *[id for id, _ in top]],
+            )
+        }
+
+        return [(*documents[id], score) for id, score in top if id in documents]
+
+    def _write(self, collection_name: str, operation: str, payload: dict):
+        with self.transaction() as conn:
+            if self._has_collection(conn, collection_name):
+                self._apply(conn, collection_name, operation, payload)
+            elif (
+                conn.execute(
+                    "SELECT 1 FROM bm25_build WHERE collection = ?",
+                    (collection_name,),
+                ).fetchone()
+                is not None
+            ):
+                # The build may have read the collection before this write
+                conn.execute(
+                    "INSERT INTO bm25_pending (collection, operation, payload) "
+                    "VALUES (?, ?, ?)",
+                    (collection_name, operation, json.dumps(payload, default=str)),
+                )
+
+    def _apply(
+        self,
+        conn: sqlite3.Connection,
+        collection_name: str,
+        operation: str,
+        payload: dict,
+    ):
+        if operation == "add":
+            items = payload["items"]
+            self._delete_ids(conn, collection_name, [id for id, _, _ in items])
+            self._add(conn, collection_name, items)
+        elif operation == "delete":
+            self._delete(conn, collection_name, payload["ids"], payload["filter"])
+        elif operation == "delete_collection":
+            self._delete_collection(conn, collection_name)
+
+    def _end_build(
+        self, conn: sqlite3.Connection, collection_name: str, build_id: str
+    ) -> bool:
+        """Remove the build's marker, False if another build took it over."""
+        return (
+            conn.execute(
+                "DELETE FROM bm25_build WHERE collection = ? AND id = ?",
+                (collection_name, build_id),
+            ).rowcount
+            > 0
+        )
+
+    def _delete(
+        self,
+        conn: sqlite3.Connection,
+        collection_name: str,
+        ids: Optional[List[str]],
+        filter: Optional[Dict],
+    ):
+        if filter:
+            # Equality on metadata fields, like the vector DB clients
+            conditions = " AND ".join("json_extract(metadata, ?) = ?" for _ in filter)
+            params = [collection_name]
+            for key, value in filter.items():
+                params.extend([f'$."{key}"', value])
+
+            rows = conn.execute(
+                f"SELECT id FROM bm25_document WHERE collection = ? AND {conditions}",
+                params,
+            ).fetchall()
+            ids = [row[0] for row in rows] + (ids or [])
+
+        if ids:
+            self._delete_ids(conn, collection_name, ids)
+
+    def _has_collection(self, conn: sqlite3.Connection, collection_name: str) -> bool:
+        return (
+            conn.execute(
+                "SELECT 1 FROM bm25_collection WHERE name = ?", (collection_name,)
+            ).fetchone()
+            is not None
+        )
+
+    def _add(
+        self,
+        conn: sqlite3.Connection,
+        collection_name: str,
+        items: list[tuple[str, str, dict]],
+    ):
+        documents = []
+        postings = []
+        total_length = 0
+        total_enriched_length = 0
+
+        # Last item wins for duplicate ids, as with the vector DB upsert
+        items = {id: (text, metadata) for id, text, metadata in items}
+        for id, (text, metadata) in items.items():
+            text = text or ""
+            metadata = metadata or {}
+
+            enriched_text = get_enriched_text(text, metadata)
+            tokens = tokenize(text)
+            tfs = Counter(tokens)
+            enriched_tokens, enriched_tfs = tokens, tfs
+            if enriched_text != text:
+                enriched_tokens = tokenize(enriched_text)
+                enriched_tfs = Counter(enriched_tokens)
+
+            documents.append(
+                (
+                    collection_name,
+                    id,
+                    text,
+                    json.dumps(metadata, default=str),
+                    len(tokens),
+                    len(enriched_tokens),
+                )
+            )
+            postings.extend(
+                (collection_name, term, id, tfs.get(term, 0), enriched_tf)
+                for term, enriched_tf in enriched_tfs.items()
+            )
+            total_length += len(tokens)
+            total_enriched_length += len(enriched_tokens)
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO bm25_document VALUES (?, ?, ?, ?, ?, ?)",
+            documents,
+        )
+        # In primary key order, so the B-tree is appended to rather than split
+        postings.sort()
+        conn.executemany(
+            "INSERT OR REPLACE INTO bm25_posting VALUES (?, ?, ?, ?, ?)", postings
+        )
+        conn.execute(
+            "UPDATE bm25_collection SET doc_count = doc_count + ?, "
+            "total_length = total_length + ?, "
+            "total_enriched_length = total_enriched_length + ? WHERE name = ?",
+            (len(documents), total_length, total_enriched_length, collection_name),
+        )
+
+    def _delete_ids(
+        self, conn: sqlite3.Connection, collection_name: str, ids: list[str]
+    ):
+        ids = list(dict.fromkeys(ids))
+        for i in range(0, len(ids), MAX_QUERY_TERMS):
+            batch = ids[i : i + MAX_QUERY_TERMS]
+            placeholders = ", ".join("?" * len(batch))
+
+            rows = conn.execute(
+                "SELECT id, text, metadata, length, enriched_length "
+                f"FROM bm25_document WHERE collection = ? AND id IN ({placeholders})",
+                [collection_name, *batch],
+            ).fetchall()
+            if not rows:
+                continue
+
+            # Postings are keyed by term, so look them up from the document's
+            # terms rather than keeping a second index on id
+            conn.executemany(
+                "DELETE FROM bm25_posting WHERE collection = ? AND term = ? AND id = ?",
+                [
+                    (collection_name, term, id)
+                    for id, text, metadata, _, _ in rows
+                    for term in set(
+                        tokenize(get_enriched_text(text, json.loads(metadata)))
+                    )
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM bm25_document WHERE collection = ? AND id = ?",
+                [(collection_name, row[0]) for row in rows],
+            )
+            conn.execute(
+                "UPDATE bm25_collection SET doc_count = doc_count - ?, "
+                "total_length = total_length - ?, "
+                "total_enriched_length = total_enriched_length - ? WHERE name = ?",
+                (
+                    len(rows),
+                    sum(row[3] for row in rows),
+                    sum(row[4] for row in rows),
+                    collection_name,
+                ),
+            )
+
+    def _delete_collection(self, conn: sqlite3.Connection, collection_name: str):
+        conn.execute(
+            "DELETE FROM bm25_posting WHERE collection = ?", (collection_name,)
+        )
+        conn.execute(
+            "DELETE FROM bm25_document WHERE collection = ?", (collection_name,)
+        )
+        conn.execute("DELETE FROM bm25_collection WHERE name = ?", (collection_name,))
+
+
+class BM25IndexedVectorDB(VectorDBBase):
+    """
+    Vector DB client that keeps the `BM25Index` of every indexed collection
+    in sync with the writes going through it.
+
+    If updating the index fails, the collection is dropped from the index
+    and gets rebuilt from the vector DB on its next hybrid search.
+    """
+
+    def __init__(self, client: VectorDBBase, index: BM25Index):
+        self.client = client
+        self.index = index
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _sync(self, collection_name: str, update: Callable):
+        try:
+            update()
+        except Exception as e:
+            log.exception(f"Failed to update BM25 index of {collection_name}: {e}")
+            try:
+                self.index.delete_collection(collection_name)
+            except Exception as e:
+                log.exception(f"Failed to drop BM25 index of {collection_name}: {e}")
+
+    def _write(self, collection_name: str, items: List[VectorItem], write: Callable):
+        with self.index.lock(collection_name):
+            write(collection_name=collection_name, items=items)
+            self._sync(
+                collection_name,
+                lambda: self.index.add(
+                    collection_name,
+                    [
+                        (item["id"], item["text"], item["metadata"])
+                        for item in (
+                            item.model_dump() if isinstance(item, VectorItem) else item
+                            for item in items
+                        )
+                    ],
+                ),
+            )
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self.client.has_collection(collection_name=collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        with self.index.lock(collection_name):
+            self.client.delete_collection(collection_name=collection_name)
+            self._sync(
+                collection_name, lambda: self.index.delete_collection(collection_name)
+            )
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._write(collection_name, items, self.client.insert)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._write(collection_name, items, self.client.upsert)
+
+    def search(
+        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+    ) -> Optional[SearchResult]:
+        return self.client.search(
+            collection_name=collection_name, vectors=vectors, limit=limit
+        )
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return self.client.query(
+            collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self.client.get(collection_name=collection_name)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        with self.index.lock(collection_name):
+            self.client.delete(collection_name=collection_name, ids=ids, filter=filter)
+            self._sync(
+                collection_name,
+                lambda: self.index.delete(collection_name, ids=ids, filter=filter),
+            )
+
+    def reset(self) -> None:
+        self.client.reset()
+        self.index.reset()
@@ -0,0 +1,275 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Union
+
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    VectorItem,
+)
+from open_webui.config import RAG_COLLECTION_CACHE_MAX_SIZE, RAG_COLLECTION_CACHE_TTL
+from open_webui.env import REDIS_KEY_PREFIX, SRC_LOG_LEVELS
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def get_result_size(result: Optional[GetResult]) -> int:
+    """Rough size of a result in bytes, used for the cache's memory budget."""
+    if not result or not result.ids:
+        return 0
+
+    return (
+        sum(len(id) for id in result.ids[0])
+        + sum(len(document or "") for document in (result.documents or [[]])[0])
+        + sum(len(str(metadata)) for metadata in (result.metadatas or [[]])[0])
+    )
+
+
+def copy_result(result: Optional[GetResult]) -> Optional[GetResult]:
+    # Callers may annotate metadata (e.g. rerank scores), keep the cached one intact
+    if not result or not result.metadatas:
+        return result
+
+    return GetResult(
+        ids=result.ids,
+        documents=result.documents,
+        metadatas=[[dict(metadata or {}) for metadata in result.metadatas[0]]],
+    )
+
+
+class CollectionCache:
+    """
+    LRU cache of full collection contents, as returned by `VectorDBBase.get`.
+
+    Every collection has a version counter bumped on writes. A result is only
+    cached if the version didn't change while it was being read, so a write
+    racing with a read can't leave stale contents behind. With Redis, the
+    versions are shared between instances and re-read at most once per
+    `sync_interval` seconds, so writes made elsewhere are seen too. Entries
+    also expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: int,
+        redis=None,
+        sync_interval: float = 1.0,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis = redis
+        self.sync_interval = sync_interval
+
+        # collection_name -> (version, expires_at, size, result)
+        self.entries: OrderedDict[str, tuple] = OrderedDict()
+        self.versions: dict[str, int] = {}
+        # collection_name -> (shared versions, expires_at)
+        self.redis_versions: dict[str, tuple] = {}
+        # Bumped on writes, so versions read before them aren't kept
+        self.redis_generation = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_redis_key(self, collection_name: Optional[str] = None) -> str:
+        # Without a collection, the version bumped when everything is reset
+        key = f"{REDIS_KEY_PREFIX}:rag:collections:version"
+        return f"{key}:{collection_name}" if collection_name else key
+
+    def get_redis_version(self, collection_name: str) -> tuple:
+        # Called without holding the lock, so Redis round trips don't block
+        # other threads reading the cache
+        if self.redis is None:
+            return ()
+
+        now = time.monotonic()
+        redis_version = self.redis_versions.get(collection_name)
+        if redis_version is not None and now < redis_version[1]:
+            return redis_version[0]
+
+        generation = self.redis_generation
+        try:
+            version = (
+                self.redis.get(self.get_redis_key()),
+                self.redis.get(self.get_redis_key(collection_name)),
+            )
+        except Exception as e:
+            log.warning(f"Failed to read collection version from Redis: {e}")
+            # Without the shared version, don't trust anything cached
+            version = (object(),)
+
+        with self.lock:
+            # Don't keep what was read before a write from this instance
+            if generation == self.redis_generation:
+                self.redis_versions[collection_name] = (
+                    version,
+                    now + self.sync_interval,
+                )
+        return version
+
+    def get(
+        self,
+        collection_name: str,
+        get_collection: Callable[[], Optional[GetResult]],
+    ) -> Optional[GetResult]:
+        redis_version = self.get_redis_version(collection_name)
+        with self.lock:
+            version = (self.versions.get(collection_name, 0), *redis_version)
+            entry = self.entries.get(collection_name)
+
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                self.entries.move_to_end(collection_name)
+                self.hits += 1
+                return copy_result(entry[3])
+
+            self.misses += 1
+
+        result = get_collection()
+        size = get_result_size(result)
+
+        redis_version = self.get_redis_version(collection_name)
+        with self.lock:
+            if (self.versions.get(collection_name, 0), *redis_version) == version:
+                self._remove(collection_name)
+
+                if size <= self.max_size:
+                    self.entries[collection_name] = (
+                        version,
+                        time.monotonic() + self.ttl,
+                        size,
+                        result,
+                    )
+                    self.size += size
+                    self._evict()
+
+        return copy_result(result)
+
+    def invalidate(self, collection_name: str):
+        with self.lock:
+            self.versions[collection_name] = self.versions.get(collection_name, 0) + 1
+            self._remove(collection_name)
+
+        self._bump_redis_version(collection_name)
+
+    def clear(self):
+        with self.lock:
+            for collection_name in set(self.versions) | set(self.entries):
+                self.versions[collection_name] = (
+                    self.versions.get(collection_name, 0) + 1
+                )
+            self.entries.clear()
+            self.size = 0
+
+        self._bump_redis_version()
+
+    def _bump_redis_version(self, collection_name: Optional[str] = None):
+        if self.redis is None:
+            return
+
+        try:
+            self.redis.incr(self.get_redis_key(collection_name))
+        except Exception as e:
+            log.warning(f"Failed to update collection version in Redis: {e}")
+
+        with self.lock:
+            self.redis_generation += 1
+            if collection_name:
+                self.redis_versions.pop(collection_name, None)
+            else:
+                self.redis_versions.clear()
+
+    def _remove(self, collection_name: str):
+        entry = self.entries.pop(collection_name, None)
+        if entry:
+            self.size -= entry[2]
+
+    def _evict(self):
+        while self.size > self.max_size and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.size -= entry[2]
+            self.evictions += 1
+
+
+class CachedVectorDB(VectorDBBase):
+    """Vector DB client serving `get` from a `CollectionCache`."""
+
+    def __init__(self, client: VectorDBBase, cache: CollectionCache):
+        self.client = client
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self.client.has_collection(collection_name=collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        try:
+            self.client.delete_collection(collection_name=collection_name)
+        finally:
+            self.cache.invalidate(collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            self.client.insert(collection_name=collection_name, items=items)
+        finally:
+            self.cache.invalidate(collection_name)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            self.client.upsert(collection_name=collection_name, items=items)
+        finally:
+            self.cache.invalidate(collection_name)
+
+    def search(
+        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+    ) -> Optional[SearchResult]:
+        return self.client.search(
+            collection_name=collection_name, vectors=vectors, limit=limit
+        )
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return self.client.query(
+            collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self.cache.get(
+            collection_name,
+            lambda: self.client.get(collection_name=collection_name),
+        )
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        try:
+            self.client.delete(collection_name=collection_name, ids=ids, filter=filter)
+        finally:
+            self.cache.invalidate(collection_name)
+
+    def reset(self) -> None:
+        try:
+            self.client.reset()
+        finally:
+            self.cache.clear()
+
+
+COLLECTION_CACHE = CollectionCache(
+    max_size=RAG_COLLECTION_CACHE_MAX_SIZE,
+    ttl=RAG_COLLECTION_CACHE_TTL,
+    redis=get_redis_client(),
+)
@@ -1,7 +1,11 @@
+from open_webui.retrieval.vector.bm25 import BM25Index, BM25IndexedVectorDB
+from open_webui.retrieval.vector.cache import COLLECTION_CACHE, CachedVectorDB
 from open_webui.retrieval.vector.main import VectorDBBase
 from open_webui.retrieval.vector.type import VectorType
 from open_webui.config import (
     VECTOR_DB,
+    ENABLE_RAG_BM25_INDEX,
+    RAG_BM25_INDEX_PATH,
     ENABLE_QDRANT_MULTITENANCY_MODE,
     ENABLE_MILVUS_MULTITENANCY_MODE,
 )
@@ -76,3 +80,11 @@ class Vector:
 
 
 VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+
+BM25_INDEX = None
+if ENABLE_RAG_BM25_INDEX:
+    BM25_INDEX = BM25Index(RAG_BM25_INDEX_PATH)
+    VECTOR_DB_CLIENT = BM25IndexedVectorDB(VECTOR_DB_CLIENT, BM25_INDEX)
+
+if COLLECTION_CACHE.max_size > 0:
+    VECTOR_DB_CLIENT = CachedVectorDB(VECTOR_DB_CLIENT, COLLECTION_CACHE)
@@ -90,41 +90,46 @@ async def get_channels(request: Request, user=Depends(get_verified_user)):
         )
 
     channels = Channels.get_channels_by_user_id(user.id)
-    channel_list = []
-    for channel in channels:
-        last_message = Messages.get_last_message_by_channel_id(channel.id)
-        last_message_at = last_message.created_at if last_message else None
+    channel_ids = [channel.id for channel in channels]
 
-        channel_member = Channels.get_member_by_channel_and_user_id(channel.id, user.id)
-        unread_count = (
-            Messages.get_unread_message_count(
-                channel.id, user.id, channel_member.last_read_at
-            )
-            if channel_member
-            else 0
+    summaries = Messages.get_channel_summaries_by_channel_ids(channel_ids, user.id)
+    members = Channels.get_members_by_channel_ids(
+        [channel.id for channel in channels if channel.type == "dm"]
+    )
+    dm_user_ids = {
+        member.user_id
+        for channel_members in members.values()
+        for member in channel_members
+    }
+    dm_users = {
+        dm_user.id: UserIdNameStatusResponse(
+            **{
+                **dm_user.model_dump(),
+                "is_active": Users.is_active(dm_user.last_active_at),
+            }
         )
+        for dm_user in (
+            Users.get_users_by_user_ids(list(dm_user_ids)) if dm_user_ids else []
+        )
+    }
+
+    channel_list = []
+    for channel in channels:
+        summary = summaries.get(channel.id, {})
 
         user_ids = None
         users = None
         if channel.type == "dm":
-            user_ids = [
-                member.user_id
-                for member in Channels.get_members_by_channel_id(channel.id)
-            ]
-            users = [
-                UserIdNameStatusResponse(
-                    **{**user.model_dump(), "is_active": Users.is_user_active(user.id)}
-                )
-                for user in Users.get_users_by_user_ids(user_ids)
-            ]
+            user_ids = [member.user_id for member in members.get(channel.id, [])]
+            users = [dm_users[id] for id in user_ids if id in dm_users]
 
         channel_list.append(
             ChannelListItemResponse(
                 **channel.model_dump(),
                 user_ids=user_ids,
                 users=users,
-                last_message_at=last_message_at,
-                unread_count=unread_count,
+                last_message_at=summary.get("last_message_at"),
+                unread_count=summary.get("unread_count", 0),
             )
         )
 
@@ -671,7 +676,11 @@ class MessageUserResponse(MessageResponse):
 
 @router.get("/{id}/messages", response_model=list[MessageUserResponse])
 async def get_channel_messages(
-    id: str, skip: int = 0, limit: int = 50, user=Depends(get_verified_user)
+    id: str,
+    skip: int = 0,
+    limit: int = 50,
+    before_id: Optional[str] = None,
+    user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
     if not channel:
@@ -696,33 +705,8 @@ async def get_channel_messages(
             id, user.id
         )  # Ensure user is a member of the channel
 
-    message_list = Messages.get_messages_by_channel_id(id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        thread_replies = Messages.get_thread_replies_by_message_id(message.id)
-        latest_thread_reply_at = (
-            thread_replies[0].created_at if thread_replies else None
-        )
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": len(thread_replies),
-                    "latest_reply_at": latest_thread_reply_at,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    message_list = Messages.get_messages_by_channel_id(id, skip, limit, before_id)
+    return Messages.get_message_responses(message_list)
 
 
 ############################
@@ -760,25 +744,7 @@ async def get_pinned_channel_messages(
     limit = PAGE_ITEM_COUNT_PINNED
 
     message_list = Messages.get_pinned_messages_by_channel_id(id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        messages.append(
-            MessageWithReactionsResponse(
-                **{
-                    **message.model_dump(),
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    return Messages.get_message_responses(message_list, with_replies=False)
 
 
 ############################
@@ -1250,27 +1216,7 @@ async def get_channel_thread_messages(
             )
 
     message_list = Messages.get_messages_by_parent_id(id, message_id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": 0,
-                    "latest_reply_at": None,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    return Messages.get_message_responses(message_list, with_replies=False)
 
 
 ############################
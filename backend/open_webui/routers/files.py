@@ -2,6 +2,7 @@ import logging
 import os
 import uuid
 import json
+import time
 from fnmatch import fnmatch
 from pathlib import Path
 from typing import Optional
@@ -35,18 +36,23 @@ from open_webui.models.files import (
     Files,
 )
 from open_webui.models.knowledge import Knowledges
-from open_webui.models.groups import Groups
 
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
-from open_webui.routers.retrieval import ProcessFileForm, process_file
+from open_webui.routers.retrieval import (
+    ProcessFileForm,
+    process_file,
+    update_file_status_on_error,
+)
 from open_webui.routers.audio import transcribe
 
 from open_webui.storage.provider import Storage
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.file_status import FILE_STATUS
+from open_webui.utils.ingestion import INGESTION_QUEUE
+from open_webui.utils.access_control import has_access, get_user_group_ids
 
 from pydantic import BaseModel
 
@@ -74,7 +80,7 @@ def has_access_to_file(
         )
 
     knowledge_bases = Knowledges.get_knowledges_by_file_id(file_id)
-    user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user.id)}
+    user_group_ids = get_user_group_ids(user.id)
 
     for knowledge_base in knowledge_bases:
         if knowledge_base.user_id == user.id or has_access(
@@ -99,45 +105,47 @@ def has_access_to_file(
 ############################
 
 
-def process_uploaded_file(request, file, file_path, file_item, file_metadata, user):
-    try:
-        if file.content_type:
-            stt_supported_content_types = getattr(
-                request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
-            )
+def process_upload(request, content_type, file_path, file_item, file_metadata, user):
+    if content_type:
+        stt_supported_content_types = getattr(
+            request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
+        )
 
-            if any(
-                fnmatch(file.content_type, content_type)
-                for content_type in (
-                    stt_supported_content_types
-                    if stt_supported_content_types
-                    and any(t.strip() for t in stt_supported_content_types)
-                    else ["audio/*", "video/webm"]
-                )
-            ):
-                file_path = Storage.get_file(file_path)
-                result = transcribe(request, file_path, file_metadata, user)
+        if any(
+            fnmatch(content_type, pattern)
+            for pattern in (
+                stt_supported_content_types
+                if stt_supported_content_types
+                and any(t.strip() for t in stt_supported_content_types)
+                else ["audio/*", "video/webm"]
+            )
+        ):
+            file_path = Storage.get_file(file_path)
+            result = transcribe(request, file_path, file_metadata, user)
 
-                process_file(
-                    request,
-                    ProcessFileForm(
-                        file_id=file_item.id, content=result.get("text", "")
-                    ),
-                    user=user,
-                )
-            elif (not file.content_type.startswith(("image/", "video/"))) or (
-                request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
-            ):
-                process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
-            else:
-                raise Exception(
-                    f"File type {file.content_type} is not supported for processing"
-                )
-        else:
-            log.info(
-                f"File type {file.content_type} is not provided, but trying to process anyway"
+            process_file(
+                request,
+                ProcessFileForm(file_id=file_item.id, content=result.get("text", "")),
+                user=user,
             )
+        elif (not content_type.startswith(("image/", "video/"))) or (
+            request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
+        ):
             process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
+        else:
+            raise Exception(f"File type {content_type} is not supported for processing")
+    else:
+        log.info(
+            f"File type {content_type} is not provided, but trying to process anyway"
+        )
+        process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
+
+
+def process_uploaded_file(request, file, file_path, file_item, file_metadata, user):
+    try:
+        process_upload(
+            request, file.content_type, file_path, file_item, file_metadata, user
+        )
     except Exception as e:
         log.error(f"Error processing file: {file_item.id}")
         Files.update_file_data_by_id(
@@ -149,6 +157,27 @@ def process_uploaded_file(request, file, file_path, file_item, file_metadata, us
         )
 
 
+def process_upload_job(request, user, payload: dict):
+    file_item = Files.get_file_by_id(payload["file_id"])
+    if not file_item:
+        # Deleted before it could be processed
+        return
+
+    process_upload(
+        request,
+        payload["content_type"],
+        file_item.path,
+        file_item,
+        payload["metadata"],
+        user,
+    )
+
+
+INGESTION_QUEUE.register(
+    "process_upload", process_upload_job, on_error=update_file_status_on_error
+)
+
+
 @router.post("/", response_model=FileModelResponse)
 def upload_file(
     request: Request,
@@ -191,6 +220,18 @@ def upload_file_handler(
             )
     file_metadata = metadata if metadata else {}
 
+    use_ingestion_queue = (
+        process
+        and background_tasks is not None
+        and process_in_background
+        and INGESTION_QUEUE.enabled
+    )
+    if use_ingestion_queue and INGESTION_QUEUE.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ERROR_MESSAGES.INGESTION_QUEUE_FULL,
+        )
+
     try:
         unsanitized_filename = file.filename
         filename = os.path.basename(unsanitized_filename)
@@ -248,7 +289,26 @@ def upload_file_handler(
         )
 
         if process:
-            if background_tasks and process_in_background:
+            job = None
+            if use_ingestion_queue:
+                job = INGESTION_QUEUE.enqueue(
+                    user.id,
+                    "process_upload",
+                    {
+                        "file_id": file_item.id,
+                        "content_type": file.content_type,
+                        "metadata": file_metadata,
+                    },
+                    priority=INGESTION_QUEUE.PRIORITY_UPLOAD,
+                )
+                if job is None:
+                    log.warning(
+                        f"Could not enqueue file {file_item.id}, processing it here"
+                    )
+
+            if job is not None:
+                return {"status": True, **file_item.model_dump()}
+            elif background_tasks and process_in_background:
                 background_tasks.add_task(
                     process_uploaded_file,
                     request,
@@ -422,28 +482,42 @@ async def get_file_process_status(
     ):
         if stream:
             MAX_FILE_PROCESSING_DURATION = 3600 * 2
+            # Status changes normally wake the stream up right away. Re-read
+            # it now and then anyway, e.g. for files processed by another
+            # instance without Redis, which also keeps the stream alive.
+            FILE_STATUS_RECHECK_INTERVAL = 15
 
             async def event_stream(file_item):
                 if file_item:
-                    for _ in range(MAX_FILE_PROCESSING_DURATION):
-                        file_item = Files.get_file_by_id(file_item.id)
-                        if file_item:
-                            data = file_item.model_dump().get("data", {})
-                            status = data.get("status")
-
-                            if status:
-                                event = {"status": status}
-                                if status == "failed":
-                                    event["error"] = data.get("error")
-
-                                yield f"data: {json.dumps(event)}\n\n"
-                                if status in ("completed", "failed"):
+                    deadline = time.monotonic() + MAX_FILE_PROCESSING_DURATION
+                    with FILE_STATUS.subscribe(file_item.id) as changed:
+                        while time.monotonic() < deadline:
+                            changed.clear()
+                            file_item = Files.get_file_by_id(file_item.id)
+                            if file_item:
+                                data = file_item.model_dump().get("data", {})
+                                status = data.get("status")
+
+                                if status:
+                                    event = {"status": status}
+                                    if status == "failed":
+                                        event["error"] = data.get("error")
+
+                                    yield f"data: {json.dumps(event)}\n\n"
+                                    if status in ("completed", "failed"):
+                                        break
+                                else:
+                                    # Legacy
                                     break
                             else:
-                                # Legacy
                                 break
 
-                        await asyncio.sleep(0.5)
+                            try:
+                                await asyncio.wait_for(
+                                    changed.wait(), FILE_STATUS_RECHECK_INTERVAL
+                                )
+                            except asyncio.TimeoutError:
+                                pass
                 else:
                     yield f"data: {json.dumps({'status': 'not_found'})}\n\n"
 
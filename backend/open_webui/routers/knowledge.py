@@ -23,6 +23,7 @@ from open_webui.storage.provider import Storage
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.ingestion import INGESTION_QUEUE
 
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -145,8 +146,23 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                 log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
                 continue  # Skip, don't raise
 
+            queued = 0
             failed_files = []
             for file in files:
+                if INGESTION_QUEUE.enabled:
+                    job = await run_in_threadpool(
+                        INGESTION_QUEUE.enqueue,
+                        user.id,
+                        "process_file",
+                        {"file_id": file.id, "collection_name": knowledge_base.id},
+                        priority=INGESTION_QUEUE.PRIORITY_REINDEX,
+                    )
+                    if job is not None:
+                        queued += 1
+                        continue
+
+                    log.warning(f"Could not enqueue file {file.id}, processing it here")
+
                 try:
                     await run_in_threadpool(
                         process_file,
@@ -163,6 +179,11 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                     failed_files.append({"file_id": file.id, "error": str(e)})
                     continue
 
+            if queued:
+                log.info(
+                    f"Queued {queued} files of knowledge base {knowledge_base.id} for reindexing"
+                )
+
         except Exception as e:
             log.error(f"Error processing knowledge base {knowledge_base.id}: {str(e)}")
             # Don't raise, just continue
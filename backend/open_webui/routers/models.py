@@ -5,7 +5,6 @@ import json
 import asyncio
 import logging
 
-from open_webui.models.groups import Groups
 from open_webui.models.models import (
     ModelForm,
     ModelModel,
@@ -28,7 +27,11 @@ from fastapi.responses import FileResponse, StreamingResponse
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.access_control import (
+    has_access,
+    has_permission,
+    get_user_group_ids,
+)
 from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL, STATIC_DIR
 
 log = logging.getLogger(__name__)
@@ -79,9 +82,9 @@ async def get_models(
         filter["direction"] = direction
 
     if not user.role == "admin" or not BYPASS_ADMIN_ACCESS_CONTROL:
-        groups = Groups.get_groups_by_member_id(user.id)
-        if groups:
-            filter["group_ids"] = [group.id for group in groups]
+        group_ids = get_user_group_ids(user.id)
+        if group_ids:
+            filter["group_ids"] = list(group_ids)
 
         filter["user_id"] = user.id
 
@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -18,6 +13,9 @@ from aiocache import cached
 import requests
 
 from open_webui.utils.headers import include_user_info_headers
+from open_webui.utils.load_balancer import OLLAMA_BALANCER, Lease
+from open_webui.utils.model_lists import MODEL_LIST_CACHE
+from open_webui.utils.session_pool import HTTP_SESSION_POOL
 from open_webui.models.chats import Chats
 from open_webui.models.users import UserModel
 
@@ -37,7 +35,7 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, validator
-from starlette.background import BackgroundTask
+from starlette.background import BackgroundTask, BackgroundTasks
 
 
 from open_webui.models.models import Models
@@ -81,35 +79,57 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            headers = {
-                "Content-Type": "application/json",
-                **({"Authorization": f"Bearer {key}"} if key else {}),
-            }
+        session = HTTP_SESSION_POOL.get_session(url)
+        headers = {
+            "Content-Type": "application/json",
+            **({"Authorization": f"Bearer {key}"} if key else {}),
+        }
 
-            if ENABLE_FORWARD_USER_INFO_HEADERS and user:
-                headers = include_user_info_headers(headers, user)
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+            headers = include_user_info_headers(headers, user)
 
-            async with session.get(
-                url,
-                headers=headers,
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        async with session.get(
+            url,
+            headers=headers,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
 
 
+async def get_model_list(url, key=None, user: UserModel = None):
+    # The last good list of the connection, refreshed in the background
+    return await MODEL_LIST_CACHE.get(
+        url, key, lambda: send_get_request(url, key, user=user)
+    )
+
+
+def invalidate_model_list(url: str, response=None):
+    """
+    Drop the cached model list of `url`, and again once `response` has been
+    streamed, as models pulled or created are only listed once it's done.
+    """
+    MODEL_LIST_CACHE.invalidate(url)
+
+    if isinstance(response, StreamingResponse):
+        tasks = BackgroundTasks([response.background] if response.background else [])
+        tasks.add_task(MODEL_LIST_CACHE.invalidate, url)
+        response.background = tasks
+    return response
+
+
 async def cleanup_response(
-    response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    response: Optional[aiohttp.ClientResponse], lease: Optional[Lease] = None
 ):
+    # Sessions are pooled, only the response is released
     if response:
         response.close()
-    if session:
-        await session.close()
+    if lease:
+        lease.release()
 
 
 async def send_post_request(
@@ -120,13 +140,13 @@ async def send_post_request(
     content_type: Optional[str] = None,
     user: UserModel = None,
     metadata: Optional[dict] = None,
+    lease: Optional[Lease] = None,
 ):
 
     r = None
+    streaming = False
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = HTTP_SESSION_POOL.get_session(url)
 
         headers = {
             "Content-Type": "application/json",
@@ -143,12 +163,15 @@ async def send_post_request(
             data=payload,
             headers=headers,
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
         )
+        if lease:
+            lease.responded(r.status)
 
         if r.ok is False:
             try:
                 res = await r.json()
-                await cleanup_response(r, session)
+                await cleanup_response(r, lease)
                 if "error" in res:
                     raise HTTPException(status_code=r.status, detail=res["error"])
             except HTTPException as e:
@@ -167,13 +190,12 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            streaming = True
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r, lease=lease),
             )
         else:
             res = await r.json()
@@ -182,6 +204,9 @@ async def send_post_request(
     except HTTPException as e:
         raise e  # Re-raise HTTPException to be handled by FastAPI
     except Exception as e:
+        if lease and r is None:
+            lease.failed()
+
         detail = f"Ollama: {e}"
 
         raise HTTPException(
@@ -189,8 +214,8 @@ async def send_post_request(
             detail=detail if e else "Private AI: Server Connection Error",
         )
     finally:
-        if not stream:
-            await cleanup_response(r, session)
+        if not streaming:
+            await cleanup_response(r, lease)
 
 
 def get_api_key(idx, url, configs):
@@ -298,6 +323,8 @@ async def update_config(
         if key in keys
     }
 
+    MODEL_LIST_CACHE.invalidate()
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
@@ -334,7 +361,7 @@ async def get_all_models(request: Request, user: UserModel = None):
             if (str(idx) not in request.app.state.config.OLLAMA_API_CONFIGS) and (
                 url not in request.app.state.config.OLLAMA_API_CONFIGS  # Legacy support
             ):
-                request_tasks.append(send_get_request(f"{url}/api/tags", user=user))
+                request_tasks.append(get_model_list(f"{url}/api/tags", user=user))
             else:
                 api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
                     str(idx),
@@ -348,7 +375,7 @@ async def get_all_models(request: Request, user: UserModel = None):
 
                 if enable:
                     request_tasks.append(
-                        send_get_request(f"{url}/api/tags", key, user=user)
+                        get_model_list(f"{url}/api/tags", key, user=user)
                     )
                 else:
                     request_tasks.append(asyncio.ensure_future(asyncio.sleep(0, None)))
@@ -399,7 +426,7 @@ async def get_all_models(request: Request, user: UserModel = None):
         }
 
         try:
-            loaded_models = await get_ollama_loaded_models(request, user=user)
+            loaded_models = await get_all_loaded_models(request, user=user, cached=True)
             expires_map = {
                 m["model"]: m["expires_at"]
                 for m in loaded_models["models"]
@@ -489,18 +516,18 @@ async def get_ollama_tags(
     return models
 
 
-@router.get("/api/ps")
-async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user)):
-    """
-    List models that are currently loaded into Ollama memory, and which node they are loaded on.
-    """
+async def get_all_loaded_models(
+    request: Request, user: UserModel = None, cached: bool = False
+):
+    fetch = get_model_list if cached else send_get_request
+
     if request.app.state.config.ENABLE_OLLAMA_API:
         request_tasks = []
         for idx, url in enumerate(request.app.state.config.OLLAMA_BASE_URLS):
             if (str(idx) not in request.app.state.config.OLLAMA_API_CONFIGS) and (
                 url not in request.app.state.config.OLLAMA_API_CONFIGS  # Legacy support
             ):
-                request_tasks.append(send_get_request(f"{url}/api/ps", user=user))
+                request_tasks.append(fetch(f"{url}/api/ps", user=user))
             else:
                 api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
                     str(idx),
@@ -513,9 +540,7 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user
                 key = api_config.get("key", None)
 
                 if enable:
-                    request_tasks.append(
-                        send_get_request(f"{url}/api/ps", key, user=user)
-                    )
+                    request_tasks.append(fetch(f"{url}/api/ps", key, user=user))
                 else:
                     request_tasks.append(asyncio.ensure_future(asyncio.sleep(0, None)))
 
@@ -537,6 +562,11 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user
                     if prefix_id:
                         model["model"] = f"{prefix_id}.{model['model']}"
 
+                # Requests are preferably routed to nodes with the model loaded
+                OLLAMA_BALANCER.set_models(
+                    url, [model["model"] for model in response.get("models", [])]
+                )
+
         models = {
             "models": merge_ollama_models_lists(
                 map(
@@ -551,6 +581,14 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user
     return models
 
 
+@router.get("/api/ps")
+async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user)):
+    """
+    List models that are currently loaded into Ollama memory, and which node they are loaded on.
+    """
+    return await get_all_loaded_models(request, user=user)
+
+
 @router.get("/api/version")
 @router.get("/api/version/{url_idx}")
 async def get_ollama_versions(request: Request, url_idx: Optional[int] = None):
@@ -714,12 +752,13 @@ async def pull_model(
     # Admin should be able to pull models from any source
     payload = {**form_data, "insecure": True}
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/pull",
         payload=json.dumps(payload),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return invalidate_model_list(url, response)
 
 
 class PushModelForm(BaseModel):
@@ -778,12 +817,13 @@ async def create_model(
     log.debug(f"form_data: {form_data}")
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/create",
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return invalidate_model_list(url, response)
 
 
 class CopyModelForm(BaseModel):
@@ -830,6 +870,7 @@ async def copy_model(
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
         r.raise_for_status()
+        invalidate_model_list(url)
 
         log.debug(f"r.text: {r.text}")
         return True
@@ -896,6 +937,7 @@ async def delete_model(
             json=form_data,
         )
         r.raise_for_status()
+        invalidate_model_list(url)
 
         log.debug(f"r.text: {r.text}")
         return True
@@ -935,7 +977,9 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = OLLAMA_BALANCER.select(
+        models[model]["urls"], request.app.state.config.OLLAMA_BASE_URLS, model
+    )
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1005,7 +1049,9 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = OLLAMA_BALANCER.select(
+                models[model]["urls"], request.app.state.config.OLLAMA_BASE_URLS, model
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -1087,7 +1133,9 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = OLLAMA_BALANCER.select(
+                models[model]["urls"], request.app.state.config.OLLAMA_BASE_URLS, model
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -1165,17 +1213,19 @@ async def generate_completion(
     url_idx: Optional[int] = None,
     user=Depends(get_verified_user),
 ):
+    model = form_data.model
+
+    if ":" not in model:
+        model = f"{model}:latest"
+
     if url_idx is None:
         await get_all_models(request, user=user)
         models = request.app.state.OLLAMA_MODELS
 
-        model = form_data.model
-
-        if ":" not in model:
-            model = f"{model}:latest"
-
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = OLLAMA_BALANCER.select(
+                models[model]["urls"], request.app.state.config.OLLAMA_BASE_URLS, model
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -1197,6 +1247,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        lease=OLLAMA_BALANCER.acquire(url, model),
     )
 
 
@@ -1242,7 +1293,11 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = OLLAMA_BALANCER.select(
+            models[model].get("urls", []),
+            request.app.state.config.OLLAMA_BASE_URLS,
+            model,
+        )
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1312,7 +1367,8 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1330,6 +1386,7 @@ async def generate_chat_completion(
         content_type="application/x-ndjson",
         user=user,
         metadata=metadata,
+        lease=OLLAMA_BALANCER.acquire(url, model),
     )
 
 
@@ -1418,7 +1475,8 @@ async def generate_openai_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1436,6 +1494,7 @@ async def generate_openai_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        lease=OLLAMA_BALANCER.acquire(url, model),
     )
 
 
@@ -1501,7 +1560,8 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
+    url, url_idx = await get_ollama_url(request, model, url_idx)
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1518,6 +1578,7 @@ async def generate_openai_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        lease=OLLAMA_BALANCER.acquire(url, model),
     )
 
 
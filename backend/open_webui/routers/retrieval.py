@@ -24,6 +24,7 @@ from fastapi import (
 )
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import tiktoken
 
@@ -37,7 +38,8 @@ from open_webui.models.knowledge import Knowledges
 from open_webui.storage.provider import Storage
 
 
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT, BM25_INDEX
+from open_webui.retrieval.embedding_cache import EMBEDDING_STORE
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -86,6 +88,8 @@ from open_webui.utils.misc import (
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.ingestion import INGESTION_QUEUE
+from open_webui.utils.session_pool import HTTP_SESSION_POOL
 
 from open_webui.config import (
     ENV,
@@ -106,6 +110,7 @@ from open_webui.env import (
     SENTENCE_TRANSFORMERS_MODEL_KWARGS,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS,
+    INGESTION_BATCH_WAIT_TIMEOUT,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -1373,19 +1378,25 @@ def save_docs_to_vector_db(
                 return True
 
         log.info(f"generating embeddings for {collection_name}")
+        embedding_url = (
+            request.app.state.config.RAG_OPENAI_API_BASE_URL
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                request.app.state.config.RAG_OLLAMA_BASE_URL
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
+            )
+        )
+        azure_api_version = (
+            request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
+            else None
+        )
         embedding_function = get_embedding_function(
             request.app.state.config.RAG_EMBEDDING_ENGINE,
             request.app.state.config.RAG_EMBEDDING_MODEL,
             request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_BASE_URL
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
-                )
-            ),
+            embedding_url,
             (
                 request.app.state.config.RAG_OPENAI_API_KEY
                 if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
@@ -1396,21 +1407,39 @@ def save_docs_to_vector_db(
                 )
             ),
             request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-            azure_api_version=(
-                request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
-                else None
-            ),
+            azure_api_version=azure_api_version,
+            # Document chunks would only evict cached queries, and this runs
+            # on its own event loop below
+            cache=None,
         )
 
-        # Run async embedding in sync context
-        embeddings = asyncio.run(
-            embedding_function(
-                list(map(lambda x: x.replace("\n", " "), texts)),
-                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-                user=user,
+        async def embed(texts: list[str]):
+            return await embedding_function(
+                texts, prefix=RAG_EMBEDDING_CONTENT_PREFIX, user=user
             )
-        )
+
+        async def embed_documents(texts: list[str]):
+            try:
+                if EMBEDDING_STORE:
+                    # Reuse vectors of chunks seen before, e.g. when re-indexing
+                    return await EMBEDDING_STORE.get_embeddings(
+                        request.app.state.config.RAG_EMBEDDING_ENGINE,
+                        request.app.state.config.RAG_EMBEDDING_MODEL,
+                        texts,
+                        RAG_EMBEDDING_CONTENT_PREFIX,
+                        embed,
+                        url=embedding_url,
+                        azure_api_version=azure_api_version,
+                    )
+                return await embed(texts)
+            finally:
+                # Connections of this event loop can't outlive it
+                await HTTP_SESSION_POOL.close()
+
+        texts_to_embed = list(map(lambda x: x.replace("\n", " "), texts))
+
+        # Run async embedding in sync context
+        embeddings = asyncio.run(embed_documents(texts_to_embed))
         log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
 
         items = [
@@ -1559,8 +1588,8 @@ def process_file(
                         MINERU_API_KEY=request.app.state.config.MINERU_API_KEY,
                         MINERU_PARAMS=request.app.state.config.MINERU_PARAMS,
                     )
-                    docs = loader.load(
-                        file.filename, file.meta.get("content_type"), file_path
+                    docs = INGESTION_QUEUE.load_documents(
+                        loader, file.filename, file.meta.get("content_type"), file_path
                     )
 
                     docs = [
@@ -1671,6 +1700,25 @@ def process_file(
         )
 
 
+def process_file_job(request: Request, user, payload: dict):
+    process_file(request, ProcessFileForm(**payload), user=user)
+
+
+def update_file_status_on_error(
+    request: Request, user, payload: dict, error: str, retrying: bool
+):
+    """Keep files of ingestion jobs pending until their last attempt fails."""
+    Files.update_file_data_by_id(
+        payload["file_id"],
+        {"status": "pending"} if retrying else {"status": "failed", "error": error},
+    )
+
+
+INGESTION_QUEUE.register(
+    "process_file", process_file_job, on_error=update_file_status_on_error
+)
+
+
 class ProcessTextForm(BaseModel):
     name: str
     content: str
@@ -2208,8 +2256,10 @@ async def query_doc_handler(
             form_data.hybrid is None or form_data.hybrid
         ):
             collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
+            collection_results[form_data.collection_name] = (
+                VECTOR_DB_CLIENT.get(collection_name=form_data.collection_name)
+                if not BM25_INDEX
+                else None
             )
             return await query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
@@ -2420,18 +2470,9 @@ class BatchProcessFilesResponse(BaseModel):
     errors: List[BatchProcessFilesResult]
 
 
-@router.post("/process/files/batch")
-async def process_files_batch(
-    request: Request,
-    form_data: BatchProcessFilesForm,
-    user=Depends(get_verified_user),
+def save_files_to_vector_db(
+    request: Request, files: List[FileModel], collection_name: str, user
 ) -> BatchProcessFilesResponse:
-    """
-    Process a batch of files and save them to the vector database.
-    """
-
-    collection_name = form_data.collection_name
-
     file_results: List[BatchProcessFilesResult] = []
     file_errors: List[BatchProcessFilesResult] = []
     file_updates: List[FileUpdateForm] = []
@@ -2439,7 +2480,7 @@ async def process_files_batch(
     # Prepare all documents first
     all_docs: List[Document] = []
 
-    for file in form_data.files:
+    for file in files:
         try:
             text_content = file.data.get("content", "")
             docs: List[Document] = [
@@ -2476,8 +2517,7 @@ async def process_files_batch(
     # Save all documents in one batch
     if all_docs:
         try:
-            await run_in_threadpool(
-                save_docs_to_vector_db,
+            save_docs_to_vector_db(
                 request,
                 all_docs,
                 collection_name,
@@ -2497,7 +2537,85 @@ async def process_files_batch(
             for file_result in file_results:
                 file_result.status = "failed"
                 file_errors.append(
-                    BatchProcessFilesResult(file_id=file_result.file_id, error=str(e))
+                    BatchProcessFilesResult(
+                        file_id=file_result.file_id, status="failed", error=str(e)
+                    )
                 )
 
     return BatchProcessFilesResponse(results=file_results, errors=file_errors)
+
+
+def process_files_batch_job(request: Request, user, payload: dict) -> dict:
+    # The files as submitted, so the job embeds exactly what the request did
+    files = [FileModel(**file) for file in payload["files"]]
+    return save_files_to_vector_db(
+        request, files, payload["collection_name"], user
+    ).model_dump()
+
+
+INGESTION_QUEUE.register("process_files_batch", process_files_batch_job)
+
+
+@router.post("/process/files/batch")
+async def process_files_batch(
+    request: Request,
+    form_data: BatchProcessFilesForm,
+    user=Depends(get_verified_user),
+) -> BatchProcessFilesResponse:
+    """
+    Process a batch of files and save them to the vector database.
+
+    With the ingestion queue, the batch runs as a job. If it hasn't finished
+    after INGESTION_BATCH_WAIT_TIMEOUT seconds, a 202 with the job's id is
+    returned instead, and the job goes on to update the files when done.
+    """
+    if not INGESTION_QUEUE.enabled:
+        return await run_in_threadpool(
+            save_files_to_vector_db,
+            request,
+            form_data.files,
+            form_data.collection_name,
+            user,
+        )
+
+    if await run_in_threadpool(INGESTION_QUEUE.is_full):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ERROR_MESSAGES.INGESTION_QUEUE_FULL,
+        )
+
+    job = await run_in_threadpool(
+        INGESTION_QUEUE.enqueue,
+        user.id,
+        "process_files_batch",
+        {
+            "files": [file.model_dump(mode="json") for file in form_data.files],
+            "collection_name": form_data.collection_name,
+        },
+        priority=INGESTION_QUEUE.PRIORITY_BATCH,
+    )
+    if job is None:
+        log.warning("Could not enqueue batch of files, processing it here")
+        return await run_in_threadpool(
+            save_files_to_vector_db,
+            request,
+            form_data.files,
+            form_data.collection_name,
+            user,
+        )
+
+    job = await INGESTION_QUEUE.wait(
+        job.id, timeout=INGESTION_BATCH_WAIT_TIMEOUT or None
+    )
+    if job is not None and job.status in ("pending", "running"):
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"job_id": job.id, "status": job.status},
+        )
+
+    if job is None or job.status != "completed" or job.result is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT(job.error if job else None),
+        )
+    return BatchProcessFilesResponse(**job.result)
@@ -7,11 +7,9 @@ import sys
 import time
 from typing import Dict, Set
 from redis import asyncio as aioredis
-import pycrdt as Y
 
 from open_webui.models.users import Users, UserNameResponse
 from open_webui.models.channels import Channels
-from open_webui.models.chats import Chats
 from open_webui.models.notes import Notes, NoteUpdateForm
 from open_webui.utils.redis import (
     get_sentinels_from_env,
@@ -29,6 +27,7 @@ from open_webui.env import (
     WEBSOCKET_REDIS_URL,
     WEBSOCKET_REDIS_CLUSTER,
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
+    ENABLE_WEBSOCKET_REDIS_LOCAL_CACHE,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
     REDIS_KEY_PREFIX,
@@ -39,7 +38,14 @@ from open_webui.env import (
     WEBSOCKET_SERVER_ENGINEIO_LOGGING,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
+from open_webui.utils.chat_buffer import CHAT_MESSAGE_BUFFER
+from open_webui.utils.last_active import LAST_ACTIVE_BUFFER
+from open_webui.socket.utils import (
+    CachedRedisDict,
+    RedisDict,
+    RedisLock,
+    YdocManager,
+)
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_access, get_users_with_access
@@ -119,14 +125,17 @@ if WEBSOCKET_MANAGER == "redis":
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
 
-    MODELS = RedisDict(
+    # Read on every chat request and socket event, written rarely
+    CachedDict = CachedRedisDict if ENABLE_WEBSOCKET_REDIS_LOCAL_CACHE else RedisDict
+
+    MODELS = CachedDict(
         f"{REDIS_KEY_PREFIX}:models",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
         redis_cluster=WEBSOCKET_REDIS_CLUSTER,
     )
 
-    SESSION_POOL = RedisDict(
+    SESSION_POOL = CachedDict(
         f"{REDIS_KEY_PREFIX}:session_pool",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
@@ -159,8 +168,20 @@ else:
 
 
 YDOC_MANAGER = YdocManager(
-    redis=REDIS,
+    redis=(
+        # Yjs updates are binary
+        get_redis_connection(
+            redis_url=WEBSOCKET_REDIS_URL,
+            redis_sentinels=redis_sentinels,
+            redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+            async_mode=True,
+            decode_responses=False,
+        )
+        if WEBSOCKET_MANAGER == "redis"
+        else None
+    ),
     redis_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:documents",
+    redis_sessions_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:sessions",
 )
 
 
@@ -355,7 +376,7 @@ async def user_join(sid, data):
 async def heartbeat(sid, data):
     user = SESSION_POOL.get(sid)
     if user:
-        Users.update_last_active_by_id(user["id"])
+        LAST_ACTIVE_BUFFER.touch(user["id"])
 
 
 @sio.on("join-channels")
@@ -484,19 +505,13 @@ async def ydoc_document_join(sid, data):
 
         active_session_ids = get_session_ids_from_room(f"doc_{document_id}")
 
-        # Get the Yjs document state
-        ydoc = Y.Doc()
-        updates = await YDOC_MANAGER.get_updates(document_id)
-        for update in updates:
-            ydoc.apply_update(bytes(update))
-
-        # Encode the entire document state as an update
-        state_update = ydoc.get_update()
+        # Get the entire Yjs document state as an update
+        state_update = await YDOC_MANAGER.get_state(document_id)
         await sio.emit(
             "ydoc:document:state",
             {
                 "document_id": document_id,
-                "state": list(state_update),  # Convert bytes to list for JSON
+                "state": state_update,
                 "sessions": active_session_ids,
             },
             room=sid,
@@ -560,20 +575,14 @@ async def yjs_document_state(sid, data):
             log.warning(f"Document {document_id} not found")
             return
 
-        # Get the Yjs document state
-        ydoc = Y.Doc()
-        updates = await YDOC_MANAGER.get_updates(document_id)
-        for update in updates:
-            ydoc.apply_update(bytes(update))
-
-        # Encode the entire document state as an update
-        state_update = ydoc.get_update()
+        # Get the entire Yjs document state as an update
+        state_update = await YDOC_MANAGER.get_state(document_id)
 
         await sio.emit(
             "ydoc:document:state",
             {
                 "document_id": document_id,
-                "state": list(state_update),  # Convert bytes to list for JSON
+                "state": state_update,
                 "sessions": active_session_ids,
             },
             room=sid,
@@ -595,11 +604,12 @@ async def yjs_document_update(sid, data):
 
         user_id = data.get("user_id", sid)
 
-        update = data["update"]  # List of bytes from frontend
+        # Binary, or a list of bytes from older clients
+        update = bytes(data["update"])
 
         await YDOC_MANAGER.append_to_updates(
             document_id=document_id,
-            update=update,  # Convert list of bytes to bytes
+            update=update,
         )
 
         # Broadcast update to all other users in the document
@@ -714,25 +724,31 @@ def get_event_emitter(request_info, update_db=True):
         ):
 
             if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    event_data.get("data", {}),
-                )
+                message = await CHAT_MESSAGE_BUFFER.get_message(chat_id, message_id)
+
+                if message:
+                    status_history = message.get("statusHistory", [])
+                    status_history.append(event_data.get("data", {}))
+
+                    await CHAT_MESSAGE_BUFFER.update_message(
+                        chat_id,
+                        message_id,
+                        {
+                            "statusHistory": status_history,
+                        },
+                        set_current=False,
+                    )
 
             if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
+                message = await CHAT_MESSAGE_BUFFER.get_message(chat_id, message_id)
 
                 if message:
                     content = message.get("content", "")
                     content += event_data.get("data", {}).get("content", "")
 
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
+                    await CHAT_MESSAGE_BUFFER.update_message(
+                        chat_id,
+                        message_id,
                         {
                             "content": content,
                         },
@@ -741,43 +757,37 @@ def get_event_emitter(request_info, update_db=True):
             if "type" in event_data and event_data["type"] == "replace":
                 content = event_data.get("data", {}).get("content", "")
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
+                await CHAT_MESSAGE_BUFFER.update_message(
+                    chat_id,
+                    message_id,
                     {
                         "content": content,
                     },
                 )
 
             if "type" in event_data and event_data["type"] == "embeds":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
+                message = await CHAT_MESSAGE_BUFFER.get_message(chat_id, message_id)
 
                 embeds = event_data.get("data", {}).get("embeds", [])
                 embeds.extend(message.get("embeds", []))
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
+                await CHAT_MESSAGE_BUFFER.update_message(
+                    chat_id,
+                    message_id,
                     {
                         "embeds": embeds,
                     },
                 )
 
             if "type" in event_data and event_data["type"] == "files":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
+                message = await CHAT_MESSAGE_BUFFER.get_message(chat_id, message_id)
 
                 files = event_data.get("data", {}).get("files", [])
                 files.extend(message.get("files", []))
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
+                await CHAT_MESSAGE_BUFFER.update_message(
+                    chat_id,
+                    message_id,
                     {
                         "files": files,
                     },
@@ -786,17 +796,14 @@ def get_event_emitter(request_info, update_db=True):
             if event_data.get("type") in ["source", "citation"]:
                 data = event_data.get("data", {})
                 if data.get("type") == None:
-                    message = Chats.get_message_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                    )
+                    message = await CHAT_MESSAGE_BUFFER.get_message(chat_id, message_id)
 
                     sources = message.get("sources", [])
                     sources.append(data)
 
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
+                    await CHAT_MESSAGE_BUFFER.update_message(
+                        chat_id,
+                        message_id,
                         {
                             "sources": sources,
                         },
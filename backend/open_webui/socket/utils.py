@@ -1,10 +1,17 @@
+import asyncio
+import hashlib
 import json
+import logging
+import time
 import uuid
 from open_webui.utils.redis import get_redis_connection
-from open_webui.env import REDIS_KEY_PREFIX
+from open_webui.env import REDIS_KEY_PREFIX, SRC_LOG_LEVELS
 from typing import Optional, List, Tuple
 import pycrdt as Y
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["SOCKET"])
+
 
 class RedisLock:
     def __init__(
@@ -117,36 +124,348 @@ class RedisDict:
         return self[key]
 
 
+class CachedRedisDict(RedisDict):
+    """
+    RedisDict keeping a local copy of what it reads, so hot lookups don't
+    block the event loop on Redis.
+
+    Writes go to Redis right away and then publish the keys they changed, so
+    the other instances drop their copies (see `listen()`). Writes also bump
+    a version key, re-read at most once per `sync_interval` seconds, in case
+    invalidations are missed, e.g. while resubscribing.
+
+    Values are shared with callers, as with the plain dict used without
+    Redis, so they must not be modified in place.
+    """
+
+    # Absent keys remembered at most, e.g. lookups of unknown session ids
+    MAX_MISSING = 10000
+
+    def __init__(
+        self,
+        name,
+        redis_url,
+        redis_sentinels=[],
+        redis_cluster=False,
+        sync_interval: float = 1.0,
+    ):
+        super().__init__(
+            name,
+            redis_url,
+            redis_sentinels=redis_sentinels,
+            redis_cluster=redis_cluster,
+        )
+        self.redis_url = redis_url
+        self.redis_sentinels = redis_sentinels
+        self.redis_cluster = redis_cluster
+        self.sync_interval = sync_interval
+
+        self.id = str(uuid.uuid4())
+        self.version_key = f"{name}:version"
+        self.channel = f"{name}:invalidations"
+
+        self.cache = {}
+        self.missing = set()
+        # Whether `cache` holds the whole hash
+        self.complete = False
+
+        # None until first read from Redis
+        self.version = None
+        self.version_expires_at = 0.0
+
+    def invalidate(self, key=None):
+        if key is None:
+            self.cache = {}
+            self.missing = set()
+        else:
+            self.cache.pop(key, None)
+            self.missing.discard(key)
+        self.complete = False
+
+    def sync(self):
+        now = time.monotonic()
+        if now < self.version_expires_at:
+            return
+
+        version = self.redis.get(self.version_key) or "0"
+        if version != self.version:
+            self.invalidate()
+            self.version = version
+        self.version_expires_at = now + self.sync_interval
+
+    def write(self, pipe, keys):
+        """Bump the version and notify other instances along with a write."""
+        pipe.incr(self.version_key)
+        pipe.publish(self.channel, json.dumps({"id": self.id, "keys": keys}))
+        results = pipe.execute()
+
+        version = results[-2]
+        if self.version is None or int(self.version) + 1 == version:
+            # Nobody else wrote since the cache was last synced, or it was
+            # never synced and only holds what was written, so it's current
+            self.version = str(version)
+        return results
+
+    def load(self):
+        self.sync()
+        if not self.complete:
+            self.cache = {
+                k: json.loads(v) for k, v in self.redis.hgetall(self.name).items()
+            }
+            self.missing = set()
+            self.complete = True
+        return self.cache
+
+    def __setitem__(self, key, value):
+        pipe = self.redis.pipeline()
+        pipe.hset(self.name, key, json.dumps(value))
+        self.write(pipe, [key])
+
+        self.cache[key] = value
+        self.missing.discard(key)
+
+    def __getitem__(self, key):
+        self.sync()
+
+        if key in self.cache:
+            return self.cache[key]
+        if key in self.missing or self.complete:
+            raise KeyError(key)
+
+        value = self.redis.hget(self.name, key)
+        if value is None:
+            if len(self.missing) >= self.MAX_MISSING:
+                self.missing = set()
+            self.missing.add(key)
+            raise KeyError(key)
+
+        value = json.loads(value)
+        self.cache[key] = value
+        return value
+
+    def __delitem__(self, key):
+        pipe = self.redis.pipeline()
+        pipe.hdel(self.name, key)
+        result = self.write(pipe, [key])[0]
+
+        self.cache.pop(key, None)
+        self.missing.add(key)
+        if result == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self):
+        return len(self.load())
+
+    def keys(self):
+        return list(self.load().keys())
+
+    def values(self):
+        return list(self.load().values())
+
+    def items(self):
+        return list(self.load().items())
+
+    def set(self, mapping: dict):
+        pipe = self.redis.pipeline()
+
+        pipe.delete(self.name)
+        if mapping:
+            pipe.hset(self.name, mapping={k: json.dumps(v) for k, v in mapping.items()})
+        self.write(pipe, None)
+
+        self.cache = dict(mapping)
+        self.missing = set()
+        self.complete = True
+
+    def clear(self):
+        pipe = self.redis.pipeline()
+        pipe.delete(self.name)
+        self.write(pipe, None)
+
+        self.cache = {}
+        self.missing = set()
+        self.complete = True
+
+    async def listen(self):
+        redis = get_redis_connection(
+            self.redis_url,
+            self.redis_sentinels,
+            redis_cluster=self.redis_cluster,
+            async_mode=True,
+            decode_responses=True,
+        )
+
+        while True:
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                # Changes made while not subscribed were missed
+                self.version_expires_at = 0.0
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    data = json.loads(message["data"])
+                    if data["id"] == self.id:
+                        continue
+
+                    if data["keys"] is None:
+                        self.invalidate()
+                    else:
+                        for key in data["keys"]:
+                            self.invalidate(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"Lost invalidations of {self.name}, resubscribing: {e}")
+                await asyncio.sleep(1)
+
+
+# Replaces the updates a log started with by their merge, unless they were
+# compacted, cleared or trimmed since they were read. The prefix is compared
+# by digest, so overlapping compactions can't trim updates the merge lacks.
+COMPACT_YDOC_UPDATES_SCRIPT = """
+local count = tonumber(ARGV[1])
+local updates = redis.call('LRANGE', KEYS[1], 0, count - 1)
+if #updates < count then
+    return 0
+end
+local parts = {}
+for i, update in ipairs(updates) do
+    parts[i] = #update .. ':' .. update
+end
+if redis.sha1hex(table.concat(parts)) ~= ARGV[2] then
+    return 0
+end
+redis.call('LTRIM', KEYS[1], count, -1)
+redis.call('LPUSH', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def get_ydoc_updates_digest(updates: List[bytes]) -> str:
+    sha1 = hashlib.sha1()
+    for update in updates:
+        sha1.update(f"{len(update)}:".encode())
+        sha1.update(update)
+    return sha1.hexdigest()
+
+
+def merge_ydoc_updates(updates: List[bytes]) -> bytes:
+    # Y.merge_updates() is slower and keeps deleted content around
+    ydoc = Y.Doc()
+    for update in updates:
+        ydoc.apply_update(update)
+    return ydoc.get_update()
+
+
 class YdocManager:
+    """
+    Log of the Yjs updates of each collaborative document, its users (the
+    sessions that joined it) and the documents of each session.
+
+    Updates are stored as raw bytes, so `redis` must not decode responses.
+    Once `compaction_threshold` updates pile up, and whenever the whole
+    state is read, the log is merged into a single update, so joining a
+    document doesn't replay its whole editing history.
+    """
+
     def __init__(
         self,
         redis=None,
         redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:ydoc:documents",
+        redis_sessions_key_prefix: str = f"{REDIS_KEY_PREFIX}:ydoc:sessions",
+        compaction_threshold: int = 500,
     ):
         self._updates = {}
         self._users = {}
+        # Documents of each session, so disconnects only touch those
+        self._sessions = {}
         self._redis = redis
         self._redis_key_prefix = redis_key_prefix
+        self._redis_sessions_key_prefix = redis_sessions_key_prefix
+        self._compaction_threshold = compaction_threshold
 
     async def append_to_updates(self, document_id: str, update: bytes):
         document_id = document_id.replace(":", "_")
+        update = bytes(update)
+
         if self._redis:
             redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            await self._redis.rpush(redis_key, json.dumps(list(update)))
+            length = await self._redis.rpush(redis_key, update)
         else:
             if document_id not in self._updates:
                 self._updates[document_id] = []
             self._updates[document_id].append(update)
+            length = len(self._updates[document_id])
+
+        if length >= self._compaction_threshold:
+            await self.get_state(document_id)
+
+    def _decode_update(self, update: bytes) -> bytes:
+        if update[:1] == b"[":
+            # Stored as a JSON list of ints before updates were stored as is
+            try:
+                return bytes(json.loads(update))
+            except ValueError:
+                pass
+        return update
+
+    async def _get_stored_updates(self, document_id: str) -> List[bytes]:
+        if self._redis:
+            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
+            return await self._redis.lrange(redis_key, 0, -1)
+        else:
+            return list(self._updates.get(document_id, []))
 
     async def get_updates(self, document_id: str) -> List[bytes]:
         document_id = document_id.replace(":", "_")
 
+        updates = await self._get_stored_updates(document_id)
+        return [self._decode_update(update) for update in updates]
+
+    async def get_state(self, document_id: str) -> bytes:
+        """Get the document's state as a single update, compacting its log."""
+        document_id = document_id.replace(":", "_")
+
+        stored_updates = await self._get_stored_updates(document_id)
+        updates = [self._decode_update(update) for update in stored_updates]
+        if not updates:
+            return Y.Doc().get_update()
+        if len(updates) == 1:
+            return updates[0]
+
+        state = await asyncio.to_thread(merge_ydoc_updates, updates)
+
+        # Only replace the updates that were merged if the log still starts
+        # with them, another get_state() may have compacted it meanwhile
         if self._redis:
             redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            updates = await self._redis.lrange(redis_key, 0, -1)
-            return [bytes(json.loads(update)) for update in updates]
+            await self._redis.eval(
+                COMPACT_YDOC_UPDATES_SCRIPT,
+                1,
+                redis_key,
+                len(stored_updates),
+                get_ydoc_updates_digest(stored_updates),
+                state,
+            )
         else:
-            return self._updates.get(document_id, [])
+            log_updates = self._updates.get(document_id)
+            if (
+                log_updates is not None
+                and log_updates[: len(stored_updates)] == stored_updates
+            ):
+                log_updates[: len(stored_updates)] = [state]
+
+        return state
 
     async def document_exists(self, document_id: str) -> bool:
         document_id = document_id.replace(":", "_")
@@ -163,7 +482,9 @@ class YdocManager:
         if self._redis:
             redis_key = f"{self._redis_key_prefix}:{document_id}:users"
             users = await self._redis.smembers(redis_key)
-            return list(users)
+            return [
+                user.decode() if isinstance(user, bytes) else user for user in users
+            ]
         else:
             return self._users.get(document_id, [])
 
@@ -173,10 +494,14 @@ class YdocManager:
         if self._redis:
             redis_key = f"{self._redis_key_prefix}:{document_id}:users"
             await self._redis.sadd(redis_key, user_id)
+            await self._redis.sadd(
+                f"{self._redis_sessions_key_prefix}:{user_id}", document_id
+            )
         else:
             if document_id not in self._users:
                 self._users[document_id] = set()
             self._users[document_id].add(user_id)
+            self._sessions.setdefault(user_id, set()).add(document_id)
 
     async def remove_user(self, document_id: str, user_id: str):
         document_id = document_id.replace(":", "_")
@@ -184,29 +509,40 @@ class YdocManager:
         if self._redis:
             redis_key = f"{self._redis_key_prefix}:{document_id}:users"
             await self._redis.srem(redis_key, user_id)
+            await self._redis.srem(
+                f"{self._redis_sessions_key_prefix}:{user_id}", document_id
+            )
         else:
             if document_id in self._users and user_id in self._users[document_id]:
                 self._users[document_id].remove(user_id)
+            if user_id in self._sessions:
+                self._sessions[user_id].discard(document_id)
+                if not self._sessions[user_id]:
+                    del self._sessions[user_id]
 
-    async def remove_user_from_all_documents(self, user_id: str):
+    async def get_documents(self, user_id: str) -> List[str]:
+        """Get the documents a session joined and hasn't left."""
         if self._redis:
-            keys = await self._redis.keys(f"{self._redis_key_prefix}:*")
-            for key in keys:
-                if key.endswith(":users"):
-                    await self._redis.srem(key, user_id)
+            document_ids = await self._redis.smembers(
+                f"{self._redis_sessions_key_prefix}:{user_id}"
+            )
+            return [
+                document_id.decode() if isinstance(document_id, bytes) else document_id
+                for document_id in document_ids
+            ]
+        else:
+            return list(self._sessions.get(user_id, []))
 
-                    document_id = key.split(":")[-2]
-                    if len(await self.get_users(document_id)) == 0:
-                        await self.clear_document(document_id)
+    async def remove_user_from_all_documents(self, user_id: str):
+        for document_id in await self.get_documents(user_id):
+            await self.remove_user(document_id, user_id)
+            if len(await self.get_users(document_id)) == 0:
+                await self.clear_document(document_id)
 
+        if self._redis:
+            await self._redis.delete(f"{self._redis_sessions_key_prefix}:{user_id}")
         else:
-            for document_id in list(self._users.keys()):
-                if user_id in self._users[document_id]:
-                    self._users[document_id].remove(user_id)
-                    if not self._users[document_id]:
-                        del self._users[document_id]
-
-                        await self.clear_document(document_id)
+            self._sessions.pop(user_id, None)
 
     async def clear_document(self, document_id: str):
         document_id = document_id.replace(":", "_")
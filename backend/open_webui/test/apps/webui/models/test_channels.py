@@ -0,0 +1,158 @@
+import time
+
+import pytest
+
+import open_webui.models.channels as channels_module
+import open_webui.models.messages as messages_module
+import open_webui.models.users as users_module
+from open_webui.models.channels import Channel, ChannelMember, Channels
+from open_webui.models.messages import (
+    Message,
+    MessageForm,
+    MessageReaction,
+    Messages,
+)
+from open_webui.models.users import User, Users
+
+
+@pytest.fixture
+def channel_db(memory_db):
+    database = memory_db(
+        [Message, MessageReaction, Channel, ChannelMember, User],
+        [channels_module, messages_module, users_module],
+    )
+
+    with database.get_db() as db:
+        db.add_all([Channel(id=str(id), name=str(id)) for id in range(1, 5)])
+        db.commit()
+
+    return database
+
+
+def post(channel_id: str, user_id: str, parent_id: str = None, reply_to_id: str = None):
+    return Messages.insert_new_message(
+        MessageForm(content="hello", parent_id=parent_id, reply_to_id=reply_to_id),
+        channel_id,
+        user_id,
+    )
+
+
+class TestChannelSummaries:
+    def test_matches_per_channel_queries(self, channel_db):
+        # "a" reads channel 1 midway, posts in 2, and never joins 3
+        Channels.join_channel("1", "a")
+        message = post("1", "b")
+        post("1", "b", parent_id=message.id)
+        time.sleep(0.001)
+        Channels.update_member_last_read_at("1", "a")
+        post("1", "b")
+        post("1", "a")
+        post("2", "a")
+        post("2", "b")
+        post("3", "b")
+
+        channel_ids = ["1", "2", "3", "4"]
+        summaries = Messages.get_channel_summaries_by_channel_ids(channel_ids, "a")
+
+        for channel_id in channel_ids:
+            last_message = Messages.get_last_message_by_channel_id(channel_id)
+            member = Channels.get_member_by_channel_and_user_id(channel_id, "a")
+            unread_count = (
+                Messages.get_unread_message_count(channel_id, "a", member.last_read_at)
+                if member
+                else 0
+            )
+
+            summary = summaries.get(channel_id, {})
+            assert summary.get("last_message_at") == (
+                last_message.created_at if last_message else None
+            )
+            assert summary.get("unread_count", 0) == unread_count
+
+        assert [summaries[id]["unread_count"] for id in ["1", "2", "3"]] == [1, 1, 0]
+
+    def test_members_by_channel_ids(self, channel_db):
+        Channels.join_channel("1", "a")
+        Channels.join_channel("1", "b")
+        Channels.join_channel("2", "a")
+
+        members = Channels.get_members_by_channel_ids(["1", "2", "3"])
+        assert {id: sorted(m.user_id for m in ms) for id, ms in members.items()} == {
+            "1": ["a", "b"],
+            "2": ["a"],
+            "3": [],
+        }
+        assert Channels.get_members_by_channel_ids([]) == {}
+
+
+class TestChannelMessages:
+    def test_page_loads_in_fixed_number_of_queries(self, channel_db):
+        for id in ["a", "b"]:
+            Users.insert_new_user(id, id, f"{id}@example.com")
+
+        messages = [post("1", "a" if i % 2 else "b") for i in range(10)]
+        post("1", "b", parent_id=messages[0].id)
+        reply = post("1", "a", parent_id=messages[0].id)
+        post("1", "a", reply_to_id=messages[1].id)
+        Messages.add_reaction_to_message(messages[0].id, "a", "+1")
+        Messages.add_reaction_to_message(messages[0].id, "b", "+1")
+        Messages.add_reaction_to_message(messages[2].id, "b", "eyes")
+
+        channel_db.sessions = 0
+        page = Messages.get_message_responses(
+            Messages.get_messages_by_channel_id("1", limit=50)
+        )
+        # Messages with the messages they reply to, the authors of those, then
+        # the authors, reactions and replies of the page, however long it is
+        assert channel_db.sessions == 5
+
+        by_id = {message.id: message for message in page}
+        assert len(page) == 11 and reply.id not in by_id
+        for message in page:
+            full = Messages.get_message_by_id(message.id)
+            assert message.user.name == full.user.name
+            assert message.reply_count == full.reply_count
+            assert message.latest_reply_at == full.latest_reply_at
+            assert message.reactions == full.reactions
+            assert (message.reply_to_message is None) == (full.reply_to_message is None)
+
+        assert by_id[messages[0].id].reply_count == 2
+        assert by_id[messages[0].id].latest_reply_at == reply.created_at
+        assert [(r.name, r.count) for r in by_id[messages[0].id].reactions] == [
+            ("+1", 2)
+        ]
+        [replying] = [m for m in page if m.reply_to_message]
+        assert replying.reply_to_message.id == messages[1].id
+        assert replying.reply_to_message.user.name == "a"
+
+    def test_cursor_pagination(self, channel_db):
+        ids = [post("1", "a").id for _ in range(7)][::-1]
+        post("1", "a", parent_id=ids[0])
+
+        # Messages created in the same nanosecond aren't skipped or repeated
+        with messages_module.get_db() as db:
+            db.query(Message).filter(Message.id.in_(ids[2:5])).update(
+                {"created_at": 1}, synchronize_session=False
+            )
+            db.commit()
+        ids = [
+            message.id for message in Messages.get_messages_by_channel_id("1", limit=50)
+        ]
+
+        pages = []
+        before_id = None
+        while True:
+            page = Messages.get_messages_by_channel_id(
+                "1", limit=3, before_id=before_id
+            )
+            pages.append([message.id for message in page])
+            if len(page) < 3:
+                break
+            before_id = page[-1].id
+
+        assert pages == [ids[0:3], ids[3:6], ids[6:]]
+        assert len(set(ids)) == 7
+        assert Messages.get_messages_by_channel_id("1", before_id="missing") == []
+        assert [
+            message.id for message in Messages.get_messages_by_channel_id("1", 3, 3)
+        ] == ids[3:6]
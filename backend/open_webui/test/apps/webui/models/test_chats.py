@@ -0,0 +1,90 @@
+import pytest
+
+import open_webui.models.chats as chats_module
+from open_webui.models.chats import Chat, ChatForm, Chats
+
+
+@pytest.fixture
+def chat_db(memory_db):
+    return memory_db([Chat], [chats_module])
+
+
+@pytest.fixture
+def chat(chat_db):
+    return Chats.insert_new_chat(
+        "1",
+        ChatForm(
+            chat={
+                "title": "chat1",
+                "history": {
+                    "currentId": "a",
+                    "messages": {
+                        "a": {"id": "a", "role": "user", "content": "hello"},
+                        "b": {"id": "b", "role": "assistant", "content": ""},
+                    },
+                },
+            }
+        ),
+    )
+
+
+class TestChatMessagePatch:
+    def test_get_message(self, chat):
+        assert Chats.get_message_by_id_and_message_id(chat.id, "a")["content"] == (
+            "hello"
+        )
+        assert Chats.get_message_by_id_and_message_id(chat.id, "missing") == {}
+        assert Chats.get_message_by_id_and_message_id("missing", "a") is None
+
+    def test_patch_merges_message(self, chat):
+        assert Chats.patch_message_by_id_and_message_id(
+            chat.id, "b", {"content": "hi\x00", "usage": {"total_tokens": 3}}
+        )
+
+        history = Chats.get_chat_by_id(chat.id).chat["history"]
+        assert history["currentId"] == "b"
+        assert history["messages"]["b"] == {
+            "id": "b",
+            "role": "assistant",
+            "content": "hi",
+            "usage": {"total_tokens": 3},
+        }
+        assert history["messages"]["a"]["content"] == "hello"
+
+    def test_patch_inserts_missing_message(self, chat):
+        assert Chats.patch_message_by_id_and_message_id(
+            chat.id, "c", {"content": "new"}
+        )
+        assert Chats.get_message_by_id_and_message_id(chat.id, "c") == {
+            "content": "new"
+        }
+
+    def test_patch_missing_chat(self, chat_db):
+        assert not Chats.patch_message_by_id_and_message_id(
+            "missing", "a", {"content": "x"}
+        )
+
+    def test_add_message_status_keeps_current_id(self, chat):
+        Chats.add_message_status_to_chat_by_id_and_message_id(
+            chat.id, "b", {"action": "web_search", "done": False}
+        )
+        Chats.add_message_status_to_chat_by_id_and_message_id(
+            chat.id, "b", {"action": "web_search", "done": True}
+        )
+
+        history = Chats.get_chat_by_id(chat.id).chat["history"]
+        assert history["currentId"] == "a"
+        assert [
+            status["done"] for status in history["messages"]["b"]["statusHistory"]
+        ] == [
+            False,
+            True,
+        ]
+
+    def test_add_message_files(self, chat):
+        assert Chats.add_message_files_by_id_and_message_id(
+            chat.id, "b", [{"type": "image", "url": "1"}]
+        ) == [{"type": "image", "url": "1"}]
+        assert Chats.add_message_files_by_id_and_message_id(
+            chat.id, "b", [{"type": "image", "url": "2"}]
+        ) == [{"type": "image", "url": "1"}, {"type": "image", "url": "2"}]
@@ -0,0 +1,35 @@
+import pytest
+
+import open_webui.models.functions as functions_module
+from open_webui.models.functions import (
+    Function,
+    FunctionForm,
+    FunctionMeta,
+    Functions,
+)
+
+
+@pytest.fixture
+def function_db(memory_db):
+    return memory_db([Function], [functions_module])
+
+
+class TestFunctionsVersion:
+    def test_every_write_bumps_the_version(self, function_db):
+        form = FunctionForm(id="pipe", name="Pipe", content="", meta=FunctionMeta())
+        writes = [
+            lambda: Functions.insert_new_function("a", "pipe", form),
+            lambda: Functions.update_function_metadata_by_id("pipe", {"x": 1}),
+            lambda: Functions.update_function_valves_by_id("pipe", {"x": 1}),
+            lambda: Functions.update_function_by_id("pipe", {"is_active": True}),
+            lambda: Functions.deactivate_all_functions(),
+            lambda: Functions.sync_functions(
+                "a", [Functions.get_function_by_id("pipe")]
+            ),
+            lambda: Functions.delete_function_by_id("pipe"),
+        ]
+
+        for write in writes:
+            version = Functions.version
+            assert write()
+            assert Functions.version > version
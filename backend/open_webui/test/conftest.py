@@ -0,0 +1,60 @@
+import threading
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.internal.db import Base
+
+
+class MemoryDatabase:
+    """An in-memory SQLite database with the tables of some models."""
+
+    def __init__(self, models: list):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(
+            self.engine, tables=[model.__table__ for model in models]
+        )
+        self.session_factory = sessionmaker(bind=self.engine, expire_on_commit=False)
+
+        # Sessions opened, to count the queries made by a call
+        self.sessions = 0
+        # The one connection is shared by all threads
+        self.lock = threading.RLock()
+
+    @contextmanager
+    def get_db(self):
+        with self.lock:
+            self.sessions += 1
+            db = self.session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    """
+    Create a MemoryDatabase with the tables of the given models, and make the
+    get_db() of the given model modules use it.
+    """
+    databases = []
+
+    def create(models: list, modules: list) -> MemoryDatabase:
+        database = MemoryDatabase(models)
+        for module in modules:
+            monkeypatch.setattr(module, "get_db", database.get_db)
+        databases.append(database)
+        return database
+
+    yield create
+
+    for database in databases:
+        database.engine.dispose()
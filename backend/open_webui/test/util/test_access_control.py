@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+import open_webui.utils.access_control as access_control
+from open_webui.utils.access_control import (
+    get_permissions,
+    get_user_group_ids,
+    has_access,
+    has_permission,
+)
+from open_webui.utils.group_cache import GroupCache
+
+
+@pytest.fixture
+def groups(monkeypatch):
+    groups = Mock()
+    groups.get_groups_by_member_id.return_value = [
+        SimpleNamespace(id="g1", permissions={"chat": {"file_upload": True}}),
+        SimpleNamespace(id="g2", permissions=None),
+    ]
+
+    cache = GroupCache(ttl=60)
+    monkeypatch.setattr(access_control, "Groups", groups)
+    monkeypatch.setattr(access_control, "GROUP_CACHE", cache)
+    return groups, cache
+
+
+class TestGroupCache:
+    def test_groups_are_queried_once(self, groups):
+        groups, _ = groups
+        defaults = {"chat": {"file_upload": False, "delete": True}}
+
+        assert get_user_group_ids("u") == {"g1", "g2"}
+        assert has_access("u", "read", {"read": {"group_ids": ["g2"]}})
+        assert has_permission("u", "chat.file_upload", defaults)
+        for _ in range(2):
+            assert get_permissions("u", defaults) == {
+                "chat": {"file_upload": True, "delete": True}
+            }
+
+        assert groups.get_groups_by_member_id.call_count == 1
+
+    def test_invalidation_and_new_defaults(self, groups):
+        groups, cache = groups
+        defaults = {"chat": {"file_upload": False}}
+
+        get_permissions("u", defaults)["chat"]["file_upload"] = False
+        assert get_permissions("u", defaults)["chat"]["file_upload"] is True
+
+        cache.invalidate()
+        groups.get_groups_by_member_id.return_value = []
+        assert get_permissions("u", defaults) == {"chat": {"file_upload": False}}
+        assert get_permissions("u", {"chat": {"file_upload": True}}) == {
+            "chat": {"file_upload": True}
+        }
+        assert groups.get_groups_by_member_id.call_count == 2
+
+    def test_redis_version_is_shared(self):
+        redis = Mock()
+        redis.get.return_value = "1"
+        cache = GroupCache(ttl=60, redis=redis, sync_interval=0)
+        load = Mock(return_value="groups")
+
+        cache.get("groups", "u", load)
+        cache.get("groups", "u", load)
+        assert load.call_count == 1
+
+        # Another instance changed groups
+        redis.get.return_value = "2"
+        cache.get("groups", "u", load)
+        assert load.call_count == 2
+
+        cache.invalidate()
+        redis.incr.assert_called_once_with("open-webui:groups:version")
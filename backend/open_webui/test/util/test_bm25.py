@@ -0,0 +1,143 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from open_webui.retrieval.vector.bm25 import BM25Index, BM25IndexedVectorDB
+from open_webui.retrieval.vector.main import GetResult
+
+
+def item(id: str, text: str, **metadata) -> dict:
+    return {"id": id, "text": text, "vector": [0.0], "metadata": metadata}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return BM25Index(str(tmp_path / "bm25.db"))
+
+
+@pytest.fixture
+def client(index):
+    vector_db = Mock()
+    vector_db.get.return_value = GetResult(
+        ids=[["1", "2", "3"]],
+        documents=[["red apples", "green apples and pears", "blue sky"]],
+        metadatas=[[{"file_id": "a"}, {"file_id": "a"}, {"file_id": "b"}]],
+    )
+    return BM25IndexedVectorDB(vector_db, index)
+
+
+def search(index: BM25Index, query: str, k: int = 10, **kwargs) -> list[str]:
+    return [text for text, _, _ in index.search("c", query, k, **kwargs)]
+
+
+class TestBM25Index:
+    def test_build_on_first_use(self, index, client):
+        assert index.get_document_count("c") is None
+
+        # Writes to collections that aren't indexed yet are not tracked
+        client.insert("c", [item("4", "yellow apples")])
+
+        assert index.build("c", lambda: client.get("c")) == 3
+        assert index.build("c", lambda: client.get("c")) == 3
+        client.client.get.assert_called_once()
+
+        assert search(index, "apples") == ["red apples", "green apples and pears"]
+        assert search(index, "apples", k=1) == ["red apples"]
+        assert search(index, "sky")[0] == "blue sky"
+        assert search(index, "unknown") == []
+
+    def test_incremental_updates(self, index, client):
+        index.build("c", lambda: client.get("c"))
+
+        client.upsert("c", [item("3", "pears"), item("4", "pears pears")])
+        assert index.get_document_count("c") == 4
+        assert search(index, "pears") == [
+            "pears pears",
+            "pears",
+            "green apples and pears",
+        ]
+        assert search(index, "sky") == []
+
+        client.delete("c", filter={"file_id": "a"})
+        assert search(index, "pears") == ["pears pears", "pears"]
+
+        client.delete("c", ids=["4"])
+        assert index.get_document_count("c") == 1
+
+        client.delete_collection("c")
+        assert index.get_document_count("c") is None
+        client.client.delete_collection.assert_called_once_with(collection_name="c")
+
+    def test_enriched_texts(self, index, client):
+        client.client.get.return_value = GetResult(
+            ids=[["1", "2"]],
+            documents=[["first", "second"]],
+            metadatas=[[{"name": "report.pdf"}, {}]],
+        )
+        index.build("c", lambda: client.get("c"))
+
+        assert search(index, "report") == []
+        assert search(index, "report", enriched=True) == ["first"]
+        assert index.search("c", "report", 1, enriched=True)[0][1] == {
+            "name": "report.pdf"
+        }
+
+    def test_failed_update_drops_collection(self, index, client, monkeypatch):
+        index.build("c", lambda: client.get("c"))
+
+        monkeypatch.setattr(index, "add", Mock(side_effect=Exception("failed")))
+        client.insert("c", [item("4", "yellow apples")])
+
+        client.client.insert.assert_called_once()
+        assert index.get_document_count("c") is None
+
+    def test_writes_of_other_processes_during_build(self, index, client):
+        # Another process, with its own connection and locks on the same file
+        other_client = BM25IndexedVectorDB(Mock(), BM25Index(index.path))
+
+        def get_collection():
+            result = client.get("c")
+            # Written after the build read the collection
+            other_client.insert("c", [item("4", "yellow apples")])
+            other_client.delete("c", ids=["3"])
+            return result
+
+        assert index.build("c", get_collection) == 3
+        assert sorted(search(index, "apples")) == [
+            "green apples and pears",
+            "red apples",
+            "yellow apples",
+        ]
+        assert search(index, "sky") == []
+
+        # Writes with no build going on aren't queued
+        other_client.insert("d", [item("5", "pears")])
+        assert (
+            index.build(
+                "d", lambda: GetResult(ids=[[]], documents=[[]], metadatas=[[]])
+            )
+            == 0
+        )
+
+    def test_waits_for_builds_of_other_processes(self, index, client):
+        other_index = BM25Index(index.path)
+        other_get_collection = Mock()
+        other_result = []
+        other_build = threading.Thread(
+            target=lambda: other_result.append(
+                other_index.build("c", other_get_collection)
+            )
+        )
+
+        def get_collection():
+            other_build.start()
+            other_build.join(0.5)
+            # Waits for this build rather than reading the collection again
+            assert other_build.is_alive()
+            return client.get("c")
+
+        assert index.build("c", get_collection) == 3
+        other_build.join(5)
+        assert other_result == [3]
+        other_get_collection.assert_not_called()
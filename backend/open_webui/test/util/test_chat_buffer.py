@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from open_webui.utils.chat_buffer import ChatMessageBuffer
+
+
+@pytest.fixture
+def chats():
+    with patch("open_webui.utils.chat_buffer.Chats") as chats:
+        chats.get_message_by_id_and_message_id = Mock(
+            return_value={"id": "m", "content": "", "statusHistory": []}
+        )
+        yield chats
+
+
+class TestChatMessageBuffer:
+    @pytest.mark.asyncio
+    async def test_updates_are_coalesced(self, chats):
+        buffer = ChatMessageBuffer(interval=60, max_updates=100)
+
+        for i in range(10):
+            await buffer.update_message("c", "m", {"content": "x" * i})
+        await buffer.update_message("c", "m", {"usage": {"total_tokens": 9}})
+
+        chats.patch_message_by_id_and_message_id.assert_not_called()
+
+        await buffer.flush("c", "m")
+        chats.patch_message_by_id_and_message_id.assert_called_once_with(
+            "c", "m", {"content": "x" * 9, "usage": {"total_tokens": 9}}, True
+        )
+
+        await buffer.flush("c", "m")
+        assert chats.patch_message_by_id_and_message_id.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_on_max_updates(self, chats):
+        buffer = ChatMessageBuffer(interval=60, max_updates=3)
+
+        for i in range(7):
+            await buffer.update_message("c", "m", {"content": str(i)})
+
+        assert chats.patch_message_by_id_and_message_id.call_count == 2
+        assert buffer.pending[("c", "m")]["message"] == {"content": "6"}
+
+    @pytest.mark.asyncio
+    async def test_flush_on_interval(self, chats):
+        buffer = ChatMessageBuffer(interval=0.01, max_updates=100)
+
+        await buffer.update_message("c", "m", {"content": "a"}, set_current=False)
+        await asyncio.sleep(0.05)
+
+        chats.patch_message_by_id_and_message_id.assert_called_once_with(
+            "c", "m", {"content": "a"}, False
+        )
+        assert not buffer.pending
+
+    @pytest.mark.asyncio
+    async def test_write_through_without_interval(self, chats):
+        buffer = ChatMessageBuffer(interval=0, max_updates=100)
+
+        await buffer.update_message("c", "m", {"content": "a"})
+
+        chats.patch_message_by_id_and_message_id.assert_called_once()
+        assert not buffer.pending
+
+    @pytest.mark.asyncio
+    async def test_get_message_applies_pending_updates(self, chats):
+        buffer = ChatMessageBuffer(interval=60, max_updates=100)
+
+        await buffer.update_message("c", "m", {"content": "pending"})
+
+        assert await buffer.get_message("c", "m") == {
+            "id": "m",
+            "content": "pending",
+            "statusHistory": [],
+        }
+
+        await buffer.flush_all()
+        assert not buffer.pending
+
+    @pytest.mark.asyncio
+    async def test_run_keeps_order_per_chat(self, chats):
+        buffer = ChatMessageBuffer(interval=60, max_updates=100)
+        calls = []
+        lock = threading.Lock()
+
+        def call(chat_id, i):
+            time.sleep(0.001 * (5 - i % 5))
+            with lock:
+                calls.append((chat_id, i))
+
+        await asyncio.gather(
+            *[
+                buffer.run(chat_id, call, chat_id, i)
+                for i in range(10)
+                for chat_id in "ab"
+            ]
+        )
+
+        for chat_id in "ab":
+            assert [i for c, i in calls if c == chat_id] == list(range(10))
+        assert not buffer.locks
@@ -0,0 +1,128 @@
+from unittest.mock import Mock
+
+from open_webui.retrieval.vector.cache import (
+    CachedVectorDB,
+    CollectionCache,
+    get_result_size,
+)
+from open_webui.retrieval.vector.main import GetResult
+
+
+def result(*documents: str) -> GetResult:
+    return GetResult(
+        ids=[[str(i) for i in range(len(documents))]],
+        documents=[list(documents)],
+        metadatas=[[{"file_id": "a"} for _ in documents]],
+    )
+
+
+def cached_client(max_size: int = 1024, ttl: int = 60) -> CachedVectorDB:
+    client = Mock()
+    client.get.side_effect = lambda collection_name: result(collection_name)
+    return CachedVectorDB(client, CollectionCache(max_size=max_size, ttl=ttl))
+
+
+class TestCollectionCache:
+    def test_get_is_cached_until_write(self):
+        client = cached_client()
+
+        assert client.get("a").documents == [["a"]]
+        assert client.get(collection_name="a").documents == [["a"]]
+        assert client.client.get.call_count == 1
+
+        client.upsert("a", [])
+        client.get("a")
+        client.delete("a", filter={"file_id": "a"})
+        client.get("a")
+        client.delete_collection("a")
+        client.get("a")
+
+        assert client.client.get.call_count == 4
+        assert (client.cache.hits, client.cache.misses) == (1, 4)
+
+    def test_results_are_copied(self):
+        client = cached_client()
+
+        client.get("a").metadatas[0][0]["score"] = 1.0
+        assert client.get("a").metadatas[0][0] == {"file_id": "a"}
+
+    def test_write_during_read_is_not_cached(self):
+        client = cached_client()
+
+        def get(collection_name):
+            client.cache.invalidate(collection_name)
+            return result("stale")
+
+        client.client.get.side_effect = get
+        client.get("a")
+        client.get("a")
+        assert client.client.get.call_count == 2
+
+    def test_lru_eviction_by_size(self):
+        size = get_result_size(result("a"))
+        client = cached_client(max_size=2 * size)
+
+        client.get("a")
+        client.get("b")
+        client.get("a")
+        client.get("c")
+
+        assert list(client.cache.entries) == ["a", "c"]
+        assert client.cache.size == 2 * size
+        assert client.cache.evictions == 1
+
+    def test_ttl_and_reset(self):
+        client = cached_client(ttl=0)
+        client.get("a")
+        client.get("a")
+        assert client.client.get.call_count == 2
+
+        client = cached_client()
+        client.get("a")
+        client.reset()
+        client.get("a")
+        assert client.client.get.call_count == 2
+
+    def test_writes_invalidate_other_instances(self):
+        class FakeRedis:
+            def __init__(self):
+                self.data = {}
+
+            def get(self, key):
+                return self.data.get(key)
+
+            def incr(self, key):
+                self.data[key] = self.data.get(key, 0) + 1
+
+        redis = FakeRedis()
+        worker_1, worker_2 = [cached_client() for _ in range(2)]
+        for client in (worker_1, worker_2):
+            client.cache.redis = redis
+            client.cache.sync_interval = 0
+
+        worker_2.get("a")
+        worker_2.get("a")
+        assert worker_2.client.get.call_count == 1
+
+        worker_1.upsert("a", [])
+        worker_2.get("a")
+        assert worker_2.client.get.call_count == 2
+
+        worker_1.reset()
+        worker_2.get("a")
+        assert worker_2.client.get.call_count == 3
+
+    def test_redis_is_read_without_holding_the_lock(self):
+        client = cached_client()
+        cache = client.cache
+        cache.sync_interval = 0
+
+        class FakeRedis:
+            def get(self, key):
+                assert not cache.lock.locked()
+                return None
+
+        cache.redis = FakeRedis()
+        client.get("a")
+        client.get("a")
+        assert client.client.get.call_count == 1
@@ -0,0 +1,169 @@
+import random
+
+from open_webui.utils.content_blocks import (
+    ContentBlocksSerializer,
+    ContentDeltaEncoder,
+    get_common_prefix_length,
+    serialize_content_blocks,
+)
+
+
+def stream_content_blocks(seed: int, steps: int = 400):
+    """Mutate a list of content blocks the way the streaming handler does."""
+    rng = random.Random(seed)
+    content_blocks = [{"type": "text", "content": ""}]
+
+    for _ in range(steps):
+        last = content_blocks[-1]
+        op = rng.random()
+
+        if op < 0.7:
+            if last["type"] in ("text", "reasoning", "code_interpreter"):
+                last["content"] += rng.choice(["lorem ", "ipsum\n", "> quote ", "```"])
+        elif op < 0.8:
+            content_blocks.append(
+                {
+                    "type": "reasoning",
+                    "start_tag": "<think>",
+                    "end_tag": "</think>",
+                    "attributes": {},
+                    "content": "",
+                }
+            )
+        elif op < 0.88:
+            content_blocks.append(
+                {
+                    "type": "code_interpreter",
+                    "start_tag": "<code_interpreter>",
+                    "end_tag": "</code_interpreter>",
+                    "attributes": {"type": "code", "lang": "python"},
+                    "content": "",
+                }
+            )
+        elif op < 0.95:
+            if last["type"] == "reasoning":
+                last["duration"] = rng.randint(1, 10)
+            elif last["type"] == "code_interpreter":
+                last["output"] = {"stdout": "42"}
+            content_blocks.append({"type": "text", "content": ""})
+        elif len(content_blocks) > 1:
+            content_blocks.pop()
+
+        yield content_blocks
+
+
+class TestContentBlocksSerializer:
+    def test_matches_full_serialization(self):
+        for seed in range(20):
+            serializer = ContentBlocksSerializer()
+
+            for content_blocks in stream_content_blocks(seed):
+                for raw in (False, True):
+                    assert serializer(content_blocks, raw) == (
+                        serialize_content_blocks(content_blocks, raw)
+                    )
+
+    def test_renders_only_the_tail_block(self, monkeypatch):
+        import open_webui.utils.content_blocks as content_blocks_module
+
+        rendered = []
+        serialize_content_block = content_blocks_module.serialize_content_block
+
+        def counting_serialize_content_block(content, block, raw=False):
+            rendered.append(block)
+            return serialize_content_block(content, block, raw)
+
+        monkeypatch.setattr(
+            content_blocks_module,
+            "serialize_content_block",
+            counting_serialize_content_block,
+        )
+
+        serializer = ContentBlocksSerializer()
+        content_blocks = [{"type": "text", "content": f"block {i}"} for i in range(100)]
+        serializer(content_blocks)
+
+        rendered.clear()
+        content_blocks[-1]["content"] += " more"
+        assert serializer(content_blocks).endswith("block 99 more")
+        assert rendered == [content_blocks[-1]]
+
+
+def apply_chat_completion(state: dict, data: dict):
+    """Mirror of the client-side handling in Chat.svelte."""
+    if "content_seq" in data:
+        state["content"] = data["content"]
+        state["seq"] = data["content_seq"]
+    elif "content_delta" in data:
+        delta = data["content_delta"]
+        if state["seq"] == delta["seq"] - 1:
+            # Offsets count UTF-16 code units, like String.slice()
+            prefix = state["content"].encode("utf-16-le")[: delta["offset"] * 2]
+            state["content"] = prefix.decode("utf-16-le") + delta["value"]
+            state["seq"] = delta["seq"]
+
+
+class TestContentDeltaEncoder:
+    def test_common_prefix_length(self):
+        assert get_common_prefix_length("", "abc") == 0
+        assert get_common_prefix_length("abc", "abcdef") == 3
+        assert get_common_prefix_length("abcxyz", "abcdef") == 3
+        assert get_common_prefix_length("abcdef", "abc") == 3
+        assert get_common_prefix_length("xbc", "abc") == 0
+
+    def test_client_reconstructs_content(self):
+        for seed in range(10):
+            encoder = ContentDeltaEncoder(snapshot_interval=20)
+            serializer = ContentBlocksSerializer()
+            state = {"content": "", "seq": None}
+
+            for content_blocks in stream_content_blocks(seed):
+                content = serializer(content_blocks)
+                apply_chat_completion(state, encoder.encode({"content": content}))
+                assert state["content"] == content
+
+            data = encoder.encode({"content": content, "done": True})
+            assert data["content"] == content
+
+    def test_sends_deltas_and_periodic_snapshots(self):
+        encoder = ContentDeltaEncoder(snapshot_interval=3)
+        content = "Hello"
+        events = [encoder.encode({"content": content})]
+        for i in range(7):
+            content += f" {i}"
+            events.append(encoder.encode({"content": content}))
+
+        assert ["content" in data for data in events] == [
+            True,
+            False,
+            False,
+            False,
+            True,
+            False,
+            False,
+            False,
+        ]
+        assert events[1] == {"content_delta": {"seq": 2, "offset": 5, "value": " 0"}}
+        assert encoder.encode({"usage": {}}) == {"usage": {}}
+
+    def test_resyncs_after_missed_delta(self):
+        encoder = ContentDeltaEncoder(snapshot_interval=2)
+        state = {"content": "", "seq": None}
+
+        for i, content in enumerate(["abc", "abcd", "abcde", "abcdef", "abcdefg"]):
+            data = encoder.encode({"content": content})
+            if i != 1:
+                apply_chat_completion(state, data)
+
+        assert state == {"content": "abcdefg", "seq": 5}
+
+    def test_offsets_count_utf16_code_units(self):
+        encoder = ContentDeltaEncoder(snapshot_interval=20)
+        state = {"content": "", "seq": None}
+
+        for content in ["😀a", "😀ab", "😀🎉ab", "😀🎉abc"]:
+            data = encoder.encode({"content": content})
+            apply_chat_completion(state, data)
+            assert state["content"] == content
+
+        assert data["content_delta"] == {"seq": 4, "offset": 6, "value": "c"}
@@ -0,0 +1,120 @@
+import pytest
+
+from open_webui.retrieval.embedding_cache import EmbeddingCache
+from open_webui.retrieval.utils import get_embedding_function
+
+
+class FakePipeline:
+    def __init__(self, store: dict):
+        self.store = store
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def get(self, key):
+        self.commands.append(lambda: self.store.get(key))
+
+    def set(self, key, value, ex=None):
+        self.commands.append(lambda: self.store.__setitem__(key, value))
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+
+class Embedder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+
+class TestEmbeddingCache:
+    @pytest.mark.asyncio
+    async def test_only_missing_texts_are_embedded(self):
+        cache = EmbeddingCache(max_size=10)
+        embed = Embedder()
+
+        assert await cache.get_embeddings("e", "m", ["a", "bb"], "q:", embed) == [
+            [1.0],
+            [2.0],
+        ]
+        assert await cache.get_embeddings(
+            "e", "m", ["bb", "ccc", "ccc"], "q:", embed
+        ) == [
+            [2.0],
+            [3.0],
+            [3.0],
+        ]
+        assert embed.calls == [["a", "bb"], ["ccc"]]
+        assert (cache.hits, cache.misses) == (1, 3)
+
+        # Prefix and model are part of the key
+        await cache.get_embeddings("e", "m", ["a"], None, embed)
+        await cache.get_embeddings("e", "other", ["a"], "q:", embed)
+        assert len(embed.calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_and_failures(self):
+        cache = EmbeddingCache(max_size=2)
+        embed = Embedder()
+
+        await cache.get_embeddings("e", "m", ["a", "b", "c"], None, embed)
+        assert len(cache.entries) == 2
+
+        async def failing_embed(texts):
+            return None
+
+        assert await cache.get_embeddings("e", "m", ["d"], None, failing_embed) is None
+        assert len(cache.entries) == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_is_shared(self):
+        redis = FakeRedis()
+        embed = Embedder()
+
+        await EmbeddingCache(max_size=10, redis=redis).get_embeddings(
+            "e", "m", ["a"], None, embed
+        )
+        cache = EmbeddingCache(max_size=10, redis=redis)
+        assert await cache.get_embeddings("e", "m", ["a"], None, embed) == [[1.0]]
+
+        assert len(embed.calls) == 1
+        assert cache.redis_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_embedding_function_uses_cache(self):
+        class Model:
+            calls = 0
+
+            def encode(self, query, **kwargs):
+                Model.calls += 1
+
+                class Result(list):
+                    def tolist(self):
+                        return list(self)
+
+                if isinstance(query, list):
+                    return Result([[1.0, 2.0]] * len(query))
+                return Result([1.0, 2.0])
+
+        embedding_function = get_embedding_function(
+            "", "model", Model(), "", "", 1, cache=EmbeddingCache(max_size=10)
+        )
+
+        assert await embedding_function("hello") == [1.0, 2.0]
+        assert await embedding_function(["hello", "world"]) == [[1.0, 2.0]] * 2
+        assert Model.calls == 2
@@ -0,0 +1,70 @@
+import pytest
+
+from open_webui.retrieval.embedding_cache import EmbeddingStore
+
+
+class Embedder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+class TestEmbeddingStore:
+    @pytest.mark.asyncio
+    async def test_stored_chunks_are_not_embedded_again(self, tmp_path):
+        path = str(tmp_path / "embeddings.db")
+        embed = Embedder()
+
+        store = EmbeddingStore(path, max_size=10)
+        assert await store.get_embeddings("e", "m", ["a", "bb", "a"], "d:", embed) == [
+            [1.0, 0.5],
+            [2.0, 0.5],
+            [1.0, 0.5],
+        ]
+
+        # Persisted across instances, e.g. after a restart
+        store = EmbeddingStore(path, max_size=10)
+        assert await store.get_embeddings("e", "m", ["bb", "ccc"], "d:", embed) == [
+            [2.0, 0.5],
+            [3.0, 0.5],
+        ]
+        assert embed.calls == [["a", "bb"], ["ccc"]]
+
+        # Model and prefix are part of the key
+        await store.get_embeddings("e", "other", ["a"], "d:", embed)
+        await store.get_embeddings("e", "m", ["a"], None, embed)
+        assert len(embed.calls) == 4
+
+        # So are the endpoint and API version serving the model
+        await store.get_embeddings(
+            "e", "m", ["a"], "d:", embed, url="http://other:11434"
+        )
+        await store.get_embeddings(
+            "e", "m", ["a"], "d:", embed, azure_api_version="2024-02-01"
+        )
+        assert len(embed.calls) == 6
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_stored(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path / "embeddings.db"), max_size=10)
+
+        async def failing_embed(texts):
+            return None
+
+        assert await store.get_embeddings("e", "m", ["a"], None, failing_embed) is None
+        (count,) = (
+            store.get_connection().execute("SELECT COUNT(*) FROM embedding").fetchone()
+        )
+        assert count == 0
+
+    def test_prunes_least_recently_used(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path / "embeddings.db"), max_size=2)
+
+        store.set({"a": [1.0]})
+        store.get_connection().execute("UPDATE embedding SET used_at = 0")
+        store.set({"b": [2.0], "c": [3.0]})
+
+        assert store.get(["a", "b", "c"]) == {"b": [2.0], "c": [3.0]}
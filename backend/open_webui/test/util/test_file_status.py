@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils.file_status import FileStatusNotifier
+
+
+class FakeRedis:
+    """Pub/sub whose first subscription drops, then delivers `messages`."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.subscriptions = 0
+
+    def pubsub(self):
+        return self
+
+    async def subscribe(self, channel):
+        self.subscriptions += 1
+
+    async def listen(self):
+        if self.subscriptions == 1:
+            raise ConnectionError("connection lost")
+        for message in self.messages:
+            yield message
+        await asyncio.Event().wait()
+
+
+class TestFileStatusNotifier:
+    @pytest.mark.asyncio
+    async def test_notify_from_another_thread(self):
+        notifier = FileStatusNotifier()
+
+        with notifier.subscribe("file-1") as changed:
+            await asyncio.to_thread(notifier.notify, "file-1")
+            await asyncio.wait_for(changed.wait(), 1)
+
+        assert notifier.waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_only_waiters_of_the_file_are_woken(self):
+        notifier = FileStatusNotifier()
+
+        with (
+            notifier.subscribe("file-1") as changed_1,
+            notifier.subscribe("file-1") as changed_2,
+            notifier.subscribe("file-2") as changed_3,
+        ):
+            notifier.notify("file-1")
+            await asyncio.sleep(0)
+
+            assert changed_1.is_set() and changed_2.is_set()
+            assert not changed_3.is_set()
+
+    @pytest.mark.asyncio
+    async def test_notify_without_waiters(self):
+        notifier = FileStatusNotifier()
+        notifier.notify("file-1")
+
+        # Changes before subscribing aren't replayed
+        with notifier.subscribe("file-1") as changed:
+            await asyncio.sleep(0)
+            assert not changed.is_set()
+
+    @pytest.mark.asyncio
+    async def test_listen_resubscribes(self):
+        notifier = FileStatusNotifier()
+        redis = FakeRedis([{"type": "message", "data": "file-1"}])
+
+        with notifier.subscribe("file-1") as changed:
+            listener = asyncio.create_task(notifier.listen(redis))
+            try:
+                await asyncio.wait_for(changed.wait(), 1)
+                # Woken on subscribing, in case a change was missed
+                changed.clear()
+
+                await asyncio.wait_for(changed.wait(), 5)
+                assert redis.subscriptions == 2
+            finally:
+                listener.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await listener
@@ -0,0 +1,103 @@
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.documents import Document
+
+import open_webui.retrieval.utils as retrieval_utils
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.retrieval.utils import (
+    get_reranking_function,
+    query_collection_with_hybrid_search,
+)
+
+
+@pytest.fixture
+def candidates(monkeypatch):
+    async def get_hybrid_search_candidates(collection_name, query, **kwargs):
+        if collection_name == "empty":
+            return None
+        return [
+            Document(page_content=f"{query} shared", metadata={}),
+            Document(page_content=f"{collection_name} {query}", metadata={}),
+        ]
+
+    monkeypatch.setattr(retrieval_utils, "BM25_INDEX", Mock())
+    monkeypatch.setattr(
+        retrieval_utils, "get_hybrid_search_candidates", get_hybrid_search_candidates
+    )
+
+
+class TestHybridSearchReranking:
+    @pytest.mark.asyncio
+    async def test_reranks_all_collections_and_queries_at_once(self, candidates):
+        calls = []
+
+        def reranking_function(queries, documents):
+            calls.append(list(zip(queries, [d.page_content for d in documents])))
+            return [float(len(d.page_content)) for d in documents]
+
+        result = await query_collection_with_hybrid_search(
+            collection_names=["a", "bb", "empty"],
+            queries=["q1", "q2"],
+            embedding_function=None,
+            k=3,
+            reranking_function=reranking_function,
+            k_reranker=3,
+            r=0.0,
+            hybrid_bm25_weight=0.5,
+        )
+
+        assert len(calls) == 1
+        # "q1 shared" and "q2 shared" are candidates of both collections
+        assert sorted(calls[0]) == [
+            ("q1", "a q1"),
+            ("q1", "bb q1"),
+            ("q1", "q1 shared"),
+            ("q2", "a q2"),
+            ("q2", "bb q2"),
+            ("q2", "q2 shared"),
+        ]
+        assert result["documents"][0] == ["q1 shared", "q2 shared", "bb q1"]
+        assert result["distances"][0] == [9.0, 9.0, 5.0]
+
+    @pytest.mark.asyncio
+    async def test_relevance_threshold_and_top_k(self, candidates):
+        result = await query_collection_with_hybrid_search(
+            collection_names=["a"],
+            queries=["q"],
+            embedding_function=None,
+            k=1,
+            reranking_function=lambda queries, documents: [
+                0.9 if "shared" in d.page_content else 0.1 for d in documents
+            ],
+            k_reranker=2,
+            r=0.5,
+            hybrid_bm25_weight=0.5,
+        )
+
+        assert result["documents"][0] == ["q shared"]
+        assert result["metadatas"][0] == [{"score": 0.9}]
+
+
+class TestRerankingFunction:
+    def test_batches_pairs_of_all_queries(self):
+        model = Mock()
+        model.predict.return_value = [0.1, 0.2, 0.3]
+        rerank = get_reranking_function("", "model", model)
+
+        documents = [Document(page_content=text) for text in "abc"]
+        assert rerank(["q1", "q2", "q1"], documents) == [0.1, 0.2, 0.3]
+        model.predict.assert_called_once_with(
+            [("q1", "a"), ("q2", "b"), ("q1", "c")], batch_size=32
+        )
+
+    def test_single_query_rerankers_are_grouped_by_query(self):
+        class Reranker(BaseReranker):
+            def predict(self, sentences, user=None):
+                return [len(sentences) + i for i in range(len(sentences))]
+
+        rerank = get_reranking_function("external", "model", Reranker())
+
+        documents = [Document(page_content=text) for text in "abc"]
+        assert rerank(["q1", "q2", "q1"], documents) == [2.0, 1.0, 3.0]
+        assert rerank("q", documents) == [3.0, 4.0, 5.0]
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import open_webui.models.ingestion_jobs as ingestion_jobs_module
+from open_webui.models.ingestion_jobs import IngestionJob, IngestionJobs
+from open_webui.models.users import UserModel
+from open_webui.retrieval.loaders.main import Loader
+from open_webui.utils.ingestion import IngestionQueue, Users
+
+
+@pytest.fixture
+def job_db(memory_db, monkeypatch):
+    monkeypatch.setattr(Users, "get_user_by_id", lambda id: id)
+    return memory_db([IngestionJob], [ingestion_jobs_module])
+
+
+class TestIngestionJobs:
+    def test_claim_by_priority_then_fairly_between_users(self, job_db):
+        IngestionJobs.insert_new_job("a", "upload", {"n": 1}, priority=10)
+        IngestionJobs.insert_new_job("a", "upload", {"n": 2}, priority=10)
+        IngestionJobs.insert_new_job("b", "upload", {"n": 3}, priority=10)
+        IngestionJobs.insert_new_job("c", "reindex", {"n": 4}, priority=0)
+
+        claimed = [IngestionJobs.claim_next_job().payload["n"] for _ in range(4)]
+        # "b" goes before the second job of "a", which already has one running
+        assert claimed == [1, 3, 2, 4]
+        assert IngestionJobs.claim_next_job() is None
+        assert IngestionJobs.get_job_counts() == {"running": 4}
+
+    def test_single_job_not_held_up_by_a_large_batch(self, job_db):
+        for n in range(250):
+            IngestionJobs.insert_new_job("a", "upload", {"n": n}, priority=10)
+        IngestionJobs.insert_new_job("b", "upload", {"n": "b"}, priority=10)
+
+        claimed = [IngestionJobs.claim_next_job().payload["n"] for _ in range(2)]
+        assert claimed == [0, "b"]
+
+    def test_retry_and_requeue(self, job_db):
+        job = IngestionJobs.insert_new_job("a", "upload", {})
+
+        job = IngestionJobs.claim_next_job()
+        assert job.attempts == 1
+        IngestionJobs.fail_job(job.id, "timeout", retry_at=job.run_at + 3600)
+        assert IngestionJobs.claim_next_job() is None
+
+        IngestionJobs.fail_job(job.id, "timeout", retry_at=0)
+        job = IngestionJobs.claim_next_job()
+        assert job.attempts == 2
+
+        assert IngestionJobs.requeue_stale_jobs(timeout=3600) == 0
+        assert IngestionJobs.requeue_stale_jobs(timeout=-1) == 1
+        assert IngestionJobs.get_job_by_id(job.id).status == "pending"
+
+
+class TestIngestionQueue:
+    @pytest.mark.asyncio
+    async def test_jobs_run_and_retry(self, job_db):
+        queue = IngestionQueue(concurrency=2, max_attempts=2, retry_delay=0)
+        errors = []
+
+        def handler(request, user, payload):
+            if payload.get("fail"):
+                raise Exception("extraction failed")
+            return {"user": user, "n": payload["n"]}
+
+        def on_error(request, user, payload, error, retrying):
+            errors.append((error, retrying))
+
+        queue.register("test", handler, on_error=on_error)
+        queue.start(app=None)
+        try:
+            job = queue.enqueue("a", "test", {"n": 1})
+            job = await asyncio.wait_for(queue.wait(job.id), 5)
+            assert job.status == "completed"
+            assert job.result == {"user": "a", "n": 1}
+
+            job = queue.enqueue("a", "test", {"fail": True})
+            job = await asyncio.wait_for(queue.wait(job.id), 5)
+            assert job.status == "failed" and job.attempts == 2
+            assert job.error == "extraction failed"
+            assert errors == [("extraction failed", True), ("extraction failed", False)]
+
+            assert (queue.completed, queue.failed, queue.retried) == (1, 1, 1)
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_concurrency(self, job_db):
+        queue = IngestionQueue(concurrency=2)
+        running = []
+        peak = []
+        release = threading.Event()
+
+        def handler(request, user, payload):
+            running.append(payload["n"])
+            peak.append(len(running))
+            release.wait(5)
+            running.remove(payload["n"])
+
+        queue.register("test", handler)
+        queue.start(app=None)
+        try:
+            jobs = [queue.enqueue("a", "test", {"n": n}) for n in range(4)]
+            await asyncio.sleep(0.2)
+            assert len(running) == 2
+            assert queue.get_stats() == {"pending": 2, "running": 2}
+
+            release.set()
+            for job in jobs:
+                await asyncio.wait_for(queue.wait(job.id), 5)
+            assert max(peak) == 2
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_lets_running_jobs_finish(self, job_db, monkeypatch):
+        monkeypatch.setattr(IngestionQueue, "STOP_TIMEOUT", 1)
+        queue = IngestionQueue(concurrency=2)
+        started = threading.Event()
+        release = threading.Event()
+
+        def handler(request, user, payload):
+            started.set()
+            if payload["slow"]:
+                release.wait(5)
+            else:
+                time.sleep(0.2)
+
+        queue.register("test", handler)
+        queue.start(app=None)
+
+        job = queue.enqueue("a", "test", {"slow": False})
+        await asyncio.to_thread(started.wait, 5)
+        await queue.stop()
+        assert IngestionJobs.get_job_by_id(job.id).status == "completed"
+
+        started.clear()
+        queue.start(app=None)
+        job = queue.enqueue("a", "test", {"slow": True})
+        await asyncio.to_thread(started.wait, 5)
+        await queue.stop()
+        # Still running on its thread, so not handed to another instance
+        assert IngestionJobs.get_job_by_id(job.id).status == "running"
+        release.set()
+
+    @pytest.mark.asyncio
+    async def test_documents_are_loaded_in_worker_processes(self, job_db, tmp_path):
+        file_path = tmp_path / "notes.txt"
+        file_path.write_text("extracted text")
+        user = UserModel(
+            id="a",
+            email="a@example.com",
+            role="user",
+            name="A",
+            profile_image_url="",
+            last_active_at=0,
+            updated_at=0,
+            created_at=0,
+        )
+
+        queue = IngestionQueue(concurrency=1)
+        queue.start(app=None)
+        try:
+            docs = await asyncio.to_thread(
+                queue.load_documents,
+                Loader(user=user),
+                "notes.txt",
+                "text/plain",
+                str(file_path),
+            )
+            assert [doc.page_content for doc in docs] == ["extracted text"]
+        finally:
+            await queue.stop()
+
+        # Loaded in the calling thread once stopped
+        docs = queue.load_documents(Loader(), "notes.txt", "text/plain", str(file_path))
+        assert [doc.page_content for doc in docs] == ["extracted text"]
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout(self, job_db):
+        queue = IngestionQueue(concurrency=1)
+        release = threading.Event()
+        queue.register("test", lambda request, user, payload: release.wait(5))
+        queue.start(app=None)
+        try:
+            job = queue.enqueue("a", "test", {})
+            waited = await asyncio.wait_for(queue.wait(job.id, timeout=0.2), 1)
+            assert waited.status in ("pending", "running")
+
+            release.set()
+            job = await asyncio.wait_for(queue.wait(job.id, timeout=5), 5)
+            assert job.status == "completed"
+        finally:
+            await queue.stop()
+
+    def test_is_full(self, job_db):
+        queue = IngestionQueue(concurrency=1, max_size=2)
+        queue.enqueue("a", "test", {})
+        assert not queue.is_full()
+        queue.enqueue("a", "test", {})
+        assert queue.is_full()
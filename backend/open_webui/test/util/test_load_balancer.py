@@ -0,0 +1,68 @@
+from open_webui.utils.load_balancer import LoadBalancer
+
+URLS = ["http://a:11434", "http://b:11434", "http://c:11434"]
+
+
+class TestLoadBalancer:
+    def test_least_outstanding(self):
+        balancer = LoadBalancer("test", affinity_factor=1.0)
+
+        leases = [balancer.acquire(URLS[idx]) for idx in (0, 0, 1)]
+        assert balancer.select([0, 1, 2], URLS) == 2
+        assert balancer.select([0, 1], URLS) == 1
+
+        for lease in leases:
+            lease.release()
+            lease.release()
+        assert [node["in_flight"] for node in balancer.get_stats()] == [0, 0, 0]
+
+    def test_ewma_prefers_faster_nodes(self):
+        balancer = LoadBalancer("test", strategy="ewma", affinity_factor=1.0)
+        balancer.report(URLS[0], ok=True, latency=2.0)
+        balancer.report(URLS[1], ok=True, latency=0.5)
+
+        assert balancer.select([0, 1], URLS) == 1
+
+        # Until requests queue up on them
+        for _ in range(4):
+            balancer.acquire(URLS[1])
+        assert balancer.select([0, 1], URLS) == 0
+
+    def test_model_affinity(self):
+        balancer = LoadBalancer("test", affinity_factor=4.0)
+        balancer.set_models(URLS[1], ["llama3:latest"])
+
+        assert balancer.select([0, 1, 2], URLS, "llama3:latest") == 1
+
+        # Requests go to another node once the node with the model is busy
+        leases = [balancer.acquire(URLS[1], "llama3:latest") for _ in range(4)]
+        assert balancer.select([0, 1, 2], URLS, "llama3:latest") in (0, 2)
+
+        # Nodes that served the model have it loaded
+        balancer.acquire(URLS[2], "mistral:latest").responded(200)
+        assert balancer.select([0, 1, 2], URLS, "mistral:latest") == 2
+
+    def test_failing_nodes_are_ejected(self):
+        balancer = LoadBalancer("test", max_failures=2, ejection_time=60)
+
+        balancer.acquire(URLS[0]).failed()
+        balancer.acquire(URLS[0]).responded(502)
+        assert {balancer.select([0, 1], URLS) for _ in range(20)} == {1}
+
+        # Unless all nodes are
+        balancer.report(URLS[1], ok=False)
+        balancer.report(URLS[1], ok=False)
+        assert balancer.select([0, 1], URLS) in (0, 1)
+
+        balancer.report(URLS[0], ok=True)
+        stats = {node["url"]: node for node in balancer.get_stats()}
+        assert not stats[URLS[0]]["ejected"] and stats[URLS[1]]["ejected"]
+        assert stats[URLS[0]]["ejections"] == 1
+        assert stats[URLS[0]]["failures"] == 2
+
+    def test_random(self):
+        balancer = LoadBalancer("test", strategy="random")
+        for _ in range(10):
+            balancer.acquire(URLS[0])
+
+        assert {balancer.select([0, 1], URLS) for _ in range(100)} == {0, 1}
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+import open_webui.utils.model_catalog as model_catalog
+from open_webui.utils.model_catalog import Catalog, ModelCatalog, etag_matches
+
+
+def model_info(user_id="owner", read=None):
+    return SimpleNamespace(
+        user_id=user_id,
+        access_control=None if read is None else {"read": read},
+    )
+
+
+MODELS = [
+    {"id": "public"},
+    {"id": "private"},
+    {"id": "group"},
+    {"id": "shared"},
+    {"id": "unlisted"},
+    {"id": "arena", "arena": True, "info": {"meta": {"access_control": None}}},
+]
+
+MODEL_INFOS = {
+    "public": model_info(),
+    "private": model_info(read={}),
+    "group": model_info(read={"group_ids": ["g"]}),
+    "shared": model_info(read={"user_ids": ["u"]}),
+}
+
+
+@pytest.fixture(autouse=True)
+def group_ids(monkeypatch):
+    monkeypatch.setattr(
+        model_catalog,
+        "get_user_group_ids",
+        lambda user_id: {"g"} if user_id == "member" else set(),
+    )
+
+
+def get_ids(catalog, user_id, role="user"):
+    user = SimpleNamespace(id=user_id, role=role)
+    return [catalog.models[idx]["id"] for idx in catalog.get_indices(user)]
+
+
+class TestCatalog:
+    def test_views_follow_access_control(self):
+        catalog = Catalog(MODELS, MODEL_INFOS)
+
+        assert get_ids(catalog, "other") == ["public", "arena"]
+        assert get_ids(catalog, "owner") == [
+            "public",
+            "private",
+            "group",
+            "shared",
+            "arena",
+        ]
+        assert get_ids(catalog, "member") == ["public", "group", "arena"]
+        assert get_ids(catalog, "u") == ["public", "shared", "arena"]
+        assert get_ids(catalog, "p", role="pending") == [m["id"] for m in MODELS]
+
+    def test_etags_depend_on_content(self):
+        user = SimpleNamespace(id="other", role="user")
+
+        etag, body = Catalog(MODELS, MODEL_INFOS).get_response(user)
+        assert (
+            body
+            == b'{"data":[{"id":"public"},{"id":"arena","arena":true,"info":{"meta":{"access_control":null}}}]}'
+        )
+        assert Catalog(MODELS, MODEL_INFOS).get_response(user)[0] == etag
+
+        models = [{**MODELS[0], "name": "renamed"}, *MODELS[1:]]
+        assert Catalog(models, MODEL_INFOS).get_response(user)[0] != etag
+        assert (
+            Catalog(MODELS, MODEL_INFOS).get_response(
+                SimpleNamespace(id="owner", role="user")
+            )[0]
+            != etag
+        )
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+    assert not etag_matches('"ab"', etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches('"xabc"', etag)
+
+
+class TestModelCatalog:
+    @pytest.mark.asyncio
+    async def test_builds_are_reused_until_a_change(self, monkeypatch):
+        functions = SimpleNamespace(version=0)
+        models = Mock(version=0)
+        models.get_all_models.return_value = []
+        get_all_models = AsyncMock(return_value=[{"id": "public"}])
+
+        monkeypatch.setattr(model_catalog, "Functions", functions)
+        monkeypatch.setattr(model_catalog, "Models", models)
+        monkeypatch.setattr(model_catalog, "get_all_models", get_all_models)
+
+        config = SimpleNamespace(version=0, MODEL_ORDER_LIST=[])
+        request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(config=config))
+        )
+        catalog = ModelCatalog(ttl=60)
+
+        first = await catalog.get(request, None)
+        assert await catalog.get(request, None) is first
+        assert get_all_models.call_count == 1
+
+        for change in [functions, models, config]:
+            change.version += 1
+            await catalog.get(request, None)
+        await catalog.get(request, None, refresh=True)
+        assert get_all_models.call_count == 5
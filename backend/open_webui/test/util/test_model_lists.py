@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils.model_lists import ModelListCache
+
+URL = "http://localhost:11434"
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.delay = 0.0
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise Exception("connection refused")
+        return {"data": [{"id": f"model-{self.calls}"}]}
+
+
+class TestModelListCache:
+    @pytest.mark.asyncio
+    async def test_first_requests_share_one_fetch(self):
+        cache = ModelListCache(interval=30)
+        upstream = Upstream()
+        upstream.delay = 0.05
+
+        responses = await asyncio.gather(
+            *[cache.get(URL, None, upstream.fetch) for _ in range(5)]
+        )
+
+        assert upstream.calls == 1
+        assert all(r == {"data": [{"id": "model-1"}]} for r in responses)
+
+    @pytest.mark.asyncio
+    async def test_stale_list_served_while_refreshing(self):
+        cache = ModelListCache(interval=0.01)
+        upstream = Upstream()
+        await cache.get(URL, None, upstream.fetch)
+
+        upstream.delay = 0.1
+        await asyncio.sleep(0.02)
+        response = await asyncio.wait_for(cache.get(URL, None, upstream.fetch), 0.05)
+        assert response == {"data": [{"id": "model-1"}]}
+
+        # The refresh finishes in the background
+        await cache.snapshots[(URL, None)].task
+        response = await cache.get(URL, None, upstream.fetch)
+        assert response == {"data": [{"id": "model-2"}]}
+        assert upstream.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_last_list(self):
+        cache = ModelListCache(interval=0.01)
+        upstream = Upstream()
+        await cache.get(URL, "key", upstream.fetch)
+
+        upstream.fail = True
+        await asyncio.sleep(0.02)
+        await cache.get(URL, "key", upstream.fetch)
+        await cache.snapshots[(URL, "key")].task
+
+        assert await cache.get(URL, "key", upstream.fetch) == {
+            "data": [{"id": "model-1"}]
+        }
+        [stats] = cache.get_stats()
+        assert stats["stale"] and stats["error"] == "connection refused"
+
+        upstream.fail = False
+        await asyncio.sleep(0.02)
+        await cache.get(URL, "key", upstream.fetch)
+        await cache.snapshots[(URL, "key")].task
+        assert not cache.get_stats()[0]["stale"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self):
+        cache = ModelListCache(interval=30)
+        upstream, other = Upstream(), Upstream()
+        await cache.get(f"{URL}/api/tags", None, upstream.fetch)
+        await cache.get("http://other:11434/api/tags", None, other.fetch)
+
+        cache.invalidate(URL)
+        assert cache.version == 1
+        response = await cache.get(f"{URL}/api/tags", None, upstream.fetch)
+        assert response == {"data": [{"id": "model-2"}]}
+        await cache.get("http://other:11434/api/tags", None, other.fetch)
+        assert other.calls == 1
+
+        cache.invalidate()
+        await cache.get("http://other:11434/api/tags", None, other.fetch)
+        assert other.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_matches_whole_urls(self):
+        cache = ModelListCache(interval=30)
+        upstream, other = Upstream(), Upstream()
+        await cache.get("http://host:11434/api/tags", None, upstream.fetch)
+        await cache.get("http://host:1143/api/tags", None, other.fetch)
+
+        cache.invalidate("http://host:1143/")
+        await cache.get("http://host:11434/api/tags", None, upstream.fetch)
+        await cache.get("http://host:1143/api/tags", None, other.fetch)
+        assert upstream.calls == 1
+        assert other.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_callers_get_copies(self):
+        cache = ModelListCache(interval=30)
+        upstream = Upstream()
+
+        response = await cache.get(URL, None, upstream.fetch)
+        response["data"][0]["id"] = "prefix.model-1"
+
+        assert await cache.get(URL, None, upstream.fetch) == {
+            "data": [{"id": "model-1"}]
+        }
+
+    @pytest.mark.asyncio
+    async def test_run_refreshes_and_drops_idle_connections(self):
+        cache = ModelListCache(interval=0.01)
+        cache.MAX_IDLE_INTERVALS = 5
+        upstream = Upstream()
+        await cache.get(URL, None, upstream.fetch)
+
+        task = asyncio.create_task(cache.run())
+        await asyncio.sleep(0.03)
+        assert upstream.calls > 1
+
+        await asyncio.sleep(0.1)
+        assert cache.snapshots == {}
+
+        task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        cache = ModelListCache(interval=0)
+        upstream = Upstream()
+
+        await cache.get(URL, None, upstream.fetch)
+        await cache.get(URL, None, upstream.fetch)
+        assert upstream.calls == 2
+        assert cache.snapshots == {}
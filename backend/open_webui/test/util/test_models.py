@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+import open_webui.utils.models as models_utils
+from open_webui.models.models import ModelMeta, ModelModel
+from open_webui.utils.models import get_all_models, get_filtered_models
+
+
+def custom_model(id, base_model_id=None, is_active=True, **meta):
+    return ModelModel(
+        id=id,
+        user_id="owner",
+        base_model_id=base_model_id,
+        name=f"Custom {id}",
+        params={"system": "secret"},
+        meta=ModelMeta(**meta),
+        access_control=None,
+        is_active=is_active,
+        updated_at=0,
+        created_at=0,
+    )
+
+
+def function(id, type, is_global=False):
+    return SimpleNamespace(
+        id=id,
+        name=id,
+        type=type,
+        is_active=True,
+        is_global=is_global,
+        meta=SimpleNamespace(description="", manifest={}),
+    )
+
+
+@pytest.fixture
+def request_(monkeypatch):
+    functions = Mock()
+    functions.get_functions.return_value = [
+        function("action", "action", is_global=True),
+        function("toggle", "filter"),
+    ]
+    models = Mock()
+    models.get_all_models.return_value = [
+        custom_model("llama3", filterIds=["toggle"]),
+        custom_model("hidden", is_active=False),
+        custom_model("preset", base_model_id="llama3"),
+        custom_model("preset-of-preset", base_model_id="preset"),
+    ]
+    modules = {"action": SimpleNamespace(), "toggle": SimpleNamespace(toggle=True)}
+
+    monkeypatch.setattr(models_utils, "Functions", functions)
+    monkeypatch.setattr(models_utils, "Models", models)
+    monkeypatch.setattr(
+        models_utils,
+        "get_function_module_from_cache",
+        lambda request, function_id: (modules[function_id], None, None),
+    )
+
+    state = SimpleNamespace(
+        MODELS={},
+        BASE_MODELS=[
+            {"id": "hidden", "owned_by": "openai"},
+            {"id": "llama3:8b", "owned_by": "ollama", "connection_type": "local"},
+            {"id": "llama3:70b", "owned_by": "ollama", "connection_type": "local"},
+            {"id": "gpt", "owned_by": "openai"},
+        ],
+        config=SimpleNamespace(
+            ENABLE_BASE_MODELS_CACHE=True, ENABLE_EVALUATION_ARENA_MODELS=False
+        ),
+    )
+    state.MODELS = {"cached": True}
+    return SimpleNamespace(app=SimpleNamespace(state=state))
+
+
+class TestGetAllModels:
+    @pytest.mark.asyncio
+    async def test_custom_models_are_merged(self, request_):
+        models = {model["id"]: model for model in await get_all_models(request_)}
+
+        assert list(models) == [
+            "llama3:8b",
+            "llama3:70b",
+            "gpt",
+            "preset",
+            "preset-of-preset",
+        ]
+        for id in ["llama3:8b", "llama3:70b"]:
+            assert models[id]["name"] == "Custom llama3"
+            assert "params" not in models[id]["info"]
+            assert [f["id"] for f in models[id]["filters"]] == ["toggle"]
+
+        assert models["preset"]["owned_by"] == "ollama"
+        assert models["preset"]["connection_type"] == "local"
+        assert models["preset-of-preset"]["owned_by"] == "ollama"
+        assert models["gpt"]["filters"] == []
+        assert [a["id"] for a in models["gpt"]["actions"]] == ["action"]
+
+        # Items are resolved once, but every model gets its own
+        assert models["gpt"]["actions"][0] is not models["preset"]["actions"][0]
+        assert models_utils.Functions.get_functions.call_count == 1
+
+
+class TestGetFilteredModels:
+    def test_model_infos_are_loaded_once(self, request_, monkeypatch):
+        monkeypatch.setattr(models_utils, "get_user_group_ids", lambda id: set())
+        user = SimpleNamespace(id="owner", role="user")
+
+        filtered = get_filtered_models(
+            [{"id": "preset"}, {"id": "llama3"}, {"id": "unknown"}], user
+        )
+
+        assert [model["id"] for model in filtered] == ["preset", "llama3"]
+        assert models_utils.Models.get_all_models.call_count == 1
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+from open_webui.socket.utils import CachedRedisDict
+
+
+class FakeRedis:
+    """The few commands RedisDict uses, shared by all instances of a test."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.published = []
+
+    def get(self, key):
+        self.commands.append("get")
+        value = self.data.get(key)
+        return str(value) if value is not None else None
+
+    def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    def hget(self, name, key):
+        self.commands.append("hget")
+        return self.data.get(name, {}).get(key)
+
+    def hgetall(self, name):
+        self.commands.append("hgetall")
+        return dict(self.data.get(name, {}))
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        hash = self.data.setdefault(name, {})
+        if mapping:
+            hash.update(mapping)
+        else:
+            hash[key] = value
+
+    def hdel(self, name, key):
+        return 1 if self.data.get(name, {}).pop(key, None) is not None else 0
+
+    def delete(self, name):
+        self.data.pop(name, None)
+
+    def publish(self, channel, message):
+        self.published.append(json.loads(message))
+
+    def pipeline(self):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [
+                    getattr(redis, name)(*args, **kwargs)
+                    for name, args, kwargs in self.calls
+                ]
+
+        return Pipeline()
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+def create_dict(redis, sync_interval=60):
+    redis_dict = CachedRedisDict(
+        "test:models", "redis://localhost:6379", sync_interval=sync_interval
+    )
+    redis_dict.redis = redis
+    return redis_dict
+
+
+class TestCachedRedisDict:
+    def test_reads_are_served_locally(self, redis):
+        models = create_dict(redis)
+        models["llama3"] = {"id": "llama3"}
+
+        for _ in range(3):
+            assert models["llama3"] == {"id": "llama3"}
+            assert "llama3" in models
+            assert "mistral" not in models
+            assert models.get("mistral") is None
+
+        # One version check and one lookup of the missing key
+        assert redis.commands == ["get", "hget"]
+
+    def test_writes_invalidate_other_instances(self, redis):
+        worker_1, worker_2 = create_dict(redis), create_dict(redis)
+        worker_1["llama3"] = {"id": "llama3"}
+        assert worker_2["llama3"] == {"id": "llama3"}
+
+        worker_1["llama3"] = {"id": "llama3", "name": "Llama 3"}
+        [message] = redis.published[-1:]
+        assert message == {"id": worker_1.id, "keys": ["llama3"]}
+
+        # Until the invalidation arrives, worker 2 serves its copy
+        assert worker_2["llama3"] == {"id": "llama3"}
+        for key in message["keys"]:
+            worker_2.invalidate(key)
+        assert worker_2["llama3"] == {"id": "llama3", "name": "Llama 3"}
+
+    def test_version_catches_missed_invalidations(self, redis):
+        worker_1, worker_2 = create_dict(redis), create_dict(redis, sync_interval=0)
+        worker_1["sid"] = {"id": "user-1"}
+        assert worker_2["sid"] == {"id": "user-1"}
+
+        del worker_1["sid"]
+        assert "sid" not in worker_2
+
+    def test_own_writes_keep_the_cache(self, redis):
+        models = create_dict(redis, sync_interval=0)
+        models.set({"a": {"id": "a"}, "b": {"id": "b"}})
+        assert models.keys() == ["a", "b"]
+
+        models["c"] = {"id": "c"}
+        redis.commands.clear()
+        assert len(models) == 3
+        assert models.items() == [
+            ("a", {"id": "a"}),
+            ("b", {"id": "b"}),
+            ("c", {"id": "c"}),
+        ]
+        assert "hgetall" not in redis.commands
+
+    def test_delete_missing_key(self, redis):
+        models = create_dict(redis)
+        with pytest.raises(KeyError):
+            del models["llama3"]
+        with pytest.raises(KeyError):
+            models["llama3"]
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from open_webui.utils.session_pool import ClientSessionPool
+
+
+@pytest_asyncio.fixture
+async def server():
+    async def handler(request):
+        response = web.json_response({"cookie": request.cookies.get("session")})
+        response.set_cookie("session", "upstream")
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+
+    port = runner.addresses[0][1]
+    yield f"http://127.0.0.1:{port}"
+
+    await runner.cleanup()
+
+
+class TestClientSessionPool:
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, server):
+        pool = ClientSessionPool(limit=0, keepalive_timeout=30, dns_cache_ttl=300)
+
+        for path in ("models", "chat/completions", "embeddings"):
+            session = pool.get_session(f"{server}/{path}")
+            async with session.get(f"{server}/{path}") as r:
+                await r.json()
+
+        assert pool.size == 1
+        assert pool.requests == 3
+        assert pool.connections_created == 1
+        assert pool.connections_reused == 2
+
+        await pool.close()
+        assert pool.size == 0
+        assert session.closed
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_per_origin(self, server):
+        pool = ClientSessionPool(limit=0, keepalive_timeout=30, dns_cache_ttl=300)
+
+        session = pool.get_session(f"{server}/v1")
+        assert pool.get_session(f"{server}/api/tags") is session
+        assert pool.get_session(server.replace("127.0.0.1", "localhost")) is not session
+        assert pool.size == 2
+
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_cookies_are_not_shared(self, server):
+        pool = ClientSessionPool(limit=0, keepalive_timeout=30, dns_cache_ttl=300)
+        session = pool.get_session(server)
+
+        async with session.get(server) as r:
+            assert (await r.json())["cookie"] is None
+        async with session.get(server) as r:
+            assert (await r.json())["cookie"] is None
+        async with session.get(server, cookies={"session": "user"}) as r:
+            assert (await r.json())["cookie"] == "user"
+
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_keepalive_disabled(self, server):
+        pool = ClientSessionPool(limit=0, keepalive_timeout=0, dns_cache_ttl=0)
+
+        for _ in range(2):
+            async with pool.get_session(server).get(server) as r:
+                await r.json()
+
+        assert pool.connections_created == 2
+        assert pool.connections_reused == 0
+
+        await pool.close()
+
+    def test_sessions_of_other_event_loops(self):
+        pool = ClientSessionPool(limit=0, keepalive_timeout=30, dns_cache_ttl=300)
+
+        async def get_session():
+            return pool.get_session("http://127.0.0.1:1")
+
+        async def get_and_close_session():
+            session = pool.get_session("http://127.0.0.1:1")
+            await pool.close()
+            return session
+
+        assert asyncio.run(get_and_close_session()).closed
+        assert pool.size == 0
+
+        # Sessions left behind by a finished event loop aren't reused
+        session = asyncio.run(get_session())
+        assert asyncio.run(get_session()) is not session
+        assert pool.size == 1
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from pydantic import BaseModel
+
+import open_webui.utils.filter as filter_utils
+from open_webui.utils.filter import StreamFilterChain
+
+
+class Filter:
+    class Valves(BaseModel):
+        suffix: str = ""
+
+    class UserValves(BaseModel):
+        upper: bool = False
+
+    def __init__(self):
+        self.valves = self.Valves()
+
+    def stream(self, event, __user__, __id__):
+        content = event["content"] + self.valves.suffix
+        if __user__["valves"].upper:
+            content = content.upper()
+        return {"content": content, "id": __id__}
+
+
+@pytest.fixture
+def functions(monkeypatch):
+    functions = Mock()
+    functions.version = 0
+    functions.get_function_valves_by_id.return_value = {"suffix": "!"}
+    functions.get_user_valves_by_id_and_user_id.return_value = {"upper": True}
+
+    module = Filter()
+    monkeypatch.setattr(filter_utils, "Functions", functions)
+    monkeypatch.setattr(
+        filter_utils, "get_function_module", lambda request, filter_id: module
+    )
+    return functions
+
+
+class TestStreamFilterChain:
+    @pytest.mark.asyncio
+    async def test_valves_are_resolved_once(self, functions):
+        user = {"id": "u"}
+        chain = StreamFilterChain(
+            None, [SimpleNamespace(id="f")], {"__user__": user, "__body__": {}}
+        )
+
+        for _ in range(3):
+            assert await chain({"content": "a"}) == {"content": "A!", "id": "f"}
+
+        assert functions.get_function_valves_by_id.call_count == 1
+        assert functions.get_user_valves_by_id_and_user_id.call_count == 1
+        assert "valves" not in user
+
+    @pytest.mark.asyncio
+    async def test_recompiles_after_update(self, functions):
+        chain = StreamFilterChain(
+            None, [SimpleNamespace(id="f")], {"__user__": {"id": "u"}}
+        )
+        functions.get_function_valves_by_id.return_value = {"suffix": "?"}
+
+        assert await chain({"content": "a"}) == {"content": "A!", "id": "f"}
+
+        functions.version += 1
+        assert await chain({"content": "a"}) == {"content": "A?", "id": "f"}
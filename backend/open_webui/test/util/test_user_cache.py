@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+import open_webui.utils.last_active as last_active
+from open_webui.utils.last_active import LastActiveBuffer
+from open_webui.utils.user_cache import UserCache
+
+
+class User(SimpleNamespace):
+    def model_copy(self):
+        return User(**vars(self))
+
+
+class TestUserCache:
+    def test_users_are_cached_until_invalidated(self):
+        cache = UserCache(ttl=60)
+        load = Mock(side_effect=lambda id: User(id=id, role="user"))
+
+        assert cache.get_user_by_id("u", load).role == "user"
+        cache.get_user_by_id("u", load).role = "admin"
+        assert cache.get_user_by_id("u", load).role == "user"
+        assert load.call_count == 1
+
+        cache.invalidate("u")
+        cache.get_user_by_id("u", load)
+        assert load.call_count == 2
+
+    def test_api_keys_are_invalidated_with_their_user(self):
+        cache = UserCache(ttl=60)
+        load = Mock(return_value=User(id="u"))
+
+        cache.get_user_by_api_key("sk-1", load)
+        cache.get_user_by_api_key("sk-1", load)
+        assert load.call_count == 1
+
+        cache.invalidate("u")
+        cache.get_user_by_api_key("sk-1", load)
+        assert load.call_count == 2
+
+    def test_missing_users_and_racing_loads_are_not_cached(self):
+        cache = UserCache(ttl=60)
+
+        load = Mock(return_value=None)
+        assert cache.get_user_by_id("u", load) is None
+        cache.get_user_by_id("u", load)
+        assert load.call_count == 2
+
+        def racing_load(id):
+            cache.invalidate(id)
+            return User(id=id)
+
+        cache.get_user_by_id("u", racing_load)
+        assert "u" not in cache.users
+
+    def test_ttl(self):
+        cache = UserCache(ttl=0.000001)
+        load = Mock(return_value=User(id="u"))
+
+        cache.get_user_by_id("u", load)
+        cache.get_user_by_id("u", load)
+        assert load.call_count == 2
+
+    def test_redis_version_is_shared(self):
+        redis = Mock()
+        redis.get.return_value = "1"
+        cache = UserCache(ttl=60, redis=redis, sync_interval=0)
+        load = Mock(side_effect=lambda id: User(id=id, role="user"))
+
+        cache.get_user_by_id("u", load)
+        cache.get_user_by_api_key("sk-1", Mock(return_value=User(id="u")))
+        cache.get_user_by_id("u", load)
+        assert load.call_count == 1
+
+        # Another instance demoted or deleted a user
+        redis.get.return_value = "2"
+        cache.get_user_by_id("u", load)
+        assert load.call_count == 2
+        assert "sk-1" not in cache.api_keys
+
+        cache.invalidate("u")
+        redis.incr.assert_called_once_with("open-webui:users:version")
+
+
+class TestLastActiveBuffer:
+    @pytest.mark.asyncio
+    async def test_updates_are_written_in_bulk(self, monkeypatch):
+        users = Mock()
+        monkeypatch.setattr(last_active, "Users", users)
+        buffer = LastActiveBuffer(interval=0.01)
+
+        for user_id in ["a", "b", "a", "c"]:
+            buffer.touch(user_id)
+        assert not users.update_last_active_by_ids.called
+
+        await asyncio.sleep(0.05)
+        users.update_last_active_by_ids.assert_called_once()
+        assert sorted(users.update_last_active_by_ids.call_args[0][0]) == [
+            "a",
+            "b",
+            "c",
+        ]
+
+        buffer.touch("a")
+        await buffer.flush()
+        assert users.update_last_active_by_ids.call_count == 2
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+
+import pycrdt as Y
+import pytest
+
+import open_webui.socket.utils as socket_utils
+from open_webui.socket.utils import YdocManager
+
+
+def get_updates(count: int) -> tuple[Y.Doc, list[bytes]]:
+    ydoc = Y.Doc()
+    text = ydoc.get("prosemirror", type=Y.Text)
+    updates = []
+    ydoc.observe(lambda event: updates.append(event.update))
+
+    for i in range(count):
+        text.insert(len(text), f"word{i} ")
+        if i % 3 == 0:
+            del text[len(text) - 2 :]
+    return ydoc, updates
+
+
+def get_text(state: bytes) -> str:
+    ydoc = Y.Doc()
+    ydoc.apply_update(state)
+    return str(ydoc.get("prosemirror", type=Y.Text))
+
+
+class FakeRedis:
+    """The set commands YdocManager uses to track the users of documents."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = 0
+
+    async def sadd(self, key, value):
+        self.commands += 1
+        self.data.setdefault(key, set()).add(value.encode())
+
+    async def srem(self, key, value):
+        self.commands += 1
+        self.data.get(key, set()).discard(value.encode())
+
+    async def smembers(self, key):
+        self.commands += 1
+        return set(self.data.get(key, set()))
+
+    async def delete(self, key):
+        self.commands += 1
+        self.data.pop(key, None)
+
+    async def keys(self, pattern):
+        raise AssertionError("KEYS scans the whole keyspace")
+
+
+class TestYdocManager:
+    @pytest.mark.asyncio
+    async def test_state_merges_the_log(self):
+        manager = YdocManager()
+        ydoc, updates = get_updates(20)
+        for update in updates:
+            await manager.append_to_updates("note:1", update)
+
+        state = await manager.get_state("note:1")
+        assert get_text(state) == str(ydoc.get("prosemirror", type=Y.Text))
+        assert await manager.get_updates("note:1") == [state]
+
+        # Updates made after the state was read are kept
+        text = ydoc.get("prosemirror", type=Y.Text)
+        text.insert(0, "title ")
+        await manager.append_to_updates("note:1", updates[-1])
+        assert get_text(await manager.get_state("note:1")) == str(text)
+
+    @pytest.mark.asyncio
+    async def test_log_is_compacted(self):
+        manager = YdocManager(compaction_threshold=10)
+        ydoc, updates = get_updates(25)
+        for update in updates:
+            await manager.append_to_updates("note:1", update)
+
+        assert len(await manager.get_updates("note:1")) < 10
+        assert get_text(await manager.get_state("note:1")) == str(
+            ydoc.get("prosemirror", type=Y.Text)
+        )
+
+    @pytest.mark.asyncio
+    async def test_overlapping_compactions_keep_new_updates(self, monkeypatch):
+        manager = YdocManager()
+        ydoc, updates = get_updates(30)
+        for update in updates[:10]:
+            await manager.append_to_updates("note:1", update)
+
+        merging = threading.Event()
+        resume = threading.Event()
+        merge_ydoc_updates = socket_utils.merge_ydoc_updates
+
+        def slow_merge(updates):
+            if not merging.is_set():
+                merging.set()
+                resume.wait(5)
+            return merge_ydoc_updates(updates)
+
+        monkeypatch.setattr(socket_utils, "merge_ydoc_updates", slow_merge)
+
+        # Both read the same 10 updates, the second compacts them first
+        slow_state = asyncio.create_task(manager.get_state("note:1"))
+        await asyncio.to_thread(merging.wait, 5)
+        await manager.get_state("note:1")
+        for update in updates[10:]:
+            await manager.append_to_updates("note:1", update)
+
+        resume.set()
+        await slow_state
+
+        assert len(await manager.get_updates("note:1")) == len(updates) - 9
+        assert get_text(await manager.get_state("note:1")) == str(
+            ydoc.get("prosemirror", type=Y.Text)
+        )
+
+    @pytest.mark.asyncio
+    async def test_empty_document(self):
+        manager = YdocManager()
+        assert await manager.get_state("note:1") == b"\x00\x00"
+
+    @pytest.mark.asyncio
+    async def test_updates_sent_as_lists(self):
+        manager = YdocManager()
+        update = get_updates(1)[1][0]
+        await manager.append_to_updates("note:1", list(update))
+
+        assert await manager.get_updates("note:1") == [update]
+
+    def test_legacy_json_updates(self):
+        manager = YdocManager()
+        update = get_updates(1)[1][0]
+
+        assert manager._decode_update(json.dumps(list(update)).encode()) == update
+        assert manager._decode_update(update) == update
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("redis", [None, FakeRedis()])
+    async def test_disconnect_only_touches_joined_documents(self, redis):
+        manager = YdocManager(redis=redis)
+        for i in range(5000):
+            await manager.add_user(f"note:{i}", f"sid-{i}")
+        await manager.add_user("note:1", "sid-a")
+        await manager.add_user("note:2", "sid-a")
+        await manager.add_user("note:3", "sid-a")
+        await manager.remove_user("note:3", "sid-a")
+
+        commands = redis.commands if redis else 0
+        await manager.remove_user_from_all_documents("sid-a")
+        if redis:
+            # Lookup, then leave and check the users of both documents
+            assert redis.commands - commands == 1 + 2 * 3 + 1
+
+        assert await manager.get_documents("sid-a") == []
+        assert set(await manager.get_users("note:1")) == {"sid-1"}
+        assert set(await manager.get_users("note:2")) == {"sid-2"}
+
+        await manager.remove_user_from_all_documents("sid-1")
+        assert set(await manager.get_users("note:1")) == set()
+        assert await manager.get_documents("sid-1") == []
+        assert set(await manager.get_users("note:4999")) == {"sid-4999"}
@@ -1,10 +1,36 @@
 from typing import Optional, Set, Union, List, Dict, Any
 from open_webui.models.users import Users, UserModel
-from open_webui.models.groups import Groups
+from open_webui.models.groups import Groups, GroupModel
+from open_webui.utils.group_cache import GROUP_CACHE
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
-import json
+
+
+def get_user_groups(user_id: str) -> list[GroupModel]:
+    """
+    Get the groups a user is a member of, cached until groups or memberships
+    change. The result is shared, don't modify it.
+    """
+    return GROUP_CACHE.get(
+        "groups", user_id, lambda: Groups.get_groups_by_member_id(user_id)
+    )
+
+
+def get_user_group_ids(user_id: str) -> Set[str]:
+    """Get the ids of the groups a user is a member of, see `get_user_groups`."""
+    return GROUP_CACHE.get(
+        "group_ids",
+        user_id,
+        lambda: frozenset(group.id for group in get_user_groups(user_id)),
+    )
+
+
+def copy_permissions(permissions: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: copy_permissions(value) if isinstance(value, dict) else value
+        for key, value in permissions.items()
+    }
 
 
 def fill_missing_permissions(
@@ -53,19 +79,24 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    def resolve_permissions():
+        # Deep copy default permissions to avoid modifying the original dict
+        permissions = copy_permissions(default_permissions)
 
-    # Deep copy default permissions to avoid modifying the original dict
-    permissions = json.loads(json.dumps(default_permissions))
+        # Combine permissions from all user groups
+        for group in get_user_groups(user_id):
+            permissions = combine_permissions(permissions, group.permissions or {})
 
-    # Combine permissions from all user groups
-    for group in user_groups:
-        permissions = combine_permissions(permissions, group.permissions or {})
+        # Ensure all fields from default_permissions are present and filled in
+        permissions = fill_missing_permissions(permissions, default_permissions)
 
-    # Ensure all fields from default_permissions are present and filled in
-    permissions = fill_missing_permissions(permissions, default_permissions)
+        # Keeping a reference to the defaults keeps their id from being reused
+        return default_permissions, permissions
 
-    return permissions
+    _, permissions = GROUP_CACHE.get(
+        ("permissions", id(default_permissions)), user_id, resolve_permissions
+    )
+    return copy_permissions(permissions)
 
 
 def has_permission(
@@ -92,9 +123,7 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
-
-    for group in user_groups:
+    for group in get_user_groups(user_id):
         if get_permission(group.permissions or {}, permission_hierarchy):
             return True
 
@@ -135,8 +164,7 @@ def has_access(
             return True
 
     if user_group_ids is None:
-        user_groups = Groups.get_groups_by_member_id(user_id)
-        user_group_ids = {group.id for group in user_groups}
+        user_group_ids = get_user_group_ids(user_id)
 
     permitted_ids = get_permitted_group_and_user_ids(type, access_control)
     if permitted_ids is None:
@@ -24,6 +24,8 @@ from opentelemetry import trace
 
 from open_webui.utils.access_control import has_permission
 from open_webui.models.users import Users
+from open_webui.utils.last_active import LAST_ACTIVE_BUFFER
+from open_webui.utils.user_cache import USER_CACHE
 
 from open_webui.constants import ERROR_MESSAGES
 
@@ -316,7 +318,7 @@ async def get_current_user(
                     detail="Invalid token",
                 )
 
-            user = Users.get_user_by_id(data["id"])
+            user = USER_CACHE.get_user_by_id(data["id"], Users.get_user_by_id)
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -341,10 +343,8 @@ async def get_current_user(
                     current_span.set_attribute("client.user.role", user.role)
                     current_span.set_attribute("client.auth.type", "jwt")
 
-                # Refresh the user's last active timestamp asynchronously
-                # to prevent blocking the request
-                if background_tasks:
-                    background_tasks.add_task(Users.update_last_active_by_id, user.id)
+                # Written in bulk later, to keep it off the request path
+                LAST_ACTIVE_BUFFER.touch(user.id)
             return user
         else:
             raise HTTPException(
@@ -367,7 +367,7 @@ async def get_current_user(
 
 
 def get_current_user_by_api_key(request, api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    user = USER_CACHE.get_user_by_api_key(api_key, Users.get_user_by_api_key)
 
     if user is None:
         raise HTTPException(
@@ -395,7 +395,7 @@ def get_current_user_by_api_key(request, api_key: str):
         current_span.set_attribute("client.user.role", user.role)
         current_span.set_attribute("client.auth.type", "api_key")
 
-    Users.update_last_active_by_id(user.id)
+    LAST_ACTIVE_BUFFER.touch(user.id)
     return user
 
 
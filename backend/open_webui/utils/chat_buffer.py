@@ -0,0 +1,141 @@
+import asyncio
+import copy
+import logging
+from typing import Any, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    CHAT_SAVE_BUFFER_INTERVAL,
+    CHAT_SAVE_BUFFER_MAX_UPDATES,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class ChatMessageBuffer:
+    """
+    Write-behind buffer in front of `Chats` for message updates arriving at
+    streaming rate.
+
+    Updates are coalesced per (chat_id, message_id) and written as a single
+    patch once `interval` seconds have passed since the first pending update
+    or `max_updates` updates have been merged, whichever comes first. Callers
+    flush explicitly when a response completes or is cancelled.
+
+    Database calls run in the thread pool so they don't block the event loop,
+    and calls for the same chat are executed in the order they were issued.
+    """
+
+    def __init__(self, interval: float, max_updates: int):
+        self.interval = interval
+        self.max_updates = max_updates
+
+        self.pending: dict[tuple[str, str], dict] = {}
+        self.tasks: set[asyncio.Task] = set()
+        # chat_id -> [lock, number of calls holding or waiting for it]
+        self.locks: dict[str, list] = {}
+
+    async def run(self, chat_id: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking `Chats` call off the event loop, ordered per chat."""
+        lock = self.locks.setdefault(chat_id, [asyncio.Lock(), 0])
+        lock[1] += 1
+
+        try:
+            # asyncio.Lock wakes up waiters in FIFO order
+            async with lock[0]:
+                return await run_in_threadpool(func, *args, **kwargs)
+        finally:
+            lock[1] -= 1
+            if lock[1] == 0:
+                del self.locks[chat_id]
+
+    async def get_message(self, chat_id: str, message_id: str) -> Optional[dict]:
+        """Read a message from the database with pending updates applied."""
+        # Taken before the read: a flush issued meanwhile is ordered after it
+        entry = self.pending.get((chat_id, message_id))
+        pending = copy.deepcopy(entry["message"]) if entry else {}
+
+        message = await self.run(
+            chat_id, Chats.get_message_by_id_and_message_id, chat_id, message_id
+        )
+
+        if pending and message is not None:
+            message = {**message, **pending}
+
+        return message
+
+    async def update_message(
+        self,
+        chat_id: str,
+        message_id: str,
+        message: dict,
+        set_current: bool = True,
+    ):
+        if self.interval <= 0:
+            await self.run(
+                chat_id,
+                Chats.patch_message_by_id_and_message_id,
+                chat_id,
+                message_id,
+                message,
+                set_current,
+            )
+            return
+
+        key = (chat_id, message_id)
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = {
+                "message": {},
+                "set_current": False,
+                "updates": 0,
+                "handle": asyncio.get_running_loop().call_later(
+                    self.interval, self._schedule_flush, key
+                ),
+            }
+            self.pending[key] = entry
+
+        entry["message"].update(message)
+        entry["set_current"] = entry["set_current"] or set_current
+        entry["updates"] += 1
+
+        if entry["updates"] >= self.max_updates:
+            await self.flush(chat_id, message_id)
+
+    def _schedule_flush(self, key: tuple[str, str]):
+        task = asyncio.create_task(self.flush(*key))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def flush(self, chat_id: str, message_id: str):
+        entry = self.pending.pop((chat_id, message_id), None)
+        if entry is None:
+            return
+
+        entry["handle"].cancel()
+
+        try:
+            await self.run(
+                chat_id,
+                Chats.patch_message_by_id_and_message_id,
+                chat_id,
+                message_id,
+                entry["message"],
+                entry["set_current"],
+            )
+        except Exception as e:
+            log.error(f"Failed to save message {message_id} of chat {chat_id}: {e}")
+
+    async def flush_all(self):
+        for chat_id, message_id in list(self.pending.keys()):
+            await self.flush(chat_id, message_id)
+
+
+CHAT_MESSAGE_BUFFER = ChatMessageBuffer(
+    interval=CHAT_SAVE_BUFFER_INTERVAL,
+    max_updates=CHAT_SAVE_BUFFER_MAX_UPDATES,
+)
@@ -0,0 +1,248 @@
+import html
+import json
+
+
+def split_content_and_whitespace(content):
+    content_stripped = content.rstrip()
+    original_whitespace = (
+        content[len(content_stripped) :] if len(content) > len(content_stripped) else ""
+    )
+    return content_stripped, original_whitespace
+
+
+def is_opening_code_block(content):
+    backtick_segments = content.split("```")
+    # Even number of segments means the last backticks are opening a new block
+    return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
+
+
+def serialize_content_block(content: str, block: dict, raw: bool = False) -> str:
+    """Append the rendering of a single content block to `content`."""
+    if block["type"] == "text":
+        block_content = block["content"].strip()
+        if block_content:
+            content = f"{content}{block_content}\n"
+    elif block["type"] == "tool_calls":
+        attributes = block.get("attributes", {})
+
+        tool_calls = block.get("content", [])
+        results = block.get("results", [])
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if results:
+
+            tool_calls_display_content = ""
+            for tool_call in tool_calls:
+
+                tool_call_id = tool_call.get("id", "")
+                tool_name = tool_call.get("function", {}).get("name", "")
+                tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                tool_result = None
+                tool_result_files = None
+                for result in results:
+                    if tool_call_id == result.get("tool_call_id", ""):
+                        tool_result = result.get("content", None)
+                        tool_result_files = result.get("files", None)
+                        break
+
+                if tool_result is not None:
+                    tool_result_embeds = result.get("embeds", "")
+                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
+                else:
+                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+            if not raw:
+                content = f"{content}{tool_calls_display_content}"
+        else:
+            tool_calls_display_content = ""
+
+            for tool_call in tool_calls:
+                tool_call_id = tool_call.get("id", "")
+                tool_name = tool_call.get("function", {}).get("name", "")
+                tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+            if not raw:
+                content = f"{content}{tool_calls_display_content}"
+
+    elif block["type"] == "reasoning":
+        reasoning_display_content = html.escape(
+            "\n".join(
+                (f"> {line}" if not line.startswith(">") else line)
+                for line in block["content"].splitlines()
+            )
+        )
+
+        reasoning_duration = block.get("duration", None)
+
+        start_tag = block.get("start_tag", "")
+        end_tag = block.get("end_tag", "")
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if reasoning_duration is not None:
+            if raw:
+                content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+            else:
+                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+            else:
+                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
+
+    elif block["type"] == "code_interpreter":
+        attributes = block.get("attributes", {})
+        output = block.get("output", None)
+        lang = attributes.get("lang", "")
+
+        content_stripped, original_whitespace = split_content_and_whitespace(content)
+        if is_opening_code_block(content_stripped):
+            # Remove trailing backticks that would open a new block
+            content = content_stripped.rstrip("`").rstrip() + original_whitespace
+        else:
+            # Keep content as is - either closing backticks or no backticks
+            content = content_stripped + original_whitespace
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if output:
+            output = html.escape(json.dumps(output))
+
+            if raw:
+                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+            else:
+                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+            else:
+                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+    else:
+        block_content = str(block["content"]).strip()
+        if block_content:
+            content = f"{content}{block['type']}: {block_content}\n"
+
+    return content
+
+
+def serialize_content_blocks(content_blocks: list[dict], raw: bool = False) -> str:
+    content = ""
+
+    for block in content_blocks:
+        content = serialize_content_block(content, block, raw)
+
+    return content.strip()
+
+
+class ContentBlocksSerializer:
+    """
+    Incremental `serialize_content_blocks` for a streaming response.
+
+    While a response streams, only the last content block is ever modified;
+    the blocks before it are final. The rendered prefix of those closed
+    blocks is cached, so each call only renders the open tail block instead
+    of the whole response. The cache is rebuilt whenever the closed blocks
+    differ from the cached ones (e.g. after the last block was popped).
+    """
+
+    def __init__(self):
+        # raw -> (closed blocks, rendered content of the closed blocks)
+        self.cache: dict[bool, tuple[list[dict], str]] = {}
+
+    def __call__(self, content_blocks: list[dict], raw: bool = False) -> str:
+        closed_blocks = content_blocks[:-1]
+
+        cached_blocks, content = self.cache.get(raw, ([], ""))
+        if len(cached_blocks) > len(closed_blocks) or any(
+            cached_block is not block
+            for cached_block, block in zip(cached_blocks, closed_blocks)
+        ):
+            cached_blocks, content = [], ""
+
+        for block in closed_blocks[len(cached_blocks) :]:
+            content = serialize_content_block(content, block, raw)
+        self.cache[raw] = (closed_blocks, content)
+
+        if content_blocks:
+            content = serialize_content_block(content, content_blocks[-1], raw)
+
+        return content.strip()
+
+
+def get_common_prefix_length(a: str, b: str) -> int:
+    if b.startswith(a):
+        return len(a)
+
+    # Binary search over slices, so the comparisons run at C speed
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+
+    return low
+
+
+class ContentDeltaEncoder:
+    """
+    Encodes the `content` of successive chat:completion payloads as deltas
+    against the content emitted before.
+
+    A delta `{"seq", "offset", "value"}` replaces everything from `offset`
+    onwards with `value`, the offset counting UTF-16 code units as JavaScript
+    strings do, which also covers rewrites near the end (e.g. a
+    reasoning block being closed). Full snapshots carry `content` and
+    `content_seq` as before and are sent for the first payload, every
+    `snapshot_interval` payloads, on completion, and whenever a delta would
+    not be smaller, so clients that missed a delta can resync.
+    """
+
+    def __init__(self, snapshot_interval: int):
+        self.snapshot_interval = snapshot_interval
+
+        self.content = None
+        self.seq = 0
+        self.deltas = 0
+
+    def encode(self, data: dict) -> dict:
+        content = data.get("content")
+        if not isinstance(content, str):
+            return data
+
+        self.seq += 1
+
+        if (
+            self.content is not None
+            and self.deltas < self.snapshot_interval
+            and not data.get("done")
+        ):
+            offset = get_common_prefix_length(self.content, content)
+
+            if len(content) - offset < offset:
+                self.content = content
+                self.deltas += 1
+
+                return {
+                    **{key: value for key, value in data.items() if key != "content"},
+                    "content_delta": {
+                        "seq": self.seq,
+                        # Characters outside the BMP are two units in JS
+                        "offset": len(content[:offset].encode("utf-16-le")) // 2,
+                        "value": content[offset:],
+                    },
+                }
+
+        self.content = content
+        self.deltas = 0
+
+        return {**data, "content_seq": self.seq}
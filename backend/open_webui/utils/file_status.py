@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+
+from open_webui.env import REDIS_KEY_PREFIX, SRC_LOG_LEVELS
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class FileStatusNotifier:
+    """
+    Wakes up the requests waiting for a file's processing status to change,
+    so they don't have to poll the database.
+
+    `notify()` may be called from any thread, e.g. from files processed in
+    background tasks. With Redis, notifications are also published to the
+    other instances, which pass them on to their own waiters in `listen()`.
+    """
+
+    def __init__(self, redis=None):
+        self.redis = redis
+
+        # file_id -> (event loop, event) of each waiting request
+        self.waiters: dict[str, set[tuple]] = {}
+        self.lock = threading.Lock()
+
+    def get_channel(self) -> str:
+        return f"{REDIS_KEY_PREFIX}:files:status"
+
+    @contextmanager
+    def subscribe(self, file_id: str):
+        """
+        Yield an event that is set whenever the status of `file_id` changes.
+        Subscribe before reading the status so no change is missed.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.lock:
+            self.waiters.setdefault(file_id, set()).add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self.lock:
+                waiters = self.waiters.get(file_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self.waiters[file_id]
+
+    def wake(self, file_id: str):
+        with self.lock:
+            waiters = list(self.waiters.get(file_id, ()))
+
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The loop of the request is closed
+                pass
+
+    def notify(self, file_id: str):
+        self.wake(file_id)
+
+        if self.redis is not None:
+            try:
+                self.redis.publish(self.get_channel(), file_id)
+            except Exception as e:
+                log.warning(f"Failed to publish file status to Redis: {e}")
+
+    async def listen(self, redis):
+        while True:
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.get_channel())
+                # Changes made while not subscribed were missed
+                with self.lock:
+                    file_ids = list(self.waiters)
+                for file_id in file_ids:
+                    self.wake(file_id)
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    self.wake(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"Lost file status notifications, resubscribing: {e}")
+                await asyncio.sleep(1)
+
+
+FILE_STATUS = FileStatusNotifier(redis=get_redis_client())
@@ -134,3 +134,100 @@ async def process_filter_functions(
             del form_data["files"]
 
     return form_data, {}
+
+
+class StreamFilterChain:
+    """
+    The "stream" filters of a response, compiled once when streaming starts.
+
+    Handlers, their parameters and valves are resolved up front, so filtering
+    a delta doesn't touch the database. The chain recompiles itself when a
+    function or its valves were updated since.
+    """
+
+    def __init__(self, request, filter_functions, extra_params):
+        self.request = request
+        self.filter_functions = filter_functions
+        self.extra_params = extra_params
+
+        self.compile()
+
+    def compile(self):
+        self.version = Functions.version
+        self.filters = []
+
+        for function in self.filter_functions:
+            if not function:
+                continue
+
+            filter_id = function.id
+            function_module = get_function_module(self.request, filter_id)
+            handler = getattr(function_module, "stream", None)
+            if not handler:
+                continue
+
+            valves = None
+            if hasattr(function_module, "valves") and hasattr(
+                function_module, "Valves"
+            ):
+                valves = function_module.Valves(
+                    **(Functions.get_function_valves_by_id(filter_id) or {})
+                )
+
+            sig = inspect.signature(handler)
+            params = {
+                k: v
+                for k, v in {**self.extra_params, "__id__": filter_id}.items()
+                if k in sig.parameters
+            }
+
+            if "__user__" in params and hasattr(function_module, "UserValves"):
+                try:
+                    params["__user__"] = {
+                        **params["__user__"],
+                        "valves": function_module.UserValves(
+                            **Functions.get_user_valves_by_id_and_user_id(
+                                filter_id, params["__user__"]["id"]
+                            )
+                        ),
+                    }
+                except Exception as e:
+                    log.exception(f"Failed to get user values: {e}")
+
+            self.filters.append(
+                (
+                    filter_id,
+                    function_module,
+                    handler,
+                    inspect.iscoroutinefunction(handler),
+                    valves,
+                    params,
+                )
+            )
+
+    async def __call__(self, event):
+        if self.version != Functions.version:
+            self.compile()
+
+        for (
+            filter_id,
+            function_module,
+            handler,
+            is_coroutine,
+            valves,
+            params,
+        ) in self.filters:
+            if valves is not None:
+                # Modules are shared, other requests may have set their valves
+                function_module.valves = valves
+
+            try:
+                if is_coroutine:
+                    event = await handler(event=event, **params)
+                else:
+                    event = handler(event=event, **params)
+            except Exception as e:
+                log.debug(f"Error in stream handler {filter_id}: {e}")
+                raise e
+
+        return event
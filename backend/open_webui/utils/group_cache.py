@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from open_webui.env import GROUP_CACHE_TTL, REDIS_KEY_PREFIX, SRC_LOG_LEVELS
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class GroupCache:
+    """
+    Cache of users' groups and of permissions resolved from them, so access
+    checks don't query group memberships over and over.
+
+    All entries are tied to a version that `Groups` bumps on any change to
+    groups or memberships. With Redis, the version is shared between
+    instances and re-read at most once per `sync_interval` seconds. Entries
+    also expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        redis=None,
+        sync_interval: float = 1.0,
+        max_size: int = 10000,
+    ):
+        self.ttl = ttl
+        self.redis = redis
+        self.sync_interval = sync_interval
+        self.max_size = max_size
+
+        # (kind, user_id) -> (version, expires_at, value)
+        self.entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.local_version = 0
+        self.redis_version = None
+        self.redis_version_expires_at = 0.0
+
+    def get_redis_key(self) -> str:
+        return f"{REDIS_KEY_PREFIX}:groups:version"
+
+    def get_version(self) -> tuple:
+        if self.redis is None:
+            return (self.local_version,)
+
+        now = time.monotonic()
+        if now >= self.redis_version_expires_at:
+            try:
+                self.redis_version = self.redis.get(self.get_redis_key())
+            except Exception as e:
+                log.warning(f"Failed to read group version from Redis: {e}")
+                # Without the shared version, don't trust anything cached
+                self.redis_version = object()
+            self.redis_version_expires_at = now + self.sync_interval
+
+        return (self.local_version, self.redis_version)
+
+    def get(self, kind: str, user_id: str, load: Callable[[], Any]) -> Any:
+        if self.ttl <= 0:
+            return load()
+
+        key = (kind, user_id)
+        version = self.get_version()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                return entry[2]
+
+        value = load()
+
+        with self.lock:
+            if self.get_version() == version:
+                self.entries[key] = (version, time.monotonic() + self.ttl, value)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+
+        return value
+
+    def invalidate(self):
+        with self.lock:
+            self.local_version += 1
+            self.entries.clear()
+
+        if self.redis is not None:
+            try:
+                self.redis.incr(self.get_redis_key())
+            except Exception as e:
+                log.warning(f"Failed to update group version in Redis: {e}")
+            self.redis_version_expires_at = 0.0
+
+
+GROUP_CACHE = GroupCache(ttl=GROUP_CACHE_TTL, redis=get_redis_client())
@@ -0,0 +1,353 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+from fastapi import Request
+
+from open_webui.env import (
+    INGESTION_JOB_MAX_ATTEMPTS,
+    INGESTION_JOB_RETRY_DELAY,
+    INGESTION_QUEUE_MAX_SIZE,
+    INGESTION_WORKER_CONCURRENCY,
+    SRC_LOG_LEVELS,
+)
+from open_webui.models.ingestion_jobs import IngestionJobModel, IngestionJobs
+from open_webui.models.users import Users
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class IngestionQueue:
+    """
+    Persisted queue of file processing jobs, run by a pool of workers apart
+    from the threads serving requests.
+
+    Jobs are rows of the ingestion_job table, so they survive restarts and
+    are shared by all instances. Each instance runs up to `concurrency` of
+    them at a time on its own threads, picked by priority and then fairly
+    between users (see `IngestionJobs.claim_next_job`). Failed jobs are
+    retried `max_attempts` times with exponential backoff.
+
+    Text extraction is CPU-bound and holds the GIL, so it runs in a pool of
+    `concurrency` worker processes (see `load_documents`). Embedding and
+    database writes stay on the threads, which need the app's models.
+
+    Handlers are registered per job kind and called with the app's request,
+    the job's user and its payload. What they return is stored as the job's
+    result. `on_error` is called on each failure, with whether the job will
+    be retried.
+    """
+
+    PRIORITY_UPLOAD = 20
+    PRIORITY_BATCH = 10
+    PRIORITY_REINDEX = 0
+
+    # Seconds between checks for jobs enqueued by other instances
+    POLL_INTERVAL = 2.0
+    # Running jobs are touched every HEARTBEAT_INTERVAL seconds, and put back
+    # in the queue once they haven't been for STALE_TIMEOUT seconds
+    HEARTBEAT_INTERVAL = 30
+    STALE_TIMEOUT = 120
+    # Seconds finished jobs are kept for
+    RETENTION = 24 * 3600
+    # Seconds running jobs are given to finish when stopping
+    STOP_TIMEOUT = 10
+
+    def __init__(
+        self,
+        concurrency: int,
+        max_size: int = 0,
+        max_attempts: int = 3,
+        retry_delay: float = 10.0,
+    ):
+        self.concurrency = concurrency
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        self.handlers: dict[str, tuple[Callable, Optional[Callable]]] = {}
+
+        self.app = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.process_executor: Optional[ProcessPoolExecutor] = None
+        self.process_executor_lock = threading.Lock()
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+
+        self.running: dict[str, asyncio.Task] = {}
+        self.finished: dict[str, asyncio.Event] = {}
+
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        # Seconds jobs waited in the queue and ran for, in total
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.concurrency > 0
+
+    def register(
+        self, kind: str, handler: Callable, on_error: Optional[Callable] = None
+    ):
+        self.handlers[kind] = (handler, on_error)
+
+    def is_full(self) -> bool:
+        if self.max_size <= 0:
+            return False
+        return IngestionJobs.get_job_counts().get("pending", 0) >= self.max_size
+
+    def enqueue(
+        self, user_id: str, kind: str, payload: dict, priority: int = 0
+    ) -> Optional[IngestionJobModel]:
+        """Add a job to the queue. Safe to call from any thread."""
+        job = IngestionJobs.insert_new_job(user_id, kind, payload, priority)
+        if job is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+        return job
+
+    async def wait(
+        self, id: str, timeout: Optional[float] = None
+    ) -> Optional[IngestionJobModel]:
+        """
+        Wait for a job to complete or fail for good, and return it. After
+        `timeout` seconds, return it as it is, still pending or running.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        event = self.finished.setdefault(id, asyncio.Event())
+        try:
+            while True:
+                event.clear()
+                job = await asyncio.to_thread(IngestionJobs.get_job_by_id, id)
+                if job is None or job.status in ("completed", "failed"):
+                    return job
+
+                # The job may run on another instance
+                wait_time = self.POLL_INTERVAL
+                if deadline is not None:
+                    wait_time = min(wait_time, deadline - time.monotonic())
+                    if wait_time <= 0:
+                        return job
+                try:
+                    await asyncio.wait_for(event.wait(), wait_time)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.finished.pop(id, None)
+
+    def get_request(self) -> Request:
+        return Request(
+            {
+                "type": "http",
+                "asgi.version": "3.0",
+                "asgi.spec_version": "2.0",
+                "method": "POST",
+                "path": "/internal/ingestion",
+                "query_string": b"",
+                "headers": [],
+                "client": ("127.0.0.1", 0),
+                "server": ("127.0.0.1", 80),
+                "scheme": "http",
+                "app": self.app,
+            }
+        )
+
+    def start(self, app):
+        if not self.enabled:
+            return
+
+        self.app = app
+        self.loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="ingestion"
+        )
+        self.process_executor = self.create_process_executor()
+        self.wakeup = asyncio.Event()
+        self.dispatcher = asyncio.create_task(self.run())
+
+    def create_process_executor(self) -> ProcessPoolExecutor:
+        # Forking would copy the threads and database connections of the app
+        return ProcessPoolExecutor(
+            max_workers=self.concurrency,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def stop(self):
+        if self.dispatcher is None:
+            return
+
+        self.dispatcher.cancel()
+
+        # Handlers can't be interrupted on their threads, so let them finish
+        if self.running:
+            await asyncio.wait(list(self.running.values()), timeout=self.STOP_TIMEOUT)
+
+        # Jobs still running are left as such, and requeued once they go stale,
+        # rather than run by another instance while this one is still at it
+        for task in list(self.running.values()):
+            task.cancel()
+        self.running.clear()
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self.process_executor_lock:
+            self.process_executor.shutdown(wait=False, cancel_futures=True)
+            self.process_executor = None
+        self.dispatcher = None
+        self.loop = None
+
+    async def run(self):
+        maintained_at = 0.0
+
+        while True:
+            self.wakeup.clear()
+            try:
+                if time.monotonic() - maintained_at >= self.HEARTBEAT_INTERVAL:
+                    maintained_at = time.monotonic()
+                    await asyncio.to_thread(self.maintain, list(self.running))
+
+                while len(self.running) < self.concurrency:
+                    job = await asyncio.to_thread(IngestionJobs.claim_next_job)
+                    if job is None:
+                        break
+                    self.running[job.id] = asyncio.create_task(self.run_job(job))
+            except Exception as e:
+                log.exception(f"Error dispatching ingestion jobs: {e}")
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def maintain(self, running_ids: list[str]):
+        IngestionJobs.touch_jobs_by_ids(running_ids)
+        requeued = IngestionJobs.requeue_stale_jobs(self.STALE_TIMEOUT)
+        if requeued:
+            log.warning(f"Requeued {requeued} interrupted ingestion jobs")
+        IngestionJobs.delete_finished_jobs(int(time.time()) - self.RETENTION)
+
+    async def run_job(self, job: IngestionJobModel):
+        started_at = time.monotonic()
+        self.wait_time += max(time.time() - job.run_at, 0)
+
+        user = None
+        try:
+            handler, on_error = self.handlers.get(job.kind, (None, None))
+            try:
+                if handler is None:
+                    raise Exception(f"Unknown ingestion job kind: {job.kind}")
+                if job.attempts > self.max_attempts:
+                    # e.g. the job kept crashing the instances running it
+                    raise Exception(f"Gave up after {job.attempts - 1} attempts")
+
+                user = await asyncio.to_thread(Users.get_user_by_id, job.user_id)
+                result = await self.call(handler, self.get_request(), user, job.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = str(e.detail) if hasattr(e, "detail") else str(e)
+                retrying = handler is not None and job.attempts < self.max_attempts
+                log.warning(
+                    f"Ingestion job {job.id} ({job.kind}) failed on attempt "
+                    f"{job.attempts}{', retrying' if retrying else ''}: {error}"
+                )
+
+                if on_error is not None:
+                    try:
+                        await self.call(
+                            on_error,
+                            self.get_request(),
+                            user,
+                            job.payload,
+                            error,
+                            retrying,
+                        )
+                    except Exception as e:
+                        log.exception(f"Error handling failed ingestion job: {e}")
+
+                if retrying:
+                    self.retried += 1
+                    delay = self.retry_delay * 2 ** (job.attempts - 1)
+                    await asyncio.to_thread(
+                        IngestionJobs.fail_job,
+                        job.id,
+                        error,
+                        retry_at=int(time.time() + delay),
+                    )
+                else:
+                    self.failed += 1
+                    await asyncio.to_thread(IngestionJobs.fail_job, job.id, error)
+            else:
+                self.completed += 1
+                await asyncio.to_thread(
+                    IngestionJobs.complete_job,
+                    job.id,
+                    result if isinstance(result, dict) else None,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception(f"Error finishing ingestion job {job.id}: {e}")
+        finally:
+            self.run_time += time.monotonic() - started_at
+            self.running.pop(job.id, None)
+
+            if job.id in self.finished:
+                self.finished[job.id].set()
+            if self.wakeup is not None:
+                self.wakeup.set()
+
+    async def call(self, fn: Callable, *args) -> Any:
+        return await self.loop.run_in_executor(
+            self.executor, functools.partial(fn, *args)
+        )
+
+    def load_documents(self, loader, filename: str, content_type: str, file_path: str):
+        """
+        Extract the documents of a file with `loader` in the worker processes,
+        or in the calling thread if the queue isn't running.
+        """
+        process_executor = self.process_executor
+        if process_executor is None:
+            return loader.load(filename, content_type, file_path)
+
+        if loader.user is not None:
+            # Unpickling a UserModel would set up the database in the workers
+            loader.user = SimpleNamespace(
+                **loader.user.model_dump(include={"id", "name", "email", "role"})
+            )
+
+        try:
+            return process_executor.submit(
+                loader.load, filename, content_type, file_path
+            ).result()
+        except BrokenProcessPool:
+            # A worker died, e.g. a loader crashed, so later jobs get new ones
+            with self.process_executor_lock:
+                if self.process_executor is process_executor:
+                    self.process_executor = self.create_process_executor()
+            raise
+
+    def get_stats(self) -> dict:
+        counts = IngestionJobs.get_job_counts()
+        return {
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+        }
+
+
+INGESTION_QUEUE = IngestionQueue(
+    concurrency=INGESTION_WORKER_CONCURRENCY,
+    max_size=INGESTION_QUEUE_MAX_SIZE,
+    max_attempts=INGESTION_JOB_MAX_ATTEMPTS,
+    retry_delay=INGESTION_JOB_RETRY_DELAY,
+)
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from open_webui.models.users import Users
+from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL, SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class LastActiveBuffer:
+    """
+    Coalesces "user was active" updates and writes them for all users in a
+    single bulk UPDATE, at most once per `interval` seconds.
+
+    Requests and heartbeats only record the user id. The first one after a
+    flush schedules the next flush, so an idle instance doesn't write at all.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+        self.pending: set[str] = set()
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.tasks: set[asyncio.Task] = set()
+
+    def touch(self, user_id: str):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self.interval <= 0 or loop is None:
+            Users.update_last_active_by_ids([user_id], int(time.time()))
+            return
+
+        self.pending.add(user_id)
+        if self.handle is None:
+            self.handle = loop.call_later(self.interval, self._schedule_flush)
+
+    def _schedule_flush(self):
+        task = asyncio.create_task(self.flush())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def flush(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+        user_ids, self.pending = list(self.pending), set()
+        if not user_ids:
+            return
+
+        try:
+            await run_in_threadpool(
+                Users.update_last_active_by_ids, user_ids, int(time.time())
+            )
+        except Exception as e:
+            log.error(
+                f"Failed to update last active time of {len(user_ids)} users: {e}"
+            )
+
+
+LAST_ACTIVE_BUFFER = LastActiveBuffer(
+    # Unset means "on every request" for the throttle this replaces, but
+    # writing per request is what this buffer exists to avoid
+    interval=(
+        DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
+        if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None
+        else 10.0
+    ),
+)
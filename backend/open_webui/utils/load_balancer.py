@@ -0,0 +1,223 @@
+import logging
+import random
+import time
+from typing import Iterable, Optional
+
+from open_webui.env import (
+    LOAD_BALANCER_AFFINITY_FACTOR,
+    LOAD_BALANCER_EJECTION_TIME,
+    LOAD_BALANCER_MAX_FAILURES,
+    LOAD_BALANCER_STRATEGY,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class Node:
+    """Load and health of one connection, e.g. an Ollama base URL."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+
+        # Moving average of the seconds until response headers arrive
+        self.latency: Optional[float] = None
+
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+        # Models known to be loaded in memory on the node
+        self.models: set[str] = set()
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+
+class Lease:
+    """A request in flight on a node."""
+
+    def __init__(self, balancer: "LoadBalancer", node: Node, model: Optional[str]):
+        self.balancer = balancer
+        self.node = node
+        self.model = model
+
+        self.started_at = time.monotonic()
+        self.released = False
+
+    def responded(self, status: int):
+        """Record the response headers arriving with `status`."""
+        if status >= 500:
+            self.balancer.report(self.node.url, ok=False)
+        else:
+            self.balancer.report(
+                self.node.url, ok=True, latency=time.monotonic() - self.started_at
+            )
+            if self.model and status < 400:
+                # Serving the model loads it on the node
+                self.node.models.add(self.model)
+
+    def failed(self):
+        """Record the request failing without a response."""
+        self.balancer.report(self.node.url, ok=False)
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.node.in_flight -= 1
+
+
+class LoadBalancer:
+    """
+    Picks one of the connections serving a model for each request.
+
+    - "least_outstanding" picks the node with the fewest requests in flight.
+    - "ewma" weighs requests in flight by the moving average of each node's
+      response latency.
+    - "random" ignores load, as requests used to be spread.
+
+    Nodes that don't have the model loaded cost `affinity_factor` times their
+    load, so requests stay with nodes that do until those are busier. Nodes
+    failing `max_failures` times in a row are ejected for `ejection_time`
+    seconds, unless all candidates are. Ties are broken randomly.
+
+    Nodes are keyed by URL, so stats survive connections being reordered.
+    """
+
+    EWMA_ALPHA = 0.3
+
+    def __init__(
+        self,
+        name: str,
+        strategy: str = "least_outstanding",
+        affinity_factor: float = 4.0,
+        max_failures: int = 3,
+        ejection_time: float = 30.0,
+    ):
+        self.name = name
+        self.strategy = strategy
+        self.affinity_factor = affinity_factor
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+
+        self.nodes: dict[str, Node] = {}
+
+    def get_node(self, url: str) -> Node:
+        node = self.nodes.get(url)
+        if node is None:
+            node = self.nodes[url] = Node(url)
+        return node
+
+    def get_cost(self, node: Node, model: Optional[str], latency: float) -> float:
+        if self.strategy == "ewma":
+            cost = (node.in_flight + 1) * (
+                node.latency if node.latency is not None else latency
+            )
+        else:
+            cost = node.in_flight + 1
+
+        if model and model not in node.models:
+            cost *= self.affinity_factor
+        return cost
+
+    def select(
+        self, url_idxs: list[int], urls: list[str], model: Optional[str] = None
+    ) -> int:
+        """Pick the index of the connection to send a request for `model` to."""
+        if len(url_idxs) == 1:
+            return url_idxs[0]
+
+        now = time.monotonic()
+        nodes = {idx: self.get_node(urls[idx]) for idx in url_idxs}
+
+        candidates = [idx for idx, node in nodes.items() if not node.is_ejected(now)]
+        if not candidates:
+            candidates = url_idxs
+
+        if self.strategy == "random":
+            return random.choice(candidates)
+
+        # Nodes without requests served yet are assumed to be as fast as the
+        # others on average
+        latencies = [
+            nodes[idx].latency for idx in candidates if nodes[idx].latency is not None
+        ]
+        latency = sum(latencies) / len(latencies) if latencies else 1.0
+
+        costs = {idx: self.get_cost(nodes[idx], model, latency) for idx in candidates}
+        cost = min(costs.values())
+        return random.choice([idx for idx in candidates if costs[idx] == cost])
+
+    def acquire(self, url: str, model: Optional[str] = None) -> Lease:
+        node = self.get_node(url)
+        node.in_flight += 1
+        node.requests += 1
+        return Lease(self, node, model)
+
+    def report(self, url: str, ok: bool, latency: Optional[float] = None):
+        node = self.get_node(url)
+
+        if ok:
+            node.consecutive_failures = 0
+            node.ejected_until = 0.0
+            if latency is not None:
+                node.latency = (
+                    latency
+                    if node.latency is None
+                    else self.EWMA_ALPHA * latency
+                    + (1 - self.EWMA_ALPHA) * node.latency
+                )
+            return
+
+        node.failures += 1
+        node.consecutive_failures += 1
+        if 0 < self.max_failures <= node.consecutive_failures:
+            if not node.is_ejected(time.monotonic()):
+                node.ejections += 1
+                log.warning(
+                    f"{self.name}: ejecting {url} for {self.ejection_time}s "
+                    f"after {node.consecutive_failures} failures"
+                )
+            node.ejected_until = time.monotonic() + self.ejection_time
+
+    def set_models(self, url: str, models: Iterable[str]):
+        """Set the models loaded in memory on a node."""
+        self.get_node(url).models = set(models)
+
+    def get_stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": node.url,
+                "in_flight": node.in_flight,
+                "requests": node.requests,
+                "failures": node.failures,
+                "ejections": node.ejections,
+                "ejected": node.is_ejected(now),
+                "latency": node.latency,
+                "models": sorted(node.models),
+            }
+            for node in list(self.nodes.values())
+        ]
+
+
+OLLAMA_BALANCER = LoadBalancer(
+    "ollama",
+    strategy=LOAD_BALANCER_STRATEGY,
+    affinity_factor=LOAD_BALANCER_AFFINITY_FACTOR,
+    max_failures=LOAD_BALANCER_MAX_FAILURES,
+    ejection_time=LOAD_BALANCER_EJECTION_TIME,
+)
+
+OPENAI_BALANCER = LoadBalancer(
+    "openai",
+    strategy=LOAD_BALANCER_STRATEGY,
+    affinity_factor=1.0,
+    max_failures=LOAD_BALANCER_MAX_FAILURES,
+    ejection_time=LOAD_BALANCER_EJECTION_TIME,
+)
@@ -33,6 +33,11 @@ from open_webui.socket.main import (
     get_event_call,
     get_event_emitter,
 )
+from open_webui.utils.chat_buffer import CHAT_MESSAGE_BUFFER
+from open_webui.utils.content_blocks import (
+    ContentBlocksSerializer,
+    ContentDeltaEncoder,
+)
 from open_webui.routers.tasks import (
     generate_queries,
     generate_title,
@@ -96,6 +101,7 @@ from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
+    StreamFilterChain,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
 from open_webui.utils.payload import apply_system_prompt_to_body
@@ -114,6 +120,7 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     ENABLE_CHAT_RESPONSE_BASE64_IMAGE_URL_CONVERSION,
     CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
+    CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL,
     CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
@@ -1586,7 +1593,12 @@ async def process_chat_response(
         messages = []
 
         if "chat_id" in metadata and not metadata["chat_id"].startswith("local:"):
-            messages_map = Chats.get_messages_map_by_chat_id(metadata["chat_id"])
+            await CHAT_MESSAGE_BUFFER.flush(metadata["chat_id"], metadata["message_id"])
+            messages_map = await CHAT_MESSAGE_BUFFER.run(
+                metadata["chat_id"],
+                Chats.get_messages_map_by_chat_id,
+                metadata["chat_id"],
+            )
             message = messages_map.get(metadata["message_id"]) if messages_map else None
 
             message_list = get_message_list(messages_map, metadata["message_id"])
@@ -1676,7 +1688,7 @@ async def process_chat_response(
                             )
 
                             if not metadata.get("chat_id", "").startswith("local:"):
-                                Chats.upsert_message_to_chat_by_id_and_message_id(
+                                await CHAT_MESSAGE_BUFFER.update_message(
                                     metadata["chat_id"],
                                     metadata["message_id"],
                                     {
@@ -1737,8 +1749,11 @@ async def process_chat_response(
                                 if not title:
                                     title = messages[0].get("content", user_message)
 
-                                Chats.update_chat_title_by_id(
-                                    metadata["chat_id"], title
+                                await CHAT_MESSAGE_BUFFER.run(
+                                    metadata["chat_id"],
+                                    Chats.update_chat_title_by_id,
+                                    metadata["chat_id"],
+                                    title,
                                 )
 
                                 await event_emitter(
@@ -1751,7 +1766,12 @@ async def process_chat_response(
                         if title == None and len(messages) == 2:
                             title = messages[0].get("content", user_message)
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
+                            await CHAT_MESSAGE_BUFFER.run(
+                                metadata["chat_id"],
+                                Chats.update_chat_title_by_id,
+                                metadata["chat_id"],
+                                title,
+                            )
 
                             await event_emitter(
                                 {
@@ -1789,8 +1809,12 @@ async def process_chat_response(
 
                             try:
                                 tags = json.loads(tags_string).get("tags", [])
-                                Chats.update_chat_tags_by_id(
-                                    metadata["chat_id"], tags, user
+                                await CHAT_MESSAGE_BUFFER.run(
+                                    metadata["chat_id"],
+                                    Chats.update_chat_tags_by_id,
+                                    metadata["chat_id"],
+                                    tags,
+                                    user,
                                 )
 
                                 await event_emitter(
@@ -1846,7 +1870,7 @@ async def process_chat_response(
                         else:
                             error = str(error)
 
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await CHAT_MESSAGE_BUFFER.update_message(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1862,7 +1886,7 @@ async def process_chat_response(
                             )
 
                     if "selected_model_id" in response_data:
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await CHAT_MESSAGE_BUFFER.update_message(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1882,7 +1906,11 @@ async def process_chat_response(
                                 }
                             )
 
-                            title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                            title = await CHAT_MESSAGE_BUFFER.run(
+                                metadata["chat_id"],
+                                Chats.get_chat_title_by_id,
+                                metadata["chat_id"],
+                            )
 
                             await event_emitter(
                                 {
@@ -1896,7 +1924,7 @@ async def process_chat_response(
                             )
 
                             # Save message in the database
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                            await CHAT_MESSAGE_BUFFER.update_message(
                                 metadata["chat_id"],
                                 metadata["message_id"],
                                 {
@@ -2004,156 +2032,24 @@ async def process_chat_response(
         task_id = str(uuid4())  # Create a unique task ID.
         model_id = form_data.get("model", "")
 
-        def split_content_and_whitespace(content):
-            content_stripped = content.rstrip()
-            original_whitespace = (
-                content[len(content_stripped) :]
-                if len(content) > len(content_stripped)
-                else ""
-            )
-            return content_stripped, original_whitespace
-
-        def is_opening_code_block(content):
-            backtick_segments = content.split("```")
-            # Even number of segments means the last backticks are opening a new block
-            return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
-
         # Handle as a background task
         async def response_handler(response, events):
-            def serialize_content_blocks(content_blocks, raw=False):
-                content = ""
-
-                for block in content_blocks:
-                    if block["type"] == "text":
-                        block_content = block["content"].strip()
-                        if block_content:
-                            content = f"{content}{block_content}\n"
-                    elif block["type"] == "tool_calls":
-                        attributes = block.get("attributes", {})
-
-                        tool_calls = block.get("content", [])
-                        results = block.get("results", [])
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if results:
-
-                            tool_calls_display_content = ""
-                            for tool_call in tool_calls:
-
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_result = None
-                                tool_result_files = None
-                                for result in results:
-                                    if tool_call_id == result.get("tool_call_id", ""):
-                                        tool_result = result.get("content", None)
-                                        tool_result_files = result.get("files", None)
-                                        break
-
-                                if tool_result is not None:
-                                    tool_result_embeds = result.get("embeds", "")
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
-                                else:
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-                        else:
-                            tool_calls_display_content = ""
-
-                            for tool_call in tool_calls:
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-
-                    elif block["type"] == "reasoning":
-                        reasoning_display_content = html.escape(
-                            "\n".join(
-                                (f"> {line}" if not line.startswith(">") else line)
-                                for line in block["content"].splitlines()
-                            )
-                        )
-
-                        reasoning_duration = block.get("duration", None)
-
-                        start_tag = block.get("start_tag", "")
-                        end_tag = block.get("end_tag", "")
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if reasoning_duration is not None:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
-                        else:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
-
-                    elif block["type"] == "code_interpreter":
-                        attributes = block.get("attributes", {})
-                        output = block.get("output", None)
-                        lang = attributes.get("lang", "")
-
-                        content_stripped, original_whitespace = (
-                            split_content_and_whitespace(content)
-                        )
-                        if is_opening_code_block(content_stripped):
-                            # Remove trailing backticks that would open a new block
-                            content = (
-                                content_stripped.rstrip("`").rstrip()
-                                + original_whitespace
-                            )
-                        else:
-                            # Keep content as is - either closing backticks or no backticks
-                            content = content_stripped + original_whitespace
+            content_blocks_serializer = ContentBlocksSerializer()
 
-                        if content and not content.endswith("\n"):
-                            content += "\n"
+            def serialize_content_blocks(content_blocks, raw=False):
+                return content_blocks_serializer(content_blocks, raw)
 
-                        if output:
-                            output = html.escape(json.dumps(output))
+            content_delta_encoder = (
+                ContentDeltaEncoder(CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL)
+                if metadata.get("params", {}).get("content_delta")
+                else None
+            )
 
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-                        else:
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+            async def emit_chat_completion(data):
+                if content_delta_encoder:
+                    data = content_delta_encoder.encode(data)
 
-                    else:
-                        block_content = str(block["content"]).strip()
-                        if block_content:
-                            content = f"{content}{block['type']}: {block_content}\n"
-
-                return content.strip()
+                await event_emitter({"type": "chat:completion", "data": data})
 
             def convert_content_blocks_to_messages(content_blocks, raw=False):
                 messages = []
@@ -2371,7 +2267,7 @@ async def process_chat_response(
 
                 return content, content_blocks, end_flag
 
-            message = Chats.get_message_by_id_and_message_id(
+            message = await CHAT_MESSAGE_BUFFER.get_message(
                 metadata["chat_id"], metadata["message_id"]
             )
 
@@ -2419,15 +2315,10 @@ async def process_chat_response(
 
             try:
                 for event in events:
-                    await event_emitter(
-                        {
-                            "type": "chat:completion",
-                            "data": event,
-                        }
-                    )
+                    await emit_chat_completion(event)
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await CHAT_MESSAGE_BUFFER.update_message(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2441,6 +2332,12 @@ async def process_chat_response(
 
                     response_tool_calls = []
 
+                    stream_filters = StreamFilterChain(
+                        request,
+                        filter_functions,
+                        {"__body__": form_data, **extra_params},
+                    )
+
                     delta_count = 0
                     delta_chunk_size = max(
                         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
@@ -2456,12 +2353,7 @@ async def process_chat_response(
                         nonlocal last_delta_data
 
                         if delta_count >= threshold and last_delta_data:
-                            await event_emitter(
-                                {
-                                    "type": "chat:completion",
-                                    "data": last_delta_data,
-                                }
-                            )
+                            await emit_chat_completion(last_delta_data)
                             delta_count = 0
                             last_delta_data = None
 
@@ -2487,13 +2379,7 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params={"__body__": form_data, **extra_params},
-                            )
+                            data = await stream_filters(data)
 
                             if data:
                                 if "event" in data and not getattr(
@@ -2503,19 +2389,14 @@ async def process_chat_response(
 
                                 if "selected_model_id" in data:
                                     model_id = data["selected_model_id"]
-                                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                                    await CHAT_MESSAGE_BUFFER.update_message(
                                         metadata["chat_id"],
                                         metadata["message_id"],
                                         {
                                             "selectedModelId": model_id,
                                         },
                                     )
-                                    await event_emitter(
-                                        {
-                                            "type": "chat:completion",
-                                            "data": data,
-                                        }
-                                    )
+                                    await emit_chat_completion(data)
                                 else:
                                     choices = data.get("choices", [])
 
@@ -2523,24 +2404,18 @@ async def process_chat_response(
                                     usage = data.get("usage", {}) or {}
                                     usage.update(data.get("timings", {}))  # llama.cpp
                                     if usage:
-                                        await event_emitter(
+                                        await emit_chat_completion(
                                             {
-                                                "type": "chat:completion",
-                                                "data": {
-                                                    "usage": usage,
-                                                },
+                                                "usage": usage,
                                             }
                                         )
 
                                     if not choices:
                                         error = data.get("error", {})
                                         if error:
-                                            await event_emitter(
+                                            await emit_chat_completion(
                                                 {
-                                                    "type": "chat:completion",
-                                                    "data": {
-                                                        "error": error,
-                                                    },
+                                                    "error": error,
                                                 }
                                             )
                                         continue
@@ -2610,7 +2485,9 @@ async def process_chat_response(
                                         delta.get("images", []), request, metadata, user
                                     )
                                     if image_urls:
-                                        message_files = Chats.add_message_files_by_id_and_message_id(
+                                        message_files = await CHAT_MESSAGE_BUFFER.run(
+                                            metadata["chat_id"],
+                                            Chats.add_message_files_by_id_and_message_id,
                                             metadata["chat_id"],
                                             metadata["message_id"],
                                             [
@@ -2736,7 +2613,7 @@ async def process_chat_response(
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            await CHAT_MESSAGE_BUFFER.update_message(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
@@ -2758,12 +2635,7 @@ async def process_chat_response(
                                     if delta_count >= delta_chunk_size:
                                         await flush_pending_delta_data(delta_chunk_size)
                                 else:
-                                    await event_emitter(
-                                        {
-                                            "type": "chat:completion",
-                                            "data": data,
-                                        }
-                                    )
+                                    await emit_chat_completion(data)
                         except Exception as e:
                             done = "data: [DONE]" in line
                             if done:
@@ -2826,12 +2698,9 @@ async def process_chat_response(
                         }
                     )
 
-                    await event_emitter(
+                    await emit_chat_completion(
                         {
-                            "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
+                            "content": serialize_content_blocks(content_blocks),
                         }
                     )
 
@@ -2968,12 +2837,9 @@ async def process_chat_response(
                         }
                     )
 
-                    await event_emitter(
+                    await emit_chat_completion(
                         {
-                            "type": "chat:completion",
-                            "data": {
-                                "content": serialize_content_blocks(content_blocks),
-                            },
+                            "content": serialize_content_blocks(content_blocks),
                         }
                     )
 
@@ -3013,12 +2879,9 @@ async def process_chat_response(
                         and retries < MAX_RETRIES
                     ):
 
-                        await event_emitter(
+                        await emit_chat_completion(
                             {
-                                "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
+                                "content": serialize_content_blocks(content_blocks),
                             }
                         )
 
@@ -3144,12 +3007,9 @@ async def process_chat_response(
                             }
                         )
 
-                        await event_emitter(
+                        await emit_chat_completion(
                             {
-                                "type": "chat:completion",
-                                "data": {
-                                    "content": serialize_content_blocks(content_blocks),
-                                },
+                                "content": serialize_content_blocks(content_blocks),
                             }
                         )
 
@@ -3183,7 +3043,11 @@ async def process_chat_response(
                             log.debug(e)
                             break
 
-                title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                title = await CHAT_MESSAGE_BUFFER.run(
+                    metadata["chat_id"],
+                    Chats.get_chat_title_by_id,
+                    metadata["chat_id"],
+                )
                 data = {
                     "done": True,
                     "content": serialize_content_blocks(content_blocks),
@@ -3192,7 +3056,7 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await CHAT_MESSAGE_BUFFER.update_message(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -3216,12 +3080,7 @@ async def process_chat_response(
                             },
                         )
 
-                await event_emitter(
-                    {
-                        "type": "chat:completion",
-                        "data": data,
-                    }
-                )
+                await emit_chat_completion(data)
 
                 await background_tasks_handler()
             except asyncio.CancelledError:
@@ -3230,13 +3089,21 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await CHAT_MESSAGE_BUFFER.update_message(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
                             "content": serialize_content_blocks(content_blocks),
                         },
                     )
+            finally:
+                # Write out anything still buffered for this message, also
+                # when the task was cancelled
+                await asyncio.shield(
+                    CHAT_MESSAGE_BUFFER.flush(
+                        metadata["chat_id"], metadata["message_id"]
+                    )
+                )
 
             if response.background is not None:
                 await response.background()
@@ -3249,26 +3116,16 @@ async def process_chat_response(
             def wrap_item(item):
                 return f"data: {item}\n\n"
 
+            stream_filters = StreamFilterChain(request, filter_functions, extra_params)
+
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event = await stream_filters(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data = await stream_filters(data)
 
                 if data:
                     yield data
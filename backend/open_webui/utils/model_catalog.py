@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from typing import Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from open_webui.models.functions import Functions
+from open_webui.models.models import Models
+from open_webui.models.users import UserModel
+from open_webui.utils.access_control import get_user_group_ids
+from open_webui.utils.model_lists import MODEL_LIST_CACHE
+from open_webui.utils.models import get_all_models
+
+from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL
+from open_webui.env import (
+    BYPASS_MODEL_ACCESS_CONTROL,
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    MODELS_CATALOG_TTL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an entity tag (weak comparison)."""
+    if not if_none_match:
+        return False
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+def get_listed_models(request: Request, models: list[dict]) -> list[dict]:
+    """Prepare models for listing, as returned by /api/models."""
+    listed_models = []
+    for model in models:
+        # Filter out filter pipelines
+        if "pipeline" in model and model["pipeline"].get("type", None) == "filter":
+            continue
+
+        # Remove profile image URL to reduce payload size
+        if model.get("info", {}).get("meta", {}).get("profile_image_url"):
+            model["info"]["meta"].pop("profile_image_url", None)
+
+        try:
+            model_tags = [
+                tag.get("name")
+                for tag in model.get("info", {}).get("meta", {}).get("tags", [])
+            ]
+            tags = [tag.get("name") for tag in model.get("tags", [])]
+
+            tags = list(set(model_tags + tags))
+            model["tags"] = [{"name": tag} for tag in tags]
+        except Exception as e:
+            log.debug(f"Error processing model tags: {e}")
+            model["tags"] = []
+
+        listed_models.append(model)
+
+    model_order_list = request.app.state.config.MODEL_ORDER_LIST
+    if model_order_list:
+        model_order_dict = {model_id: i for i, model_id in enumerate(model_order_list)}
+        # Sort models by order list priority, with fallback for those not in the list
+        listed_models.sort(
+            key=lambda model: (
+                model_order_dict.get(model.get("id", ""), float("inf")),
+                (model.get("name", "") or ""),
+            )
+        )
+
+    return listed_models
+
+
+class Catalog:
+    """
+    One build of the model list, indexed by who may read each model so a
+    user's view is a few set operations instead of a query per model.
+
+    Follows `get_filtered_models`: models without access control are public,
+    others are readable by their owner and the users and groups granted read
+    access. Models that aren't in the database (except arena models) are only
+    listed for users bypassing access control.
+    """
+
+    MAX_RESPONSES = 256
+
+    def __init__(self, models: list[dict], model_infos: dict):
+        self.models = jsonable_encoder(models)
+        self.hash = hashlib.sha256(
+            json.dumps(self.models, sort_keys=True).encode()
+        ).hexdigest()
+
+        self.public = set()
+        self.user_indices = defaultdict(set)
+        self.group_indices = defaultdict(set)
+
+        for idx, model in enumerate(self.models):
+            if model.get("arena"):
+                owner_id = None
+                access_control = (
+                    model.get("info", {}).get("meta", {}).get("access_control", {})
+                )
+            else:
+                model_info = model_infos.get(model["id"])
+                if not model_info:
+                    continue
+
+                owner_id = model_info.user_id
+                access_control = model_info.access_control
+
+            if access_control is None:
+                self.public.add(idx)
+                continue
+
+            if owner_id:
+                self.user_indices[owner_id].add(idx)
+
+            read = access_control.get("read", {}) or {}
+            for user_id in read.get("user_ids", []):
+                self.user_indices[user_id].add(idx)
+            for group_id in read.get("group_ids", []):
+                self.group_indices[group_id].add(idx)
+
+        # frozenset of group ids -> indices of models readable through them
+        self.group_views: dict[frozenset, set] = {}
+        # indices -> (etag, response body)
+        self.responses: OrderedDict[tuple, tuple] = OrderedDict()
+
+    def get_indices(self, user: UserModel) -> tuple:
+        if (
+            not (
+                user.role == "user"
+                or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
+            )
+            or BYPASS_MODEL_ACCESS_CONTROL
+        ):
+            return tuple(range(len(self.models)))
+
+        group_ids = frozenset(get_user_group_ids(user.id))
+        view = self.group_views.get(group_ids)
+        if view is None:
+            view = set(self.public)
+            for group_id in group_ids:
+                view |= self.group_indices.get(group_id, set())
+            self.group_views[group_ids] = view
+
+        return tuple(sorted(view | self.user_indices.get(user.id, set())))
+
+    def get_response(self, user: UserModel) -> tuple[str, bytes]:
+        """Get the ETag and the serialized list of models the user can read."""
+        indices = self.get_indices(user)
+
+        response = self.responses.get(indices)
+        if response is None:
+            etag = hashlib.sha256(f"{self.hash}:{indices}".encode()).hexdigest()
+            body = JSONResponse({"data": [self.models[idx] for idx in indices]}).body
+            response = (f'"{etag[:32]}"', body)
+
+            self.responses[indices] = response
+            while len(self.responses) > self.MAX_RESPONSES:
+                self.responses.popitem(last=False)
+        else:
+            self.responses.move_to_end(indices)
+
+        return response
+
+
+class ModelCatalog:
+    """
+    Caches the assembled model list between requests.
+
+    A build is reused until a function, model, model list or config change
+    bumps the version, or `ttl` seconds pass, which picks up models added to
+    connections and changes made by other instances. When user info is
+    forwarded to connections the model lists may differ per user, so nothing
+    is shared.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+        self.catalog: Optional[Catalog] = None
+        self.version = None
+        self.expires_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def get_version(self, request: Request) -> tuple:
+        return (
+            Functions.version,
+            Models.version,
+            MODEL_LIST_CACHE.version,
+            request.app.state.config.version,
+        )
+
+    def is_valid(self, version: tuple) -> bool:
+        return (
+            self.catalog is not None
+            and self.version == version
+            and self.expires_at > time.monotonic()
+        )
+
+    async def build(
+        self, request: Request, user: UserModel, refresh: bool = False
+    ) -> Catalog:
+        models = await get_all_models(request, refresh=refresh, user=user)
+        models = get_listed_models(request, models)
+
+        model_infos = {model.id: model for model in Models.get_all_models()}
+        return Catalog(models, model_infos)
+
+    async def get(
+        self, request: Request, user: UserModel, refresh: bool = False
+    ) -> Catalog:
+        if ENABLE_FORWARD_USER_INFO_HEADERS or self.ttl <= 0:
+            return await self.build(request, user, refresh)
+
+        version = self.get_version(request)
+        if not refresh and self.is_valid(version):
+            return self.catalog
+
+        async with self.lock:
+            # Built by another request while waiting for the lock
+            if not refresh and self.is_valid(version):
+                return self.catalog
+
+            catalog = await self.build(request, user, refresh)
+
+            self.catalog = catalog
+            self.version = version
+            self.expires_at = time.monotonic() + self.ttl
+
+        return catalog
+
+
+MODEL_CATALOG = ModelCatalog(ttl=MODELS_CATALOG_TTL)
@@ -0,0 +1,169 @@
+import asyncio
+import copy
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import (
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    MODELS_REFRESH_INTERVAL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class Snapshot:
+    """The last good model list of a connection."""
+
+    def __init__(self, fetch: Callable[[], Awaitable[Optional[dict]]]):
+        self.fetch = fetch
+
+        self.data: Optional[dict] = None
+        # Last fetch attempt and last successful fetch, monotonic
+        self.checked_at: Optional[float] = None
+        self.fetched_at: Optional[float] = None
+        self.used_at = time.monotonic()
+
+        # Set while the last fetch failed and `data` is from an earlier one
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def stale(self) -> bool:
+        return self.error is not None
+
+
+class ModelListCache:
+    """
+    Stale-while-revalidate cache of the model lists of connections, keyed by
+    URL and API key.
+
+    Only the first request for a connection waits for its model list. Later
+    requests get the last good list right away, and lists older than
+    `interval` seconds are refreshed in the background, each connection on
+    its own. Concurrent refreshes of a connection share one request. A failed
+    refresh keeps serving the previous list and marks the connection stale.
+
+    `run()` also refreshes lists periodically, so they're usually fresh by the
+    time they're read, and drops connections that are no longer used.
+    """
+
+    # Connections unused for this many intervals are dropped
+    MAX_IDLE_INTERVALS = 10
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.snapshots: dict[tuple, Snapshot] = {}
+        # Bumped on invalidation, for caches built from these lists
+        self.version = 0
+
+    @property
+    def enabled(self) -> bool:
+        # Connections may list models per user when user info is forwarded
+        return self.interval > 0 and not ENABLE_FORWARD_USER_INFO_HEADERS
+
+    async def get(
+        self,
+        url: str,
+        key: Optional[str],
+        fetch: Callable[[], Awaitable[Optional[dict]]],
+    ) -> Optional[dict]:
+        if not self.enabled:
+            return await fetch()
+
+        snapshot = self.snapshots.get((url, key))
+        if snapshot is None:
+            snapshot = self.snapshots[(url, key)] = Snapshot(fetch)
+
+        snapshot.fetch = fetch
+        snapshot.used_at = time.monotonic()
+
+        if snapshot.checked_at is None:
+            await asyncio.shield(self.refresh(url, snapshot))
+        elif time.monotonic() - snapshot.checked_at >= self.interval:
+            self.refresh(url, snapshot)
+
+        # Callers update the models they get (e.g. prefixing their ids)
+        return copy.deepcopy(snapshot.data)
+
+    def refresh(self, url: str, snapshot: Snapshot) -> asyncio.Task:
+        if snapshot.task is None:
+            snapshot.task = asyncio.create_task(self._refresh(url, snapshot))
+        return snapshot.task
+
+    async def _refresh(self, url: str, snapshot: Snapshot):
+        try:
+            data = await snapshot.fetch()
+            error = None if data is not None else "no response"
+        except Exception as e:
+            data = None
+            error = str(e)
+        finally:
+            snapshot.task = None
+
+        snapshot.checked_at = time.monotonic()
+        if error is None:
+            snapshot.data = data
+            snapshot.fetched_at = snapshot.checked_at
+            if snapshot.stale:
+                log.info(f"Model list of {url} is up to date again")
+        else:
+            if not snapshot.stale and snapshot.data is not None:
+                log.warning(
+                    f"Failed to refresh the model list of {url}, "
+                    f"serving the last one: {error}"
+                )
+        snapshot.error = error
+
+    def invalidate(self, url: Optional[str] = None):
+        """
+        Drop the lists of the connections under `url`, or of all connections,
+        e.g. after models were pulled or deleted. The next request for them
+        waits for a fresh list.
+        """
+        if url is not None:
+            url = url.rstrip("/")
+        for snapshot_url, key in list(self.snapshots):
+            if (
+                url is None
+                or snapshot_url.rstrip("/") == url
+                or snapshot_url.startswith(url + "/")
+            ):
+                self.snapshots.pop((snapshot_url, key), None)
+        self.version += 1
+
+    def get_stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": url,
+                "stale": snapshot.stale,
+                "error": snapshot.error,
+                "age": (
+                    now - snapshot.fetched_at
+                    if snapshot.fetched_at is not None
+                    else None
+                ),
+            }
+            for (url, _), snapshot in list(self.snapshots.items())
+        ]
+
+    async def run(self):
+        while self.enabled:
+            await asyncio.sleep(self.interval)
+
+            now = time.monotonic()
+            for (url, key), snapshot in list(self.snapshots.items()):
+                if now - snapshot.used_at > self.interval * self.MAX_IDLE_INTERVALS:
+                    # e.g. the connection was removed or its key changed
+                    self.snapshots.pop((url, key), None)
+                elif (
+                    snapshot.checked_at is not None
+                    and now - snapshot.checked_at >= self.interval
+                ):
+                    self.refresh(url, snapshot)
+
+
+MODEL_LIST_CACHE = ModelListCache(interval=MODELS_REFRESH_INTERVAL)
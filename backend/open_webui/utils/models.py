@@ -13,14 +13,13 @@ from open_webui.functions import get_function_models
 
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
-from open_webui.models.groups import Groups
 
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
 )
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
 
 
 from open_webui.config import (
@@ -132,80 +131,104 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
             ]
         models = models + arena_models
 
+    # Load all functions at once rather than per action/filter of every model
+    functions = {function.id: function for function in Functions.get_functions()}
+
     global_action_ids = [
-        function.id for function in Functions.get_global_action_functions()
-    ]
-    enabled_action_ids = [
         function.id
-        for function in Functions.get_functions_by_type("action", active_only=True)
+        for function in functions.values()
+        if function.type == "action" and function.is_active and function.is_global
     ]
+    enabled_action_ids = {
+        function.id
+        for function in functions.values()
+        if function.type == "action" and function.is_active
+    }
 
     global_filter_ids = [
-        function.id for function in Functions.get_global_filter_functions()
-    ]
-    enabled_filter_ids = [
         function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
+        for function in functions.values()
+        if function.type == "filter" and function.is_active and function.is_global
     ]
+    enabled_filter_ids = {
+        function.id
+        for function in functions.values()
+        if function.type == "filter" and function.is_active
+    }
+
+    # Index models by id, and Ollama models also by their name without a tag
+    # (e.g. 'llama3' for 'llama3:7b'), the ids custom models may refer to
+    models_by_id = {}
+    for model in models:
+        models_by_id.setdefault(model["id"], []).append(model)
+
+        base_id = model["id"].split(":")[0]
+        if base_id != model["id"]:
+            models_by_id.setdefault(base_id, []).append(model)
+
+    model_ids = {model["id"] for model in models}
+    removed_models = set()
 
     custom_models = Models.get_all_models()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
             # Applied directly to a base model
-            for model in models:
-                if custom_model.id == model["id"] or (
-                    model.get("owned_by") == "ollama"
-                    and custom_model.id
-                    == model["id"].split(":")[
-                        0
-                    ]  # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
+            for model in models_by_id.get(custom_model.id, []):
+                if id(model) in removed_models or not (
+                    custom_model.id == model["id"] or model.get("owned_by") == "ollama"
                 ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        # Set action_ids and filter_ids
-                        action_ids = []
-                        filter_ids = []
-
-                        if "info" in model:
-                            if "meta" in model["info"]:
-                                action_ids.extend(
-                                    model["info"]["meta"].get("actionIds", [])
-                                )
-                                filter_ids.extend(
-                                    model["info"]["meta"].get("filterIds", [])
-                                )
-
-                            if "params" in model["info"]:
-                                # Remove params to avoid exposing sensitive info
-                                del model["info"]["params"]
-
-                        model["action_ids"] = action_ids
-                        model["filter_ids"] = filter_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
-        ):
+                    continue
+
+                if custom_model.is_active:
+                    model["name"] = custom_model.name
+                    model["info"] = custom_model.model_dump()
+
+                    # Set action_ids and filter_ids
+                    action_ids = []
+                    filter_ids = []
+
+                    if "info" in model:
+                        if "meta" in model["info"]:
+                            action_ids.extend(
+                                model["info"]["meta"].get("actionIds", [])
+                            )
+                            filter_ids.extend(
+                                model["info"]["meta"].get("filterIds", [])
+                            )
+
+                        if "params" in model["info"]:
+                            # Remove params to avoid exposing sensitive info
+                            del model["info"]["params"]
+
+                    model["action_ids"] = action_ids
+                    model["filter_ids"] = filter_ids
+                else:
+                    removed_models.add(id(model))
+                    model_ids.discard(model["id"])
+
+        elif custom_model.is_active and custom_model.id not in model_ids:
             # Custom model based on a base model
             owned_by = "openai"
             connection_type = None
 
             pipe = None
 
-            for m in models:
-                if (
-                    custom_model.base_model_id == m["id"]
-                    or custom_model.base_model_id == m["id"].split(":")[0]
-                ):
-                    owned_by = m.get("owned_by", "unknown")
-                    if "pipe" in m:
-                        pipe = m["pipe"]
+            # Indexed models are in list order, take the first one like a
+            # scan of the list would
+            m = next(
+                (
+                    m
+                    for m in models_by_id.get(custom_model.base_model_id, [])
+                    if id(m) not in removed_models
+                ),
+                None,
+            )
+            if m is not None:
+                owned_by = m.get("owned_by", "unknown")
+                if "pipe" in m:
+                    pipe = m["pipe"]
 
-                    connection_type = m.get("connection_type", None)
-                    break
+                connection_type = m.get("connection_type", None)
 
             model = {
                 "id": f"{custom_model.id}",
@@ -241,6 +264,16 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
             model["filter_ids"] = filter_ids
 
             models.append(model)
+            model_ids.add(model["id"])
+
+            # Later custom models may be based on this one
+            models_by_id.setdefault(model["id"], []).append(model)
+            base_id = model["id"].split(":")[0]
+            if base_id != model["id"]:
+                models_by_id.setdefault(base_id, []).append(model)
+
+    if removed_models:
+        models = [model for model in models if id(model) not in removed_models]
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -291,6 +324,36 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
         function_module, _, _ = get_function_module_from_cache(request, function_id)
         return function_module
 
+    # Items of every function are the same for all models, resolve them once
+    action_items = {}
+    filter_items = {}
+
+    def get_action_items(action_id):
+        if action_id not in action_items:
+            action_function = functions.get(action_id)
+            if action_function is None:
+                raise Exception(f"Action not found: {action_id}")
+
+            function_module = get_function_module_by_id(action_id)
+            action_items[action_id] = get_action_items_from_module(
+                action_function, function_module
+            )
+        return action_items[action_id]
+
+    def get_filter_items(filter_id):
+        if filter_id not in filter_items:
+            filter_function = functions.get(filter_id)
+            if filter_function is None:
+                raise Exception(f"Filter not found: {filter_id}")
+
+            function_module = get_function_module_by_id(filter_id)
+            filter_items[filter_id] = (
+                get_filter_items_from_module(filter_function, function_module)
+                if getattr(function_module, "toggle", None)
+                else []
+            )
+        return filter_items[filter_id]
+
     for model in models:
         action_ids = [
             action_id
@@ -305,27 +368,11 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
-
-            function_module = get_function_module_by_id(action_id)
-            model["actions"].extend(
-                get_action_items_from_module(action_function, function_module)
-            )
+            model["actions"].extend(dict(item) for item in get_action_items(action_id))
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
-            if filter_function is None:
-                raise Exception(f"Filter not found: {filter_id}")
-
-            function_module = get_function_module_by_id(filter_id)
-
-            if getattr(function_module, "toggle", None):
-                model["filters"].extend(
-                    get_filter_items_from_module(filter_function, function_module)
-                )
+            model["filters"].extend(dict(item) for item in get_filter_items(filter_id))
 
     log.debug(f"get_all_models() returned {len(models)} models")
 
@@ -368,7 +415,8 @@ def get_filtered_models(models, user):
         or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
     ) and not BYPASS_MODEL_ACCESS_CONTROL:
         filtered_models = []
-        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user.id)}
+        user_group_ids = get_user_group_ids(user.id)
+        model_infos = {model.id: model for model in Models.get_all_models()}
         for model in models:
             if model.get("arena"):
                 if has_access(
@@ -382,7 +430,7 @@ def get_filtered_models(models, user):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
+            model_info = model_infos.get(model["id"])
             if model_info:
                 if (
                     (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+
+import aiohttp
+from yarl import URL
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ClientSessionPool:
+    """
+    aiohttp sessions shared between requests, one per upstream origin, so
+    connections and their TLS handshakes are reused instead of being thrown
+    away after every request.
+
+    Sessions are shared between users, so they don't keep cookies, and
+    timeouts are passed per request. A session belongs to the event loop it
+    was created on: the app's sessions live until shutdown, code running on
+    its own event loop must `close()` them before the loop ends.
+    """
+
+    def __init__(self, limit: int, keepalive_timeout: float, dns_cache_ttl: int):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        # event loop -> origin -> session
+        self.sessions: dict[
+            asyncio.AbstractEventLoop, dict[str, aiohttp.ClientSession]
+        ] = {}
+
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    @property
+    def size(self) -> int:
+        return sum(len(sessions) for sessions in list(self.sessions.values()))
+
+    async def _on_request_start(self, session, context, params):
+        self.requests += 1
+
+    async def _on_connection_create_end(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, context, params):
+        self.connections_reused += 1
+
+    def create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            use_dns_cache=self.dns_cache_ttl > 0,
+            ttl_dns_cache=self.dns_cache_ttl,
+            **(
+                {"keepalive_timeout": self.keepalive_timeout}
+                if self.keepalive_timeout > 0
+                else {"force_close": True}
+            ),
+        )
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+
+        return aiohttp.ClientSession(
+            connector=connector,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trust_env=True,
+            trace_configs=[trace_config],
+        )
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        """Get the session for the origin of `url` on the running event loop."""
+        loop = asyncio.get_running_loop()
+
+        sessions = self.sessions.get(loop)
+        if sessions is None:
+            # Forget sessions of event loops that ended without closing them,
+            # their connections are gone with the loop
+            for other_loop in list(self.sessions):
+                if other_loop.is_closed():
+                    self.sessions.pop(other_loop, None)
+
+            sessions = self.sessions.setdefault(loop, {})
+
+        origin = str(URL(url).origin())
+        session = sessions.get(origin)
+        if session is None or session.closed:
+            session = self.create_session()
+            sessions[origin] = session
+            log.debug(f"Created client session for {origin}")
+
+        return session
+
+    async def close(self):
+        """Close the sessions of the running event loop."""
+        sessions = self.sessions.pop(asyncio.get_running_loop(), {})
+        for session in sessions.values():
+            await session.close()
+
+
+HTTP_SESSION_POOL = ClientSessionPool(
+    limit=AIOHTTP_CLIENT_POOL_LIMIT,
+    keepalive_timeout=AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+)
@@ -8,8 +8,17 @@ Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* webui.rag.collection_cache.* (hits, misses, evictions, size in bytes)
+* webui.rag.embedding_cache.* (hits, redis_hits, misses)
+* webui.http_client.* (requests, connections_created, connections_reused,
+  sessions)
+* webui.load_balancer.* (in_flight, requests, failures, ejections, latency)
+* webui.model_lists.* (stale, age)
+* webui.ingestion.* (pending, running, completed, failed, retried, wait_time,
+  run_time)
 
-Attributes used: http.method, http.route, http.status_code
+Attributes used: http.method, http.route, http.status_code, balancer and node
+for the load balancer metrics, and url for the model list metrics
 
 If you wish to add more attributes (e.g. user-agent) you can, but beware of
 high-cardinality label sets.
@@ -46,6 +55,12 @@ from open_webui.env import (
     OTEL_METRICS_EXPORTER_OTLP_INSECURE,
 )
 from open_webui.models.users import Users
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
+from open_webui.retrieval.vector.cache import COLLECTION_CACHE
+from open_webui.utils.ingestion import INGESTION_QUEUE
+from open_webui.utils.load_balancer import OLLAMA_BALANCER, OPENAI_BALANCER
+from open_webui.utils.model_lists import MODEL_LIST_CACHE
+from open_webui.utils.session_pool import HTTP_SESSION_POOL
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
 
@@ -101,6 +116,24 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
         View(
             instrument_name="webui.users.active.today",
         ),
+        View(
+            instrument_name="webui.rag.collection_cache.*",
+        ),
+        View(
+            instrument_name="webui.rag.embedding_cache.*",
+        ),
+        View(
+            instrument_name="webui.http_client.*",
+        ),
+        View(
+            instrument_name="webui.load_balancer.*",
+        ),
+        View(
+            instrument_name="webui.model_lists.*",
+        ),
+        View(
+            instrument_name="webui.ingestion.*",
+        ),
     ]
 
     provider = MeterProvider(
@@ -173,6 +206,138 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
         callbacks=[observe_users_active_today],
     )
 
+    def observe_cache(cache, attribute: str):
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [metrics.Observation(value=getattr(cache, attribute))]
+
+        return callback
+
+    for attribute, create_instrument, unit in (
+        ("hits", meter.create_observable_counter, "1"),
+        ("misses", meter.create_observable_counter, "1"),
+        ("evictions", meter.create_observable_counter, "1"),
+        ("size", meter.create_observable_gauge, "By"),
+    ):
+        create_instrument(
+            name=f"webui.rag.collection_cache.{attribute}",
+            description=f"Collection content cache {attribute}",
+            unit=unit,
+            callbacks=[observe_cache(COLLECTION_CACHE, attribute)],
+        )
+
+    if EMBEDDING_CACHE is not None:
+        for attribute in ("hits", "redis_hits", "misses"):
+            meter.create_observable_counter(
+                name=f"webui.rag.embedding_cache.{attribute}",
+                description=f"Embedding cache {attribute}",
+                unit="1",
+                callbacks=[observe_cache(EMBEDDING_CACHE, attribute)],
+            )
+
+    for attribute in ("requests", "connections_created", "connections_reused"):
+        meter.create_observable_counter(
+            name=f"webui.http_client.{attribute}",
+            description=f"Upstream HTTP client {attribute.replace('_', ' ')}",
+            unit="1",
+            callbacks=[observe_cache(HTTP_SESSION_POOL, attribute)],
+        )
+
+    meter.create_observable_gauge(
+        name="webui.http_client.sessions",
+        description="Open upstream HTTP client sessions",
+        unit="1",
+        callbacks=[observe_cache(HTTP_SESSION_POOL, "size")],
+    )
+
+    def observe_balancers(stat: str):
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [
+                metrics.Observation(
+                    value=node[stat],
+                    attributes={"balancer": balancer.name, "node": node["url"]},
+                )
+                for balancer in (OLLAMA_BALANCER, OPENAI_BALANCER)
+                for node in balancer.get_stats()
+                if node[stat] is not None
+            ]
+
+        return callback
+
+    for stat, create_instrument, unit in (
+        ("in_flight", meter.create_observable_gauge, "1"),
+        ("requests", meter.create_observable_counter, "1"),
+        ("failures", meter.create_observable_counter, "1"),
+        ("ejections", meter.create_observable_counter, "1"),
+        ("latency", meter.create_observable_gauge, "s"),
+    ):
+        create_instrument(
+            name=f"webui.load_balancer.{stat}",
+            description=f"Upstream node {stat.replace('_', ' ')}",
+            unit=unit,
+            callbacks=[observe_balancers(stat)],
+        )
+
+    def observe_model_lists(stat: str):
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [
+                metrics.Observation(
+                    value=int(snapshot[stat]), attributes={"url": snapshot["url"]}
+                )
+                for snapshot in MODEL_LIST_CACHE.get_stats()
+                if snapshot[stat] is not None
+            ]
+
+        return callback
+
+    meter.create_observable_gauge(
+        name="webui.model_lists.stale",
+        description="Whether the last model list refresh of a connection failed",
+        unit="1",
+        callbacks=[observe_model_lists("stale")],
+    )
+    meter.create_observable_gauge(
+        name="webui.model_lists.age",
+        description="Age of the model list served for a connection",
+        unit="s",
+        callbacks=[observe_model_lists("age")],
+    )
+
+    def observe_ingestion_queue(stat: str):
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [metrics.Observation(value=INGESTION_QUEUE.get_stats()[stat])]
+
+        return callback
+
+    for stat in ("pending", "running"):
+        meter.create_observable_gauge(
+            name=f"webui.ingestion.{stat}",
+            description=f"Ingestion jobs {stat}, across instances",
+            unit="1",
+            callbacks=[observe_ingestion_queue(stat)],
+        )
+    for attribute in ("completed", "failed", "retried"):
+        meter.create_observable_counter(
+            name=f"webui.ingestion.{attribute}",
+            description=f"Ingestion jobs {attribute} by this instance",
+            unit="1",
+            callbacks=[observe_cache(INGESTION_QUEUE, attribute)],
+        )
+    for attribute in ("wait_time", "run_time"):
+        meter.create_observable_counter(
+            name=f"webui.ingestion.{attribute}",
+            description=f"Total {attribute.replace('_', ' ')} of ingestion jobs",
+            unit="s",
+            callbacks=[observe_cache(INGESTION_QUEUE, attribute)],
+        )
+
     # FastAPI middleware
     @app.middleware("http")
     async def _metrics_middleware(request: Request, call_next):
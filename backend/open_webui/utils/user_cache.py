@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.env import REDIS_KEY_PREFIX, SRC_LOG_LEVELS, USER_CACHE_TTL
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class UserCache:
+    """
+    Short-lived cache of authenticated users by id and by API key, so that
+    authenticating a request doesn't need a database query.
+
+    `Users` invalidates a user whenever it is updated or deleted, and users
+    loaded while an invalidation happened aren't cached. With Redis, each
+    invalidation also bumps a version shared between instances, re-read at
+    most once per `sync_interval` seconds, and every instance drops its
+    cached users once it changes. Entries also expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        redis=None,
+        sync_interval: float = 1.0,
+        max_size: int = 10000,
+    ):
+        self.ttl = ttl
+        self.redis = redis
+        self.sync_interval = sync_interval
+        self.max_size = max_size
+
+        # id -> (expires_at, user), in order of expiry
+        self.users: OrderedDict[str, tuple] = OrderedDict()
+        # api key -> (expires_at, user id)
+        self.api_keys: OrderedDict[str, tuple] = OrderedDict()
+        self.lock = threading.Lock()
+        # Bumped on invalidation, so loads racing with a write aren't cached
+        self.generation = 0
+
+        # Version the cached users were loaded at
+        self.version = None
+        self.redis_version = None
+        self.redis_version_expires_at = 0.0
+
+    def get_redis_key(self) -> str:
+        return f"{REDIS_KEY_PREFIX}:users:version"
+
+    def sync(self):
+        """Drop all cached users if another instance invalidated one."""
+        if self.redis is None:
+            return
+
+        now = time.monotonic()
+        if now < self.redis_version_expires_at:
+            return
+
+        try:
+            self.redis_version = self.redis.get(self.get_redis_key())
+        except Exception as e:
+            log.warning(f"Failed to read user version from Redis: {e}")
+            # Without the shared version, don't trust anything cached
+            self.redis_version = object()
+        self.redis_version_expires_at = now + self.sync_interval
+
+        with self.lock:
+            if self.redis_version != self.version:
+                self.version = self.redis_version
+                self.generation += 1
+                self.users.clear()
+                self.api_keys.clear()
+
+    def get_user_by_id(self, id: str, load: Callable[[str], Optional[object]]):
+        if self.ttl <= 0:
+            return load(id)
+
+        self.sync()
+        with self.lock:
+            user = self._get(self.users, id)
+            generation = self.generation
+
+        if user is None:
+            user = load(id)
+            with self.lock:
+                if user is not None and generation == self.generation:
+                    self._set(self.users, id, user)
+
+        return user.model_copy() if user is not None else None
+
+    def get_user_by_api_key(
+        self, api_key: str, load: Callable[[str], Optional[object]]
+    ):
+        if self.ttl <= 0:
+            return load(api_key)
+
+        self.sync()
+        with self.lock:
+            id = self._get(self.api_keys, api_key)
+            user = self._get(self.users, id) if id else None
+            generation = self.generation
+
+        if user is None:
+            user = load(api_key)
+            with self.lock:
+                if user is not None and generation == self.generation:
+                    self._set(self.users, user.id, user)
+                    self._set(self.api_keys, api_key, user.id)
+
+        return user.model_copy() if user is not None else None
+
+    def invalidate(self, id: str):
+        with self.lock:
+            self.generation += 1
+            self.users.pop(id, None)
+            for api_key in [
+                api_key
+                for api_key, (_, user_id) in self.api_keys.items()
+                if user_id == id
+            ]:
+                del self.api_keys[api_key]
+
+        self.publish()
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.users.clear()
+            self.api_keys.clear()
+
+        self.publish()
+
+    def publish(self):
+        if self.redis is not None:
+            try:
+                self.redis.incr(self.get_redis_key())
+            except Exception as e:
+                log.warning(f"Failed to update user version in Redis: {e}")
+            self.redis_version_expires_at = 0.0
+
+    def _get(self, entries: OrderedDict, key: str):
+        entry = entries.get(key)
+        if entry is None:
+            return None
+
+        if entry[0] <= time.monotonic():
+            del entries[key]
+            return None
+
+        return entry[1]
+
+    def _set(self, entries: OrderedDict, key: str, value):
+        entries[key] = (time.monotonic() + self.ttl, value)
+        entries.move_to_end(key)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+
+USER_CACHE = UserCache(ttl=USER_CACHE_TTL, redis=get_redis_client())
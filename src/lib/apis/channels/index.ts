@@ -378,12 +378,20 @@ export const getChannelMessages = async (
 	token: string = '',
 	channel_id: string,
 	skip: number = 0,
-	limit: number = 50
+	limit: number = 50,
+	beforeId: string | null = null
 ) => {
 	let error = null;
 
+	const searchParams = new URLSearchParams();
+	searchParams.append('skip', `${skip}`);
+	searchParams.append('limit', `${limit}`);
+	if (beforeId !== null) {
+		searchParams.append('before_id', beforeId);
+	}
+
 	const res = await fetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?${searchParams.toString()}`,
 		{
 			method: 'GET',
 			headers: {